@@ -4,6 +4,10 @@
     Implementation of XcvrApi that corresponds to C-CMIS
 """
 from ...fields import consts
+from ...cdb.cdb_pm import CdbPmHandler as CdbPm
+from ...codes.public.cdb import CdbCodes
+from ...mem_maps.public.cdb import CdbMemMap
+from ...mem_maps.xcvr_mem_map import get_shared_mem_map
 from .cmis import CmisApi, CMIS_VDM_KEY_TO_DB_PREFIX_KEY_MAP, CMIS_XCVR_INFO_DEFAULT_DICT
 import time
 import copy
@@ -48,9 +52,55 @@ C_CMIS_XCVR_INFO_DEFAULT_DICT.update({
     "supported_min_laser_freq": "N/A"
 })
 
+# get_pm_all() key prefix and (avg, min, max) fields of the statistics PMs of page 35h
+C_CMIS_PM_STATS = (
+    ('rx_cd', consts.RX_AVG_CD_PM, consts.RX_MIN_CD_PM, consts.RX_MAX_CD_PM),
+    ('rx_dgd', consts.RX_AVG_DGD_PM, consts.RX_MIN_DGD_PM, consts.RX_MAX_DGD_PM),
+    ('rx_sopmd', consts.RX_AVG_SOPMD_PM, consts.RX_MIN_SOPMD_PM, consts.RX_MAX_SOPMD_PM),
+    ('rx_pdl', consts.RX_AVG_PDL_PM, consts.RX_MIN_PDL_PM, consts.RX_MAX_PDL_PM),
+    ('rx_osnr', consts.RX_AVG_OSNR_PM, consts.RX_MIN_OSNR_PM, consts.RX_MAX_OSNR_PM),
+    ('rx_esnr', consts.RX_AVG_ESNR_PM, consts.RX_MIN_ESNR_PM, consts.RX_MAX_ESNR_PM),
+    ('rx_cfo', consts.RX_AVG_CFO_PM, consts.RX_MIN_CFO_PM, consts.RX_MAX_CFO_PM),
+    ('rx_evm', consts.RX_AVG_EVM_PM, consts.RX_MIN_EVM_PM, consts.RX_MAX_EVM_PM),
+    ('tx_power', consts.TX_AVG_POWER_PM, consts.TX_MIN_POWER_PM, consts.TX_MAX_POWER_PM),
+    ('rx_power', consts.RX_AVG_POWER_PM, consts.RX_MIN_POWER_PM, consts.RX_MAX_POWER_PM),
+    ('rx_sigpwr', consts.RX_AVG_SIG_POWER_PM, consts.RX_MIN_SIG_POWER_PM, consts.RX_MAX_SIG_POWER_PM),
+    ('rx_soproc', consts.RX_AVG_SOPROC_PM, consts.RX_MIN_SOPROC_PM, consts.RX_MAX_SOPROC_PM),
+    ('rx_mer', consts.RX_AVG_MER_PM, consts.RX_MIN_MER_PM, consts.RX_MAX_MER_PM),
+)
+
+# Counter PMs of page 34h
+C_CMIS_PM_COUNTERS = (
+    consts.RX_BITS_PM,
+    consts.RX_BITS_SUB_INTERVAL_PM,
+    consts.RX_CORR_BITS_PM,
+    consts.RX_MIN_CORR_BITS_SUB_INTERVAL_PM,
+    consts.RX_MAX_CORR_BITS_SUB_INTERVAL_PM,
+    consts.RX_FRAMES_PM,
+    consts.RX_FRAMES_SUB_INTERVAL_PM,
+    consts.RX_FRAMES_UNCORR_ERR_PM,
+    consts.RX_MIN_FRAMES_UNCORR_ERR_SUB_INTERVAL_PM,
+    consts.RX_MAX_FRAMES_UNCORR_ERR_SUB_INTERVAL_PM,
+)
+
+# All the PM fields of page 34h and 35h read by get_pm_all()
+C_CMIS_PM_FIELDS = C_CMIS_PM_COUNTERS + tuple(field for stats in C_CMIS_PM_STATS for field in stats[1:])
+
 class CCmisApi(CmisApi):
+    # When enabled, get_pm_all retrieves the PMs with the CDB PM commands if the module supports them
+    pm_via_cdb = False
+
+    @classmethod
+    def set_pm_via_cdb(cls, enabled: bool):
+        """
+        Set the pm_via_cdb flag to control whether get_pm_all retrieves the PMs of page
+        34h and 35h with two CDB commands instead of one read per PM.
+        """
+        cls.pm_via_cdb = bool(enabled)
+
     def __init__(self, xcvr_eeprom, init_cdb_fw_handler=False):
         super(CCmisApi, self).__init__(xcvr_eeprom, init_cdb_fw_handler)
+        self._cdb_pm_hdlr = None
 
     def _get_vdm_key_to_db_prefix_map(self):
         combined_map = {**CMIS_VDM_KEY_TO_DB_PREFIX_KEY_MAP, **C_CMIS_DELTA_VDM_KEY_TO_DB_PREFIX_KEY_MAP}
@@ -203,13 +253,42 @@ class CCmisApi(CmisApi):
         SOPROC: unit in krad/s
         MER:    unit in dB
         '''
+        return self._get_pm_dict(self.get_pm_fields())
+
+    def get_pm_fields(self):
+        '''
+        This function returns the raw PM fields of page 34h and 35h, a dict mapping
+        the C_CMIS_PM_FIELDS names to their values
+        '''
+        pm = self._get_pm_from_cdb() if self.pm_via_cdb else None
+        if pm is None:
+            pm = {field: self.xcvr_eeprom.read(field) for field in C_CMIS_PM_FIELDS}
+        return pm
+
+    def _get_pm_from_cdb(self):
+        '''
+        This function returns the PMs of page 34h and 35h retrieved with the CDB PM
+        commands, None if the module does not support them
+        '''
+        if self._cdb_pm_hdlr is None:
+            if not self.is_cdb_supported():
+                return None
+            cdb_mem_map = get_shared_mem_map(CdbMemMap, CdbCodes)
+            self._cdb_pm_hdlr = CdbPm(self.xcvr_eeprom.reader, self.xcvr_eeprom.writer, cdb_mem_map)
+        return self._cdb_pm_hdlr.get_media_pm()
+
+    @staticmethod
+    def _get_pm_dict(pm):
+        '''
+        This function returns the get_pm_all() dict of the PM fields of page 34h and 35h
+        '''
         PM_dict = dict()
 
-        rx_bits_pm = self.xcvr_eeprom.read(consts.RX_BITS_PM)
-        rx_bits_subint_pm = self.xcvr_eeprom.read(consts.RX_BITS_SUB_INTERVAL_PM)
-        rx_corr_bits_pm = self.xcvr_eeprom.read(consts.RX_CORR_BITS_PM)
-        rx_min_corr_bits_subint_pm = self.xcvr_eeprom.read(consts.RX_MIN_CORR_BITS_SUB_INTERVAL_PM)
-        rx_max_corr_bits_subint_pm = self.xcvr_eeprom.read(consts.RX_MAX_CORR_BITS_SUB_INTERVAL_PM)
+        rx_bits_pm = pm[consts.RX_BITS_PM]
+        rx_bits_subint_pm = pm[consts.RX_BITS_SUB_INTERVAL_PM]
+        rx_corr_bits_pm = pm[consts.RX_CORR_BITS_PM]
+        rx_min_corr_bits_subint_pm = pm[consts.RX_MIN_CORR_BITS_SUB_INTERVAL_PM]
+        rx_max_corr_bits_subint_pm = pm[consts.RX_MAX_CORR_BITS_SUB_INTERVAL_PM]
 
         if (rx_bits_subint_pm != 0) and (rx_bits_pm != 0):
             PM_dict['preFEC_BER_avg'] = rx_corr_bits_pm*1.0/rx_bits_pm
@@ -220,11 +299,11 @@ class CCmisApi(CmisApi):
             PM_dict['preFEC_BER_avg'] = 1.0
             PM_dict['preFEC_BER_min'] = 1.0
             PM_dict['preFEC_BER_max'] = 1.0
-        rx_frames_pm = self.xcvr_eeprom.read(consts.RX_FRAMES_PM)
-        rx_frames_subint_pm = self.xcvr_eeprom.read(consts.RX_FRAMES_SUB_INTERVAL_PM)
-        rx_frames_uncorr_err_pm = self.xcvr_eeprom.read(consts.RX_FRAMES_UNCORR_ERR_PM)
-        rx_min_frames_uncorr_err_subint_pm = self.xcvr_eeprom.read(consts.RX_MIN_FRAMES_UNCORR_ERR_SUB_INTERVAL_PM)
-        rx_max_frames_uncorr_err_subint_pm = self.xcvr_eeprom.read(consts.RX_MAX_FRAMES_UNCORR_ERR_SUB_INTERVAL_PM)
+        rx_frames_pm = pm[consts.RX_FRAMES_PM]
+        rx_frames_subint_pm = pm[consts.RX_FRAMES_SUB_INTERVAL_PM]
+        rx_frames_uncorr_err_pm = pm[consts.RX_FRAMES_UNCORR_ERR_PM]
+        rx_min_frames_uncorr_err_subint_pm = pm[consts.RX_MIN_FRAMES_UNCORR_ERR_SUB_INTERVAL_PM]
+        rx_max_frames_uncorr_err_subint_pm = pm[consts.RX_MAX_FRAMES_UNCORR_ERR_SUB_INTERVAL_PM]
 
         if (rx_frames_subint_pm != 0) and (rx_frames_pm != 0):
             PM_dict['preFEC_uncorr_frame_ratio_avg'] = rx_frames_uncorr_err_pm*1.0/rx_frames_subint_pm
@@ -235,57 +314,11 @@ class CCmisApi(CmisApi):
             PM_dict['preFEC_uncorr_frame_ratio_avg'] = 0
             PM_dict['preFEC_uncorr_frame_ratio_min'] = 0
             PM_dict['preFEC_uncorr_frame_ratio_max'] = 0
-        PM_dict['rx_cd_avg'] = self.xcvr_eeprom.read(consts.RX_AVG_CD_PM)
-        PM_dict['rx_cd_min'] = self.xcvr_eeprom.read(consts.RX_MIN_CD_PM)
-        PM_dict['rx_cd_max'] = self.xcvr_eeprom.read(consts.RX_MAX_CD_PM)
-
-        PM_dict['rx_dgd_avg'] = self.xcvr_eeprom.read(consts.RX_AVG_DGD_PM)
-        PM_dict['rx_dgd_min'] = self.xcvr_eeprom.read(consts.RX_MIN_DGD_PM)
-        PM_dict['rx_dgd_max'] = self.xcvr_eeprom.read(consts.RX_MAX_DGD_PM)
-
-        PM_dict['rx_sopmd_avg'] = self.xcvr_eeprom.read(consts.RX_AVG_SOPMD_PM)
-        PM_dict['rx_sopmd_min'] = self.xcvr_eeprom.read(consts.RX_MIN_SOPMD_PM)
-        PM_dict['rx_sopmd_max'] = self.xcvr_eeprom.read(consts.RX_MAX_SOPMD_PM)
-
-        PM_dict['rx_pdl_avg'] = self.xcvr_eeprom.read(consts.RX_AVG_PDL_PM)
-        PM_dict['rx_pdl_min'] = self.xcvr_eeprom.read(consts.RX_MIN_PDL_PM)
-        PM_dict['rx_pdl_max'] = self.xcvr_eeprom.read(consts.RX_MAX_PDL_PM)
-
-        PM_dict['rx_osnr_avg'] = self.xcvr_eeprom.read(consts.RX_AVG_OSNR_PM)
-        PM_dict['rx_osnr_min'] = self.xcvr_eeprom.read(consts.RX_MIN_OSNR_PM)
-        PM_dict['rx_osnr_max'] = self.xcvr_eeprom.read(consts.RX_MAX_OSNR_PM)
-
-        PM_dict['rx_esnr_avg'] = self.xcvr_eeprom.read(consts.RX_AVG_ESNR_PM)
-        PM_dict['rx_esnr_min'] = self.xcvr_eeprom.read(consts.RX_MIN_ESNR_PM)
-        PM_dict['rx_esnr_max'] = self.xcvr_eeprom.read(consts.RX_MAX_ESNR_PM)
-
-        PM_dict['rx_cfo_avg'] = self.xcvr_eeprom.read(consts.RX_AVG_CFO_PM)
-        PM_dict['rx_cfo_min'] = self.xcvr_eeprom.read(consts.RX_MIN_CFO_PM)
-        PM_dict['rx_cfo_max'] = self.xcvr_eeprom.read(consts.RX_MAX_CFO_PM)
-
-        PM_dict['rx_evm_avg'] = self.xcvr_eeprom.read(consts.RX_AVG_EVM_PM)
-        PM_dict['rx_evm_min'] = self.xcvr_eeprom.read(consts.RX_MIN_EVM_PM)
-        PM_dict['rx_evm_max'] = self.xcvr_eeprom.read(consts.RX_MAX_EVM_PM)
-
-        PM_dict['tx_power_avg'] = self.xcvr_eeprom.read(consts.TX_AVG_POWER_PM)
-        PM_dict['tx_power_min'] = self.xcvr_eeprom.read(consts.TX_MIN_POWER_PM)
-        PM_dict['tx_power_max'] = self.xcvr_eeprom.read(consts.TX_MAX_POWER_PM)
-
-        PM_dict['rx_power_avg'] = self.xcvr_eeprom.read(consts.RX_AVG_POWER_PM)
-        PM_dict['rx_power_min'] = self.xcvr_eeprom.read(consts.RX_MIN_POWER_PM)
-        PM_dict['rx_power_max'] = self.xcvr_eeprom.read(consts.RX_MAX_POWER_PM)
-
-        PM_dict['rx_sigpwr_avg'] = self.xcvr_eeprom.read(consts.RX_AVG_SIG_POWER_PM)
-        PM_dict['rx_sigpwr_min'] = self.xcvr_eeprom.read(consts.RX_MIN_SIG_POWER_PM)
-        PM_dict['rx_sigpwr_max'] = self.xcvr_eeprom.read(consts.RX_MAX_SIG_POWER_PM)
-
-        PM_dict['rx_soproc_avg'] = self.xcvr_eeprom.read(consts.RX_AVG_SOPROC_PM)
-        PM_dict['rx_soproc_min'] = self.xcvr_eeprom.read(consts.RX_MIN_SOPROC_PM)
-        PM_dict['rx_soproc_max'] = self.xcvr_eeprom.read(consts.RX_MAX_SOPROC_PM)
 
-        PM_dict['rx_mer_avg'] = self.xcvr_eeprom.read(consts.RX_AVG_MER_PM)
-        PM_dict['rx_mer_min'] = self.xcvr_eeprom.read(consts.RX_MIN_MER_PM)
-        PM_dict['rx_mer_max'] = self.xcvr_eeprom.read(consts.RX_MAX_MER_PM)
+        for key, avg_field, min_field, max_field in C_CMIS_PM_STATS:
+            PM_dict[key + '_avg'] = pm[avg_field]
+            PM_dict[key + '_min'] = pm[min_field]
+            PM_dict[key + '_max'] = pm[max_field]
         return PM_dict
 
     def _get_xcvr_info_default_dict(self):
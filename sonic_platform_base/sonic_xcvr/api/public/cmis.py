@@ -16,6 +16,7 @@ from ...codes.public.cdb import CdbCodes
 from ...codes.public.sff8024 import Sff8024
 from ...fields import consts
 from ...mem_maps.public.cdb import CdbMemMap
+from ...mem_maps.xcvr_mem_map import get_shared_mem_map
 from ...cdb.cdb_fw import CdbFwHandler as CdbFw
 from ..xcvr_api import XcvrApi
 from .cmisCDB import CmisCdbApi
@@ -23,7 +24,8 @@ from .cmisVDM import CmisVdmApi
 import time
 import copy
 from collections import defaultdict
-from ...utils.cache import read_only_cached_api_return
+from ...utils.cache import memoized_eeprom_reads, read_only_cached_api_return
+from ...utils.fw_image import FwDownloadCheckpoint, FwImage
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
@@ -34,6 +36,9 @@ VDM_UNFREEZE = 0
 DATAPATH_INIT_DURATION_MULTIPLIER = 10
 DATAPATH_INIT_DURATION_OVERRIDE_THRESHOLD = 1000
 
+# Seconds the module firmware versions stay cached; they only change on firmware upgrade
+FW_VERSION_CACHE_TTL = 60
+
 class VdmSubtypeIndex(Enum):
     VDM_SUBTYPE_REAL_VALUE = 0
     VDM_SUBTYPE_HALARM_THRESHOLD = 1
@@ -131,6 +136,20 @@ class CmisApi(XcvrApi):
 
     # Default caching enabled; control via classmethod
     cache_enabled = True
+    # Seconds between module fingerprint checks invalidating the cache; None disables fingerprinting
+    cache_fingerprint_interval = None
+
+    # When enabled, lane flags are only read when the lane flags summary reports a latched flag
+    flag_summary_polling = False
+
+    # When enabled, a failed firmware download is left in progress and resumed by the next download of the same image
+    fw_download_resume = False
+
+    # Identifier byte, then vendor serial number through the page 00h checksum (bytes 166-222)
+    CACHE_FINGERPRINT_RANGES = ((0, 1), (166, 57))
+
+    # Module flags (lower page bytes 8-11), lane flags (page 11h bytes 134-152) and VDM flags (page 2Ch)
+    LATCHED_FLAG_RANGES = ((8, 4), (0x11 * 128 + 134, 19), (0x2c * 128 + 128, 128))
 
     @classmethod
     def set_cache_enabled(cls, enabled: bool):
@@ -139,12 +158,40 @@ class CmisApi(XcvrApi):
         """
         cls.cache_enabled = bool(enabled)
 
+    @classmethod
+    def set_cache_fingerprint_interval(cls, interval):
+        """
+        Set how often (in seconds) cached values are checked against the module
+        fingerprint, so that swapped modules are detected. None disables the check.
+        """
+        cls.cache_fingerprint_interval = interval
+
+    @classmethod
+    def set_flag_summary_polling(cls, enabled: bool):
+        """
+        Set the flag_summary_polling flag to control whether get_transceiver_dom_flags and
+        get_transceiver_status_flags skip the lane flag reads while no lane flag is latched.
+        """
+        cls.flag_summary_polling = bool(enabled)
+
+    @classmethod
+    def set_fw_download_resume(cls, enabled: bool):
+        """
+        Set the fw_download_resume flag to control whether module_fw_download keeps a
+        checkpoint of the acknowledged blocks and resumes from it on retry.
+        """
+        cls.fw_download_resume = bool(enabled)
+
     def __init__(self, xcvr_eeprom, init_cdb_fw_handler=False):
         super(CmisApi, self).__init__(xcvr_eeprom)
         self.vdm = CmisVdmApi(xcvr_eeprom) if not self.is_flat_memory() else None
         self.cdb = CmisCdbApi(xcvr_eeprom) if self.is_cdb_supported() else None
         self._init_cdb_fw_handler = init_cdb_fw_handler
         self._cdb_fw_hdlr = None
+        # Last lane flags read in full, per kind, used as template in flag summary polling mode
+        self._last_lane_flags = {}
+        # FwDownloadCheckpoint of the last firmware download, in fw_download_resume mode
+        self._fw_download_checkpoint = None
 
     @property
     def cdb_fw_hdlr(self):
@@ -159,12 +206,21 @@ class CmisApi(XcvrApi):
         if not self.is_cdb_supported():
             self._init_cdb_fw_handler = False
             return None
-        cdb_mem_map = CdbMemMap(CdbCodes)
+        cdb_mem_map = get_shared_mem_map(CdbMemMap, CdbCodes)
         return CdbFw(self.xcvr_eeprom.reader, self.xcvr_eeprom.writer, cdb_mem_map)
 
     def get_cdb_fw_handler(self):
         return self.cdb_fw_hdlr
 
+    def invalidate_cache(self):
+        """
+        Drops all cached API return values and the VDM layout, e.g. on module
+        insertion or removal
+        """
+        super(CmisApi, self).invalidate_cache()
+        if self.vdm is not None:
+            self.vdm.invalidate_layout()
+
     def _get_vdm_key_to_db_prefix_map(self):
         return CMIS_VDM_KEY_TO_DB_PREFIX_KEY_MAP
 
@@ -352,6 +408,7 @@ class CmisApi(XcvrApi):
         '''
         return self.xcvr_eeprom.read(consts.MODULE_FAULT_CAUSE)
 
+    @read_only_cached_api_return(ttl=FW_VERSION_CACHE_TTL)
     def get_module_active_firmware(self):
         '''
         This function returns the active firmware version
@@ -361,6 +418,7 @@ class CmisApi(XcvrApi):
         active_fw = [str(num) for num in [active_fw_major, active_fw_minor]]
         return '.'.join(active_fw)
 
+    @read_only_cached_api_return(ttl=FW_VERSION_CACHE_TTL)
     def get_module_inactive_firmware(self):
         '''
         This function returns the inactive firmware version
@@ -375,6 +433,7 @@ class CmisApi(XcvrApi):
     def _get_xcvr_info_default_dict(self):
         return CMIS_XCVR_INFO_DEFAULT_DICT
 
+    @memoized_eeprom_reads
     def get_transceiver_info(self):
         admin_info = self.xcvr_eeprom.read(consts.ADMIN_INFO_FIELD)
         if admin_info is None:
@@ -521,27 +580,36 @@ class CmisApi(XcvrApi):
             pass
 
         if not self.is_flat_memory():
-            tx_power_flag_dict = self.get_tx_power_flag()
-            if tx_power_flag_dict:
-                for lane in range(1, self.NUM_CHANNELS+1):
-                    dom_flag_dict['tx%dpowerHAlarm' % lane] = tx_power_flag_dict['tx_power_high_alarm']['TxPowerHighAlarmFlag%d' % lane]
-                    dom_flag_dict['tx%dpowerLAlarm' % lane] = tx_power_flag_dict['tx_power_low_alarm']['TxPowerLowAlarmFlag%d' % lane]
-                    dom_flag_dict['tx%dpowerHWarn' % lane] = tx_power_flag_dict['tx_power_high_warn']['TxPowerHighWarnFlag%d' % lane]
-                    dom_flag_dict['tx%dpowerLWarn' % lane] = tx_power_flag_dict['tx_power_low_warn']['TxPowerLowWarnFlag%d' % lane]
-            rx_power_flag_dict = self.get_rx_power_flag()
-            if rx_power_flag_dict:
-                for lane in range(1, self.NUM_CHANNELS+1):
-                    dom_flag_dict['rx%dpowerHAlarm' % lane] = rx_power_flag_dict['rx_power_high_alarm']['RxPowerHighAlarmFlag%d' % lane]
-                    dom_flag_dict['rx%dpowerLAlarm' % lane] = rx_power_flag_dict['rx_power_low_alarm']['RxPowerLowAlarmFlag%d' % lane]
-                    dom_flag_dict['rx%dpowerHWarn' % lane] = rx_power_flag_dict['rx_power_high_warn']['RxPowerHighWarnFlag%d' % lane]
-                    dom_flag_dict['rx%dpowerLWarn' % lane] = rx_power_flag_dict['rx_power_low_warn']['RxPowerLowWarnFlag%d' % lane]
-            tx_bias_flag_dict = self.get_tx_bias_flag()
-            if tx_bias_flag_dict:
-                for lane in range(1, self.NUM_CHANNELS+1):
-                    dom_flag_dict['tx%dbiasHAlarm' % lane] = tx_bias_flag_dict['tx_bias_high_alarm']['TxBiasHighAlarmFlag%d' % lane]
-                    dom_flag_dict['tx%dbiasLAlarm' % lane] = tx_bias_flag_dict['tx_bias_low_alarm']['TxBiasLowAlarmFlag%d' % lane]
-                    dom_flag_dict['tx%dbiasHWarn' % lane] = tx_bias_flag_dict['tx_bias_high_warn']['TxBiasHighWarnFlag%d' % lane]
-                    dom_flag_dict['tx%dbiasLWarn' % lane] = tx_bias_flag_dict['tx_bias_low_warn']['TxBiasLowWarnFlag%d' % lane]
+            dom_flag_dict.update(self._read_lane_flags('dom', self._get_lane_dom_flags))
+
+        return dom_flag_dict
+
+    def _get_lane_dom_flags(self):
+        """
+        Returns the lane-specific (page 11h) part of get_transceiver_dom_flags()
+        """
+        dom_flag_dict = dict()
+        tx_power_flag_dict = self.get_tx_power_flag()
+        if tx_power_flag_dict:
+            for lane in range(1, self.NUM_CHANNELS+1):
+                dom_flag_dict['tx%dpowerHAlarm' % lane] = tx_power_flag_dict['tx_power_high_alarm']['TxPowerHighAlarmFlag%d' % lane]
+                dom_flag_dict['tx%dpowerLAlarm' % lane] = tx_power_flag_dict['tx_power_low_alarm']['TxPowerLowAlarmFlag%d' % lane]
+                dom_flag_dict['tx%dpowerHWarn' % lane] = tx_power_flag_dict['tx_power_high_warn']['TxPowerHighWarnFlag%d' % lane]
+                dom_flag_dict['tx%dpowerLWarn' % lane] = tx_power_flag_dict['tx_power_low_warn']['TxPowerLowWarnFlag%d' % lane]
+        rx_power_flag_dict = self.get_rx_power_flag()
+        if rx_power_flag_dict:
+            for lane in range(1, self.NUM_CHANNELS+1):
+                dom_flag_dict['rx%dpowerHAlarm' % lane] = rx_power_flag_dict['rx_power_high_alarm']['RxPowerHighAlarmFlag%d' % lane]
+                dom_flag_dict['rx%dpowerLAlarm' % lane] = rx_power_flag_dict['rx_power_low_alarm']['RxPowerLowAlarmFlag%d' % lane]
+                dom_flag_dict['rx%dpowerHWarn' % lane] = rx_power_flag_dict['rx_power_high_warn']['RxPowerHighWarnFlag%d' % lane]
+                dom_flag_dict['rx%dpowerLWarn' % lane] = rx_power_flag_dict['rx_power_low_warn']['RxPowerLowWarnFlag%d' % lane]
+        tx_bias_flag_dict = self.get_tx_bias_flag()
+        if tx_bias_flag_dict:
+            for lane in range(1, self.NUM_CHANNELS+1):
+                dom_flag_dict['tx%dbiasHAlarm' % lane] = tx_bias_flag_dict['tx_bias_high_alarm']['TxBiasHighAlarmFlag%d' % lane]
+                dom_flag_dict['tx%dbiasLAlarm' % lane] = tx_bias_flag_dict['tx_bias_low_alarm']['TxBiasLowAlarmFlag%d' % lane]
+                dom_flag_dict['tx%dbiasHWarn' % lane] = tx_bias_flag_dict['tx_bias_high_warn']['TxBiasHighWarnFlag%d' % lane]
+                dom_flag_dict['tx%dbiasLWarn' % lane] = tx_bias_flag_dict['tx_bias_low_warn']['TxBiasLowWarnFlag%d' % lane]
 
         return dom_flag_dict
 
@@ -1377,6 +1445,8 @@ class CmisApi(XcvrApi):
         '''
         if reset:
             reset_control = reset << 3
+            # The module may boot another image
+            self.invalidate_cache()
             return self.xcvr_eeprom.write(consts.MODULE_LEVEL_CONTROL, reset_control)
         else:
             return True
@@ -2022,6 +2092,8 @@ class CmisApi(XcvrApi):
             return False, "CDB NOT supported on this module"
         starttime = time.time()
         fw_run_status = self.cdb.run_fw_image(mode)
+        # The running image may have changed
+        self.invalidate_cache()
         if fw_run_status == 1:
             txt += 'Module FW run: Success\n'
         # password issue
@@ -2055,6 +2127,8 @@ class CmisApi(XcvrApi):
         # commit module FW (CMD 010Ah)
         starttime = time.time()
         fw_commit_status= self.cdb.commit_fw_image()
+        # The committed image may have changed
+        self.invalidate_cache()
         if fw_commit_status == 1:
             txt += 'Module FW commit: Success\n'
         # password issue
@@ -2106,44 +2180,73 @@ class CmisApi(XcvrApi):
         Note that if the download process fails anywhere in the middle, we need to run CDB command 0102h
         to abort the upgrade before we restart another upgrade process.
 
+        In fw_download_resume mode, a block write failure does not abort the download. The address
+        following the last acknowledged block is kept with the image digest, and the next download
+        of the same image resumes from that address, skipping CMD 0101h. If the module does not
+        acknowledge the first resumed block (e.g. it was reset meanwhile), the download is aborted
+        and restarted from address 0.
+
         This function returns True if download successfully completes. Otherwise it will return False where it fails.
         """
         txt = ''
         if self.cdb is None:
             return False, "CDB NOT supported on this module"
 
-        # start fw download (CMD 0101h)
-        starttime = time.time()
         try:
-            f = open(imagepath, 'rb')
-        except FileNotFoundError:
+            image = FwImage(imagepath, startLPLsize)
+        except OSError:
             txt += 'Image path  %s is incorrect.\n' % imagepath
             logger.info(txt)
             return False, txt
-
-        f.seek(0, 2)
-        imagesize = f.tell()
-        f.seek(0, 0)
-        startdata = f.read(startLPLsize)
-        logger.info('\nStart FW downloading')
-        logger.info("startLPLsize is %d" %startLPLsize)
-        fw_start_status = self.cdb.start_fw_download(startLPLsize, bytearray(startdata), imagesize)
-        if fw_start_status == 1:
-            string = 'Start module FW download: Success\n'
-            logger.info(string)
-        # password error
-        elif fw_start_status == 70:
-            string = 'Start module FW download: Need to enter password\n'
-            logger.info(string)
-            self.cdb.module_enter_password()
-            self.cdb.start_fw_download(startLPLsize, bytearray(startdata), imagesize)
-        else:
-            string = 'Start module FW download: Fail\n'
-            txt += string
-            self.cdb.abort_fw_download()
-            txt += 'FW_start_status %d\n' %fw_start_status
+        except ValueError as e:
+            txt += '%s\n' % e
             logger.info(txt)
             return False, txt
+        with image:
+            return self._module_fw_download_image(image, maxblocksize, lplonly_flag, autopaging_flag, writelength)
+
+    def _module_fw_download_image(self, image, maxblocksize, lplonly_flag, autopaging_flag, writelength):
+        """
+        Download a FwImage to the module, see module_fw_download()
+        """
+        txt = ''
+        startLPLsize = len(image.header)
+        imagesize = image.size
+        # start fw download (CMD 0101h)
+        starttime = time.time()
+        address = 0
+        checkpoint = None
+        if self.fw_download_resume:
+            digest = image.get_digest()
+            if self._fw_download_checkpoint is not None:
+                address = self._fw_download_checkpoint.get_resume_address(digest, imagesize)
+            checkpoint = FwDownloadCheckpoint(digest, imagesize, address)
+        self._fw_download_checkpoint = checkpoint
+        resuming = address > 0
+        if resuming:
+            logger.info('\nResume FW downloading at address {:#08x}'.format(address))
+        else:
+            logger.info('\nStart FW downloading')
+            logger.info("startLPLsize is %d" %startLPLsize)
+            fw_start_status = self.cdb.start_fw_download(startLPLsize, image.header, imagesize)
+            # The inactive image is being replaced
+            self.invalidate_cache()
+            if fw_start_status == 1:
+                string = 'Start module FW download: Success\n'
+                logger.info(string)
+            # password error
+            elif fw_start_status == 70:
+                string = 'Start module FW download: Need to enter password\n'
+                logger.info(string)
+                self.cdb.module_enter_password()
+                self.cdb.start_fw_download(startLPLsize, image.header, imagesize)
+            else:
+                string = 'Start module FW download: Fail\n'
+                txt += string
+                self.cdb.abort_fw_download()
+                txt += 'FW_start_status %d\n' %fw_start_status
+                logger.info(txt)
+                return False, txt
         elapsedtime = time.time()-starttime
         logger.info('Start module FW download time: %.2f s' %elapsedtime)
 
@@ -2153,37 +2256,46 @@ class CmisApi(XcvrApi):
             BLOCK_SIZE = 116
         else:
             BLOCK_SIZE = maxblocksize
-        address = 0
-        remaining = imagesize - startLPLsize
+        remaining = imagesize - startLPLsize - address
         logger.info("\nTotal size: {} start bytes: {} remaining: {}".format(imagesize, startLPLsize, remaining))
-        while remaining > 0:
-            if remaining < BLOCK_SIZE:
-                count = remaining
-            else:
-                count = BLOCK_SIZE
-            data = f.read(count)
+        for address, data in image.get_blocks(BLOCK_SIZE, address):
+            count = len(data)
             if lplonly_flag:
                 fw_download_status = self.cdb.block_write_lpl(address, data)
             else:
                 fw_download_status = self.cdb.block_write_epl(address, data, autopaging_flag, writelength)
-            if fw_download_status != 1:
+            if fw_download_status != 1 and resuming:
+                # The module no longer has the download in progress, restart it
+                logger.info('Resume FW download at address {:#08x} failed, restarting'.format(address))
                 self.cdb.abort_fw_download()
+                self._fw_download_checkpoint = None
+                return self._module_fw_download_image(image, maxblocksize, lplonly_flag, autopaging_flag, writelength)
+            if fw_download_status != 1:
+                if checkpoint is None:
+                    self.cdb.abort_fw_download()
+                else:
+                    txt += 'FW download can be resumed at address {:#08x}\n'.format(address)
                 txt += 'CDB download failed. CDB Status: %d\n' %fw_download_status
                 txt += 'FW_download_status %d\n' %fw_download_status
                 logger.info(txt)
                 return False, txt
             elapsedtime = time.time()-starttime
+            resuming = False
             address += count
             remaining -= count
+            if checkpoint is not None:
+                checkpoint.address = address
             progress = (imagesize - remaining) * 100.0 / imagesize
             logger.info('Address: {:#08x}; Count: {}; Remain: {:#08x}; Progress: {:.2f}%; Time: {:.2f}s'.format(address, count, remaining, progress, elapsedtime))
 
         elapsedtime = time.time()-starttime
         logger.info('Total module FW download time: %.2f s' %elapsedtime)
 
-        time.sleep(2)
         # complete FW download (CMD 0107h)
         fw_complete_status = self.cdb.validate_fw_image()
+        self.invalidate_cache()
+        # The download is over whether the image is valid or not
+        self._fw_download_checkpoint = None
         if fw_complete_status == 1:
             string = 'Module FW download complete: Success'
             logger.info(string)
@@ -2346,22 +2458,60 @@ class CmisApi(XcvrApi):
             pass
 
         if not self.is_flat_memory():
-            fault_types = {
-                'tx{lane_num}fault': self.get_tx_fault(),
-                'rx{lane_num}los': self.get_rx_los(),
-                'tx{lane_num}los_hostlane': self.get_tx_los(),
-                'tx{lane_num}cdrlol_hostlane': self.get_tx_cdr_lol(),
-                'tx{lane_num}_eq_fault': self.get_tx_adaptive_eq_fail_flag(),
-                'rx{lane_num}cdrlol': self.get_rx_cdr_lol()
-            }
-
-            for fault_type_template, fault_values in fault_types.items():
-                for lane in range(1, self.NUM_CHANNELS + 1):
-                    key = fault_type_template.format(lane_num=lane)
-                    status_flags_dict[key] = fault_values[lane - 1] if fault_values else "N/A"
+            status_flags_dict.update(self._read_lane_flags('status', self._get_lane_status_flags))
 
         return status_flags_dict
 
+    def _get_lane_status_flags(self):
+        """
+        Returns the lane-specific (page 11h) part of get_transceiver_status_flags()
+        """
+        status_flags_dict = dict()
+        fault_types = {
+            'tx{lane_num}fault': self.get_tx_fault(),
+            'rx{lane_num}los': self.get_rx_los(),
+            'tx{lane_num}los_hostlane': self.get_tx_los(),
+            'tx{lane_num}cdrlol_hostlane': self.get_tx_cdr_lol(),
+            'tx{lane_num}_eq_fault': self.get_tx_adaptive_eq_fail_flag(),
+            'rx{lane_num}cdrlol': self.get_rx_cdr_lol()
+        }
+
+        for fault_type_template, fault_values in fault_types.items():
+            for lane in range(1, self.NUM_CHANNELS + 1):
+                key = fault_type_template.format(lane_num=lane)
+                status_flags_dict[key] = fault_values[lane - 1] if fault_values else "N/A"
+
+        return status_flags_dict
+
+    def get_lane_flags_summary(self):
+        '''
+        This function returns the lane-specific flags summary of bank 0 (lower page byte 4),
+        non-zero if any latched flag of page 11h is set. None if the module does not
+        advertise the summary (flat memory or CMIS < 5.0)
+        '''
+        if self.is_flat_memory():
+            return None
+        try:
+            if int(self.get_cmis_rev().split('.')[0]) < 5:
+                return None
+        except (ValueError, AttributeError):
+            return None
+        return self.xcvr_eeprom.read(consts.LANE_FLAGS_SUMMARY_BANK0)
+
+    def _read_lane_flags(self, kind, read_lane_flags):
+        """
+        Returns read_lane_flags(), or in flag summary polling mode, the previous full read
+        of this kind with all flags cleared while the lane flags summary reports no latched flag
+        """
+        if not self.flag_summary_polling:
+            return read_lane_flags()
+        last = self._last_lane_flags.get(kind)
+        if last is not None and self.get_lane_flags_summary() == 0:
+            return {key: False if isinstance(value, bool) else value for key, value in last.items()}
+        lane_flags = read_lane_flags()
+        self._last_lane_flags[kind] = lane_flags
+        return lane_flags
+
     def get_transceiver_loopback(self):
         """
         Retrieves loopback mode for this xcvr
@@ -2720,6 +2870,7 @@ class CmisApi(XcvrApi):
         return [bool(datapath_deinit & (1 << lane)) for lane in range(self.NUM_CHANNELS)]
 
     @read_only_cached_api_return
+    @memoized_eeprom_reads
     def get_application_advertisement(self):
         """
         Get the application advertisement of the CMIS transceiver
@@ -3,10 +3,14 @@
 
     Implementation of APIs related to CDB commands
 """
+from concurrent.futures import Future
+from contextlib import contextmanager
 import logging
 from ...fields import consts
+from ...utils.polling import BackoffPoller, poll_with_backoff, POLL_MAX_INTERVAL
 from ..xcvr_api import XcvrApi
 import struct
+import threading
 import time
 
 logger = logging.getLogger(__name__)
@@ -18,8 +22,25 @@ CDB_WRITE_MSG_START = 130
 PAGE_LENGTH = 128
 INIT_OFFSET = 128
 CMDLEN = 2
+BANK_SELECT_OFFSET = 126
+CDB_INSTANCE_1 = 1
+CDB_INSTANCE_2 = 2
+# Status field of each CDB instance
+CDB_STATUS_FIELDS = {CDB_INSTANCE_1: consts.CDB1_STATUS, CDB_INSTANCE_2: consts.CDB2_STATUS}
 MAX_WAIT = 600
-MAX_CDB_CMD_FOREGROUND_PROCESSING_TIME_tCDBF = 5  # seconds, as per tCDBF in CMIS spec
+CDB_CMD_CAPTURE_TIME = 0.1  # seconds, as per tCDBC in CMIS spec
+CDB_STATUS_TIMEOUT_MARGIN = 1  # seconds added to the module advertised max durations
+
+CDB_START_FW_DOWNLOAD_CMD = 0x0101
+CDB_ABORT_FW_DOWNLOAD_CMD = 0x0102
+CDB_WRITE_FW_LPL_CMD = 0x0103
+CDB_WRITE_FW_EPL_CMD = 0x0104
+CDB_COMPLETE_FW_DOWNLOAD_CMD = 0x0107
+CDB_COPY_FW_IMAGE_CMD = 0x0108
+# Commands whose max duration is advertised in the reply of CMD 0041h, in reply order
+CDB_FW_CMDS_WITH_MAX_DURATION = (CDB_START_FW_DOWNLOAD_CMD, CDB_ABORT_FW_DOWNLOAD_CMD,
+                                 CDB_WRITE_FW_LPL_CMD, CDB_COMPLETE_FW_DOWNLOAD_CMD,
+                                 CDB_COPY_FW_IMAGE_CMD)
 
 
 class CmisCdbApi(XcvrApi):
@@ -27,8 +48,63 @@ class CmisCdbApi(XcvrApi):
         super(CmisCdbApi, self).__init__(xcvr_eeprom)
         self.cdb_instance_supported = self.xcvr_eeprom.read(consts.CDB_SUPPORT)
         self.failed_status_dict = self.xcvr_eeprom.mem_map.codes.CDB_FAIL_STATUS
+        # Module advertised max duration (seconds) of each command id, see get_fw_management_features
+        self.cdb_cmd_max_duration = {}
+        # Measured seconds from write to completion of the last run of each command id
+        self.cdb_cmd_latency = {}
+        # (command id, write time) of the last command written to each CDB instance
+        self._pending_cmd = {}
+        # Last status read from each CDB instance
+        self.cdb_last_status = {instance: None for instance in CDB_STATUS_FIELDS}
+        self._instance_locks = {instance: threading.RLock() for instance in CDB_STATUS_FIELDS}
+        self._bank_lock = threading.RLock()
+        self._local = threading.local()
         #assert self.cdb_instance_supported != 0
 
+    def get_cdb_instance(self):
+        '''
+        This function returns the CDB instance the commands of the calling thread are
+        sent to, instance 1 unless selected with cdb_instance()
+        '''
+        return getattr(self._local, 'instance', CDB_INSTANCE_1)
+
+    @contextmanager
+    def cdb_instance(self, instance):
+        '''
+        This context manager sends the CDB commands of the calling thread to a CDB
+        instance, holding the instance so that the commands of other threads on the
+        same instance wait while those on the other instance proceed in parallel.
+        CDB instance 2 is only available if the module advertises two instances
+        in CdbInstancesSupported (01h:163.7-6).
+        '''
+        assert instance in CDB_STATUS_FIELDS, 'Invalid CDB instance %r' % instance
+        if instance != CDB_INSTANCE_1:
+            assert (self.cdb_instance_supported or 0) >= instance, 'CDB instance %d not supported' % instance
+        with self._instance_locks[instance]:
+            previous = self.get_cdb_instance()
+            self._local.instance = instance
+            try:
+                yield
+            finally:
+                self._local.instance = previous
+
+    @contextmanager
+    def _select_bank(self):
+        '''
+        This context manager makes pages 9Fh-AFh address the CDB of the current
+        instance, CDB instance N living in bank N-1
+        '''
+        instance = self.get_cdb_instance()
+        with self._bank_lock:
+            if instance == CDB_INSTANCE_1:
+                yield
+                return
+            self.xcvr_eeprom.write_raw(BANK_SELECT_OFFSET, 1, bytearray([instance - 1]))
+            try:
+                yield
+            finally:
+                self.xcvr_eeprom.write_raw(BANK_SELECT_OFFSET, 1, bytearray([0]))
+
     def cdb1_chkflags(self):
         '''
         This function detects if there is datapath or module firmware fault.
@@ -75,9 +151,9 @@ class CmisCdbApi(XcvrApi):
             checksum += byte
         return 0xff - (checksum & 0xff)
 
-    def cdb1_chkstatus(self):
+    def cdb1_chkstatus(self, capture_time=0):
         '''
-        This function checks the CDB status.
+        This function checks the CDB status of the current CDB instance (see cdb_instance()).
         The format of returned values is busy flag, failed flag and cause
 
         CDB command status
@@ -120,35 +196,93 @@ class CmisCdbApi(XcvrApi):
             10h-1Fh=Reserved
             20h-2Fh=For individual STS command or task error
             30h-3Fh=Custom
-        '''
-        status = self.xcvr_eeprom.read(consts.CDB1_STATUS)
-        is_busy = bool(((0x80 if status is None else status) >> 7) & 0x1)
-        cnt = 0
-        while is_busy and cnt < MAX_WAIT:
-            time.sleep(0.1)
-            status = self.xcvr_eeprom.read(consts.CDB1_STATUS)
-            is_busy = bool(((0x80 if status is None else status) >> 7) & 0x1)
-            cnt += 1
+
+        The status is polled with an exponential backoff starting well below a
+        millisecond, for at most the max duration the module advertised for the
+        last written command (plus a margin), MAX_WAIT polling intervals otherwise.
+
+        With capture_time, a status that is not busy is only trusted once the module
+        was seen busy or capture_time seconds elapsed since the command was written,
+        as it may still be the status of the previous command.
+        '''
+        cmd_id, poll, done, timeout, start = self._cdb1_status_polling(capture_time)
+        status, elapsed, completed = poll_with_backoff(poll, done, timeout, start=start)
+        return self._cdb1_status_completed(cmd_id, status, elapsed, completed)
+
+    def cdb1_chkstatus_async(self, capture_time=0, poller=None):
+        '''
+        This function checks the CDB status the same as cdb1_chkstatus() without
+        blocking the caller: the status is polled by poller (the shared BackoffPoller
+        by default), letting the CDB commands of many modules overlap.
+        It returns a concurrent.futures.Future resolving to the cdb1_chkstatus() result.
+        '''
+        cmd_id, poll, done, timeout, start = self._cdb1_status_polling(capture_time)
+        poller = BackoffPoller.get_shared() if poller is None else poller
+        poll_future = poller.submit(poll, done, timeout, start=start)
+        future = Future()
+        future.set_running_or_notify_cancel()
+
+        def complete(poll_future):
+            try:
+                future.set_result(self._cdb1_status_completed(cmd_id, *poll_future.result()))
+            except Exception as e:
+                future.set_exception(e)
+        poll_future.add_done_callback(complete)
+        return future
+
+    def _cdb1_status_polling(self, capture_time):
+        '''
+        This function returns the command id, poll and done callables, timeout and
+        start time to poll the CDB status of the last written command with
+        '''
+        instance = self.get_cdb_instance()
+        cmd_id, start = self._pending_cmd.pop(instance, (None, None))
+        max_duration = self.cdb_cmd_max_duration.get(cmd_id)
+        if max_duration is not None:
+            timeout = max_duration + CDB_STATUS_TIMEOUT_MARGIN
+        else:
+            timeout = MAX_WAIT * POLL_MAX_INTERVAL
+        busy_seen = [False]
+
+        def done(status, elapsed):
+            if bool(((0x80 if status is None else status) >> 7) & 0x1):
+                busy_seen[0] = True
+                return False
+            return busy_seen[0] or elapsed >= capture_time
+
+        def poll():
+            status = self.cdb_last_status[instance] = self.xcvr_eeprom.read(CDB_STATUS_FIELDS[instance])
+            return status
+
+        return cmd_id, poll, done, timeout, start
+
+    def _cdb1_status_completed(self, cmd_id, status, elapsed, completed):
+        if completed and cmd_id is not None:
+            self.cdb_cmd_latency[cmd_id] = elapsed
+            logger.debug('CDB command {:#06x} completed in {:.2f} ms'.format(cmd_id, elapsed * 1000))
         return status
 
     def write_cdb(self, cmd):
         '''
-        This function writes a CDB command to page 0x9f
+        This function writes a CDB command to page 0x9f of the current CDB instance
         '''
-        self.xcvr_eeprom.write_raw(LPLPAGE*PAGE_LENGTH+CDB_WRITE_MSG_START, len(cmd)-CMDLEN, cmd[CMDLEN:])
-        self.xcvr_eeprom.write_raw(LPLPAGE*PAGE_LENGTH+INIT_OFFSET, CMDLEN, cmd[:CMDLEN])
+        with self._select_bank():
+            self.xcvr_eeprom.write_raw(LPLPAGE*PAGE_LENGTH+CDB_WRITE_MSG_START, len(cmd)-CMDLEN, cmd[CMDLEN:])
+            self.xcvr_eeprom.write_raw(LPLPAGE*PAGE_LENGTH+INIT_OFFSET, CMDLEN, cmd[:CMDLEN])
+        self._pending_cmd[self.get_cdb_instance()] = ((cmd[0] << 8) | cmd[1], time.monotonic())
 
     def read_cdb(self):
         '''
-        This function reads the reply of a CDB command from page 0x9f.
+        This function reads the reply of a CDB command from page 0x9f of the current CDB instance.
         It returns the reply message of a CDB command.
         rpllen is the length (number of bytes) of rpl
         rpl_chkcode is the check code of rpl and can be calculated by cdb_chkcode()
         rpl is the reply message.
         '''
-        rpllen = self.xcvr_eeprom.read(consts.CDB_RPL_LENGTH)
-        rpl_chkcode = self.xcvr_eeprom.read(consts.CDB_RPL_CHKCODE)
-        rpl = self.xcvr_eeprom.read_raw(LPLPAGE*PAGE_LENGTH+CDB_RPL_OFFSET, rpllen)
+        with self._select_bank():
+            rpllen = self.xcvr_eeprom.read(consts.CDB_RPL_LENGTH)
+            rpl_chkcode = self.xcvr_eeprom.read(consts.CDB_RPL_CHKCODE)
+            rpl = self.xcvr_eeprom.read_raw(LPLPAGE*PAGE_LENGTH+CDB_RPL_OFFSET, rpllen)
         return rpllen, rpl_chkcode, rpl
 
     # Query status
@@ -241,8 +375,28 @@ class CmisCdbApi(XcvrApi):
         logger.info(txt)
 
         rpl = self.read_cdb()
+        if status == 0x1:
+            self.set_cdb_cmd_max_durations(rpl[2])
         return {'status': status, 'rpl': rpl}
 
+    def set_cdb_cmd_max_durations(self, rpl):
+        '''
+        This function records the max durations of the firmware management commands
+        advertised in the reply message of CDB command 0041h (bytes 144-153), in
+        units of 1 ms, or of 10 ms if bit 3 of byte 137 is set. A max duration of 0
+        is not advertised.
+        '''
+        if rpl is None or len(rpl) < 18:
+            return
+        unit = 0.01 if (rpl[1] >> 3) & 0x1 else 0.001
+        for i, cmd_id in enumerate(CDB_FW_CMDS_WITH_MAX_DURATION):
+            duration = (rpl[8 + 2 * i] << 8) | rpl[9 + 2 * i]
+            if duration:
+                self.cdb_cmd_max_duration[cmd_id] = duration * unit
+        # The advertised max duration of a block write applies to LPL and EPL writes
+        if CDB_WRITE_FW_LPL_CMD in self.cdb_cmd_max_duration:
+            self.cdb_cmd_max_duration[CDB_WRITE_FW_EPL_CMD] = self.cdb_cmd_max_duration[CDB_WRITE_FW_LPL_CMD]
+
     # Get FW info
     def get_fw_info(self):
         '''
@@ -285,8 +439,7 @@ class CmisCdbApi(XcvrApi):
         cmd += header
         cmd[133-INIT_OFFSET] = self.cdb_chkcode(cmd)
         self.write_cdb(cmd)
-        time.sleep(MAX_CDB_CMD_FOREGROUND_PROCESSING_TIME_tCDBF)
-        status = self.cdb1_chkstatus()
+        status = self.cdb1_chkstatus(CDB_CMD_CAPTURE_TIME)
         if (status != 0x1):
             if status > 127:
                 txt = 'Start firmware download status: Busy'
@@ -336,8 +489,8 @@ class CmisCdbApi(XcvrApi):
         cmd[138-INIT_OFFSET] = (addr >> 8)  & 0xff
         cmd[139-INIT_OFFSET] = (addr >> 0)  & 0xff
         # pad data to 116 bytes just in case, make sure to fill all 0x9f page
-        paddedPayload = data.ljust(116, b'\x00')
-        cmd += paddedPayload
+        cmd += data
+        cmd += bytes(max(0, 116 - len(data)))
         cmd[133-INIT_OFFSET] = self.cdb_chkcode(cmd)
         self.write_cdb(cmd)
         status = self.cdb1_chkstatus()
@@ -360,31 +513,33 @@ class CmisCdbApi(XcvrApi):
         '''
         epl_len = len(data)
         subtime = time.time()
-        if not autopaging_flag:
-            pages = epl_len // PAGE_LENGTH
-            if (epl_len % PAGE_LENGTH) != 0:
-                pages += 1
-            # write to page 0xA0 - 0xAF (max of 16 pages)
-            for pageoffset in range(pages):
-                next_page = 0xa0 + pageoffset
-                if PAGE_LENGTH*(pageoffset + 1) <= epl_len:
-                    datachunk = data[PAGE_LENGTH*pageoffset : PAGE_LENGTH*(pageoffset + 1)]
-                    self.xcvr_eeprom.write_raw(next_page*PAGE_LENGTH+INIT_OFFSET, PAGE_LENGTH, datachunk)
-                else:
-                    datachunk = data[PAGE_LENGTH*pageoffset : ]
-                    self.xcvr_eeprom.write_raw(next_page*PAGE_LENGTH+INIT_OFFSET, len(datachunk), datachunk)
-        else:
-            sections = epl_len // writelength
-            if (epl_len % writelength) != 0:
-                sections += 1
-            # write to page 0xA0 - 0xAF (max of 16 pages), with length of writelength per piece
-            for offset in range(0, epl_len, writelength):
-                if offset + writelength <= epl_len:
-                    datachunk = data[offset : offset + writelength]
-                    self.xcvr_eeprom.write_raw(0xA0*PAGE_LENGTH+offset+INIT_OFFSET, writelength, datachunk)
-                else:
-                    datachunk = data[offset : ]
-                    self.xcvr_eeprom.write_raw(0xA0*PAGE_LENGTH+offset+INIT_OFFSET, len(datachunk), datachunk)
+        # The EPL pages of the current CDB instance
+        with self._select_bank():
+            if not autopaging_flag:
+                pages = epl_len // PAGE_LENGTH
+                if (epl_len % PAGE_LENGTH) != 0:
+                    pages += 1
+                # write to page 0xA0 - 0xAF (max of 16 pages)
+                for pageoffset in range(pages):
+                    next_page = 0xa0 + pageoffset
+                    if PAGE_LENGTH*(pageoffset + 1) <= epl_len:
+                        datachunk = data[PAGE_LENGTH*pageoffset : PAGE_LENGTH*(pageoffset + 1)]
+                        self.xcvr_eeprom.write_raw(next_page*PAGE_LENGTH+INIT_OFFSET, PAGE_LENGTH, datachunk)
+                    else:
+                        datachunk = data[PAGE_LENGTH*pageoffset : ]
+                        self.xcvr_eeprom.write_raw(next_page*PAGE_LENGTH+INIT_OFFSET, len(datachunk), datachunk)
+            else:
+                sections = epl_len // writelength
+                if (epl_len % writelength) != 0:
+                    sections += 1
+                # write to page 0xA0 - 0xAF (max of 16 pages), with length of writelength per piece
+                for offset in range(0, epl_len, writelength):
+                    if offset + writelength <= epl_len:
+                        datachunk = data[offset : offset + writelength]
+                        self.xcvr_eeprom.write_raw(0xA0*PAGE_LENGTH+offset+INIT_OFFSET, writelength, datachunk)
+                    else:
+                        datachunk = data[offset : ]
+                        self.xcvr_eeprom.write_raw(0xA0*PAGE_LENGTH+offset+INIT_OFFSET, len(datachunk), datachunk)
         subtimeint = time.time()-subtime
         logger.info('%dB write time:  %.2fs' %(epl_len, subtimeint))
         cmd = bytearray(b'\x01\x04\x08\x00\x04\x00\x00\x00')
@@ -416,8 +571,7 @@ class CmisCdbApi(XcvrApi):
         cmd = bytearray(b'\x01\x07\x00\x00\x00\x00\x00\x00')
         cmd[133-INIT_OFFSET] = self.cdb_chkcode(cmd)
         self.write_cdb(cmd)
-        time.sleep(MAX_CDB_CMD_FOREGROUND_PROCESSING_TIME_tCDBF)
-        status = self.cdb1_chkstatus()
+        status = self.cdb1_chkstatus(CDB_CMD_CAPTURE_TIME)
         if (status != 0x1):
             if status > 127:
                 txt = 'Firmware download complete status: Busy'
@@ -6,7 +6,9 @@
 
 from ...fields import consts
 from ..xcvr_api import XcvrApi
+import array
 import struct
+import sys
 import time
 
 PAGE_SIZE = 128
@@ -16,6 +18,45 @@ VDM_SIZE = 2
 VDM_FLAG_PAGE = 0x2c
 VDM_FREEZE = 128
 VDM_UNFREEZE = 0
+VDM_START_PAGE = 0x20
+# Active firmware major and minor revisions (page 00h bytes 39-40), a change of which invalidates the VDM layout
+VDM_FW_VERSION_OFFSET = 39
+VDM_FW_VERSION_SIZE = 2
+# Multipliers of the F16 mantissa, indexed by the 5-bit scale exponent
+F16_SCALES = [10**(scale_exponent-24) for scale_exponent in range(32)]
+
+def unpack_u16_words(raw_data):
+    '''
+    Returns the big-endian unsigned 16-bit words of raw_data as an array
+    '''
+    words = array.array('H', bytes(raw_data))
+    if sys.byteorder == 'little':
+        words.byteswap()
+    return words
+
+class VdmLayout(object):
+    """
+    Layout of the VDM observables of a module, decoded once from its descriptor pages
+    (20h-23h) and threshold pages (28h-2Bh), which do not change while the same
+    firmware runs
+
+    Attributes:
+        fw_version: active firmware revision bytes the layout was read with
+        groups: number of VDM groups (pages) supported, minus one
+        pages: list of (page, entries) pairs, entries being the list of the
+               (word, vdm_type, lane, vdm_format, multiplier, obs_type, thresholds,
+               flag_offset, bit_offset) of the known observables of the page. word is
+               the index of the value in the value pages (24h-27h) read as one,
+               thresholds the decoded [high alarm, low alarm, high warn, low warn]
+               (None if the format is unknown), flag_offset and bit_offset locate the
+               flags in page 2Ch.
+    """
+    __slots__ = ("fw_version", "groups", "pages")
+
+    def __init__(self, fw_version, groups, pages):
+        self.fw_version = fw_version
+        self.groups = groups
+        self.pages = pages
 
 class CmisVdmApi(XcvrApi):
 
@@ -29,8 +70,38 @@ class CmisVdmApi(XcvrApi):
     VDM_OBSERVABLE_STATISTIC = 0x2  # Statistic (min/max/avg) observable types
     VDM_OBSERVABLE_ALL = 0x3        # Both basic and statistic
 
+    bulk_read_enabled = False
+
+    @classmethod
+    def set_bulk_read_enabled(cls, enabled: bool):
+        """
+        Set the bulk_read_enabled flag. When set, get_vdm_page() reads each VDM value
+        and threshold page with a single read instead of one read per descriptor.
+        """
+        cls.bulk_read_enabled = bool(enabled)
+
+    # When enabled, get_vdm_allpage() reads the descriptor and threshold pages once per firmware
+    layout_cache_enabled = False
+
+    @classmethod
+    def set_layout_cache_enabled(cls, enabled: bool):
+        """
+        Set the layout_cache_enabled flag. When set, get_vdm_allpage() decodes the VDM
+        descriptor and threshold pages into a VdmLayout once, and then only reads the
+        value pages and the flag page until the module firmware changes.
+        """
+        cls.layout_cache_enabled = bool(enabled)
+
     def __init__(self, xcvr_eeprom):
         super(CmisVdmApi, self).__init__(xcvr_eeprom)
+        # VdmLayout of the module, in layout_cache_enabled mode
+        self._vdm_layout = None
+
+    def invalidate_layout(self):
+        """
+        Drops the cached VdmLayout, e.g. on module insertion or firmware change
+        """
+        self._vdm_layout = None
     
     def get_F16(self, value):
         '''
@@ -41,6 +112,27 @@ class CmisVdmApi(XcvrApi):
         result = mantissa*10**(scale_exponent-24)
         return result
 
+    def get_F16_values(self, values):
+        '''
+        This function converts a sequence of raw data to "F16" format defined in cmis.
+        '''
+        return [(value & 0x7ff) * F16_SCALES[(value >> 11) & 0x1f] for value in values]
+
+    def decode_vdm_words(self, raw_data):
+        '''
+        This function decodes every 16-bit word of a raw VDM value or threshold page
+        in a single pass, for each of the S16, U16 and F16 formats defined in cmis.
+
+        Returns a dictionary, key is the format; value is the list of decoded words (unscaled).
+        '''
+        unsigned = unpack_u16_words(raw_data)
+        signed = array.array('h', unsigned.tobytes())
+        return {
+            'S16': signed,
+            'U16': unsigned,
+            'F16': self.get_F16_values(unsigned),
+        }
+
     def get_vdm_page(self, page, VDM_flag_page, field_option=ALL_FIELD, observable_type=VDM_OBSERVABLE_ALL):
         '''
         This function returns VDM items from a specific VDM page.
@@ -69,6 +161,8 @@ class CmisVdmApi(XcvrApi):
         '''
         if page not in [0x20, 0x21, 0x22, 0x23]:
             raise ValueError('Page not in VDM Descriptor range!')
+        if self.bulk_read_enabled:
+            return self.get_vdm_page_bulk(page, VDM_flag_page, field_option, observable_type)
         vdm_descriptor = self.xcvr_eeprom.read_raw(page * PAGE_SIZE + PAGE_OFFSET, PAGE_SIZE)
         if not vdm_descriptor:
             return {}
@@ -200,6 +294,77 @@ class CmisVdmApi(XcvrApi):
                     vdm_low_warn_flag]
         return vdm_Page_data
 
+    def get_vdm_page_bulk(self, page, VDM_flag_page, field_option=ALL_FIELD, observable_type=VDM_OBSERVABLE_ALL):
+        '''
+        This function returns VDM items from a specific VDM page, in the same format as get_vdm_page().
+        The descriptor page, value page (page + 4) and threshold page (page + 8) are each read
+        with a single read and all their entries are decoded in one pass.
+
+        Args:
+            page: VDM descriptor page (0x20-0x23)
+            VDM_flag_page: Raw flag page data or None
+            field_option: Bitmask to select real value, threshold, and/or flag fields
+            observable_type: Bitmask to filter by observable type, see get_vdm_page()
+        '''
+        if page not in [0x20, 0x21, 0x22, 0x23]:
+            raise ValueError('Page not in VDM Descriptor range!')
+        vdm_descriptor = self.xcvr_eeprom.read_raw(page * PAGE_SIZE + PAGE_OFFSET, PAGE_SIZE, True)
+        if not vdm_descriptor:
+            return {}
+
+        vdm_values = None
+        if field_option & self.VDM_REAL_VALUE:
+            vdm_value_raw = self.xcvr_eeprom.read_raw((page + 4) * PAGE_SIZE + PAGE_OFFSET, PAGE_SIZE, True)
+            if not vdm_value_raw:
+                return {}
+            vdm_values = self.decode_vdm_words(vdm_value_raw)
+
+        vdm_thrshs = None
+        if field_option & self.VDM_THRESHOLD:
+            vdm_thrsh_raw = self.xcvr_eeprom.read_raw((page + 8) * PAGE_SIZE + PAGE_OFFSET, PAGE_SIZE, True)
+            if not vdm_thrsh_raw:
+                return {}
+            vdm_thrshs = self.decode_vdm_words(vdm_thrsh_raw)
+
+        vdm_Page_data = {}
+        VDM_TYPE_DICT = self.xcvr_eeprom.mem_map.codes.VDM_TYPE
+        for index in range(PAGE_SIZE // VDM_SIZE):
+            typeID = vdm_descriptor[2 * index + 1]
+            if typeID not in VDM_TYPE_DICT:
+                continue
+
+            vdm_info_dict = VDM_TYPE_DICT[typeID]
+            vdm_obs_type = vdm_info_dict[3] if len(vdm_info_dict) > 3 else 'B'
+            if vdm_obs_type == 'B' and not (observable_type & self.VDM_OBSERVABLE_BASIC):
+                continue
+            if vdm_obs_type == 'S' and not (observable_type & self.VDM_OBSERVABLE_STATISTIC):
+                continue
+
+            vdm_type, vdm_format, scale = vdm_info_dict[0], vdm_info_dict[1], vdm_info_dict[2]
+            if vdm_format not in ('S16', 'U16', 'F16') and field_option & (self.VDM_REAL_VALUE | self.VDM_THRESHOLD):
+                continue
+            # F16 values carry their own scale
+            multiplier = 1 if vdm_format == 'F16' else scale
+
+            vdm_value = None
+            if vdm_values is not None:
+                vdm_value = vdm_values[vdm_format][index] * multiplier
+
+            vdm_thrshs_item = [None] * 4
+            if vdm_thrshs is not None:
+                thrsh_index = (vdm_descriptor[2 * index] >> 4) * (THRSH_SPACING // VDM_SIZE)
+                vdm_thrshs_item = [value * multiplier for value in
+                                   vdm_thrshs[vdm_format][thrsh_index:thrsh_index + 4]]
+
+            vdm_flags = [None] * 4
+            if VDM_flag_page:
+                flag_byte = VDM_flag_page[32 * (page - 0x20) + index // 2] >> (4 * (index % 2))
+                vdm_flags = [bool((flag_byte >> bit) & 0x1) for bit in range(4)]
+
+            vdm_lane = (vdm_descriptor[2 * index] & 0xf) + 1
+            vdm_Page_data.setdefault(vdm_type, {})[vdm_lane] = [vdm_value] + vdm_thrshs_item + vdm_flags
+        return vdm_Page_data
+
     def get_vdm_allpage(self, field_option=ALL_FIELD, observable_type=VDM_OBSERVABLE_ALL):
         '''
         This function returns VDM items from all advertised VDM pages.
@@ -224,13 +389,17 @@ class CmisVdmApi(XcvrApi):
                 VDM_OBSERVABLE_STATISTIC (0x2) for statistic (min/max/avg) types,
                 VDM_OBSERVABLE_ALL (0x3) for both.
         '''
+        if self.layout_cache_enabled:
+            layout = self.get_vdm_layout()
+            if layout is None:
+                return None
+            return self.get_vdm_allpage_cached(layout, field_option, observable_type)
         vdm_pages_supported = self.xcvr_eeprom.read(consts.VDM_SUPPORTED)
         if not vdm_pages_supported:
             return None
         vdm_groups_supported_raw = self.xcvr_eeprom.read(consts.VDM_SUPPORTED_PAGE)
         if vdm_groups_supported_raw is None:
             return None
-        VDM_START_PAGE = 0x20
         vdm = dict()
 
         if field_option & self.VDM_FLAG:
@@ -243,6 +412,112 @@ class CmisVdmApi(XcvrApi):
             vdm.update(vdm_current_page)
         return vdm
 
+    def get_vdm_layout(self):
+        '''
+        This function returns the VdmLayout of the module, decoding it again when the
+        active firmware revision changed since it was decoded.
+        Returns None if VDM is not supported or the layout cannot be read.
+        '''
+        fw_version = self.xcvr_eeprom.read_raw(VDM_FW_VERSION_OFFSET, VDM_FW_VERSION_SIZE, True)
+        if fw_version is None:
+            return None
+        fw_version = bytes(fw_version)
+        if self._vdm_layout is None or self._vdm_layout.fw_version != fw_version:
+            self._vdm_layout = self._read_vdm_layout(fw_version)
+        return self._vdm_layout
+
+    def _read_vdm_layout(self, fw_version):
+        '''
+        This function reads and decodes the descriptor and threshold pages of all the
+        advertised VDM groups into a VdmLayout, None if any of them cannot be read.
+        '''
+        vdm_pages_supported = self.xcvr_eeprom.read(consts.VDM_SUPPORTED)
+        if not vdm_pages_supported:
+            return None
+        vdm_groups_supported_raw = self.xcvr_eeprom.read(consts.VDM_SUPPORTED_PAGE)
+        if vdm_groups_supported_raw is None:
+            return None
+        VDM_TYPE_DICT = self.xcvr_eeprom.mem_map.codes.VDM_TYPE
+        pages = []
+        for page in range(VDM_START_PAGE, VDM_START_PAGE + vdm_groups_supported_raw + 1):
+            vdm_descriptor = self.xcvr_eeprom.read_raw(page * PAGE_SIZE + PAGE_OFFSET, PAGE_SIZE, True)
+            vdm_thrsh_raw = self.xcvr_eeprom.read_raw((page + 8) * PAGE_SIZE + PAGE_OFFSET, PAGE_SIZE, True)
+            if not vdm_descriptor or not vdm_thrsh_raw:
+                return None
+            vdm_thrshs = self.decode_vdm_words(vdm_thrsh_raw)
+            entries = []
+            for index in range(PAGE_SIZE // VDM_SIZE):
+                typeID = vdm_descriptor[2 * index + 1]
+                if typeID not in VDM_TYPE_DICT:
+                    continue
+                vdm_info_dict = VDM_TYPE_DICT[typeID]
+                vdm_obs_type = vdm_info_dict[3] if len(vdm_info_dict) > 3 else 'B'
+                vdm_type, vdm_format, scale = vdm_info_dict[0], vdm_info_dict[1], vdm_info_dict[2]
+                # F16 values carry their own scale
+                multiplier = 1 if vdm_format == 'F16' else scale
+                thresholds = None
+                if vdm_format in ('S16', 'U16', 'F16'):
+                    thrsh_index = (vdm_descriptor[2 * index] >> 4) * (THRSH_SPACING // VDM_SIZE)
+                    thresholds = [value * multiplier for value in
+                                  vdm_thrshs[vdm_format][thrsh_index:thrsh_index + 4]]
+                word = (page - VDM_START_PAGE) * (PAGE_SIZE // VDM_SIZE) + index
+                vdm_lane = (vdm_descriptor[2 * index] & 0xf) + 1
+                entries.append((word, vdm_type, vdm_lane, vdm_format, multiplier, vdm_obs_type, thresholds,
+                                32 * (page - VDM_START_PAGE) + index // 2, 4 * (index % 2)))
+            pages.append((page, entries))
+        return VdmLayout(fw_version, vdm_groups_supported_raw, pages)
+
+    def get_vdm_allpage_cached(self, layout, field_option=ALL_FIELD, observable_type=VDM_OBSERVABLE_ALL):
+        '''
+        This function returns VDM items from all advertised VDM pages, in the same format
+        as get_vdm_allpage(), reading only the value pages (24h-27h, with a single read)
+        and the flag page 2Ch, the rest being taken from layout.
+
+        Args:
+            layout: VdmLayout of the module, see get_vdm_layout()
+            field_option: Bitmask to select real value, threshold, and/or flag fields
+            observable_type: Bitmask to filter by observable type, see get_vdm_allpage()
+        '''
+        vdm_values = None
+        if field_option & self.VDM_REAL_VALUE:
+            vdm_value_raw = self.xcvr_eeprom.read_raw((VDM_START_PAGE + 4) * PAGE_SIZE + PAGE_OFFSET,
+                                                      (layout.groups + 1) * PAGE_SIZE, True)
+            if not vdm_value_raw:
+                return {}
+            vdm_values = self.decode_vdm_words(vdm_value_raw)
+
+        if field_option & self.VDM_FLAG:
+            vdm_flag_page = self.xcvr_eeprom.read_raw(VDM_FLAG_PAGE * PAGE_SIZE + PAGE_OFFSET, PAGE_SIZE)
+        else:
+            vdm_flag_page = None
+
+        vdm = dict()
+        for page, entries in layout.pages:
+            vdm_Page_data = {}
+            for (word, vdm_type, vdm_lane, vdm_format, multiplier, vdm_obs_type, thresholds,
+                 flag_offset, bit_offset) in entries:
+                if vdm_obs_type == 'B' and not (observable_type & self.VDM_OBSERVABLE_BASIC):
+                    continue
+                if vdm_obs_type == 'S' and not (observable_type & self.VDM_OBSERVABLE_STATISTIC):
+                    continue
+                if thresholds is None and field_option & (self.VDM_REAL_VALUE | self.VDM_THRESHOLD):
+                    continue
+
+                vdm_value = None
+                if vdm_values is not None:
+                    vdm_value = vdm_values[vdm_format][word] * multiplier
+
+                vdm_thrshs_item = list(thresholds) if field_option & self.VDM_THRESHOLD else [None] * 4
+
+                vdm_flags = [None] * 4
+                if vdm_flag_page:
+                    flag_byte = vdm_flag_page[flag_offset] >> bit_offset
+                    vdm_flags = [bool((flag_byte >> bit) & 0x1) for bit in range(4)]
+
+                vdm_Page_data.setdefault(vdm_type, {})[vdm_lane] = [vdm_value] + vdm_thrshs_item + vdm_flags
+            vdm.update(vdm_Page_data)
+        return vdm
+
     def is_vdm_statistic_supported(self):
         '''
         Checks whether the optic advertises any VDM statistic observable types
@@ -258,7 +533,6 @@ class CmisVdmApi(XcvrApi):
         if vdm_groups_supported_raw is None:
             return False
 
-        VDM_START_PAGE = 0x20
         VDM_TYPE_DICT = self.xcvr_eeprom.mem_map.codes.VDM_TYPE
 
         for page in range(VDM_START_PAGE, VDM_START_PAGE + vdm_groups_supported_raw + 1):
@@ -6,6 +6,7 @@
 """
 from ...fields import consts
 from ..xcvr_api import XcvrApi
+from ...utils.cache import memoized_eeprom_reads
 
 class Sff8472Api(XcvrApi):
     NUM_CHANNELS = 1
@@ -19,6 +20,7 @@ class Sff8472Api(XcvrApi):
     def get_serial(self):
         return self.xcvr_eeprom.read(consts.VENDOR_SERIAL_NO_FIELD)
 
+    @memoized_eeprom_reads
     def get_transceiver_info(self):
         serial_id = self.xcvr_eeprom.read(consts.SERIAL_ID_FIELD)
         if serial_id is None:
@@ -110,6 +112,7 @@ class Sff8472Api(XcvrApi):
 
         return trans_status_flags
 
+    @memoized_eeprom_reads
     def get_transceiver_dom_real_value(self):
         """
         Retrieves DOM sensor values for this transceiver
@@ -151,6 +154,7 @@ class Sff8472Api(XcvrApi):
 
         return bulk_status
 
+    @memoized_eeprom_reads
     def get_transceiver_threshold_info(self):
         """
         Retrieves threshold info for this xcvr
@@ -14,12 +14,27 @@ from ...codes.public.sff8636 import Sff8636Codes
 class Sff8636Api(XcvrApi):
     NUM_CHANNELS = 4
     POWER_CLASS_PATTERN = r'^Power Class ([1-8])'
+    # Channel status, module monitor and channel monitor flags (lower page bytes 3-14)
+    LATCHED_FLAG_RANGES = ((3, 12),)
+
+    # When enabled, the LOS and Tx fault flags are only read while IntL is asserted
+    flag_summary_polling = False
+
+    @classmethod
+    def set_flag_summary_polling(cls, enabled: bool):
+        """
+        Set the flag_summary_polling flag to control whether get_transceiver_status_flags
+        skips the flag reads while the IntL interrupt is not asserted.
+        """
+        cls.flag_summary_polling = bool(enabled)
 
     def __init__(self, xcvr_eeprom):
         super(Sff8636Api, self).__init__(xcvr_eeprom)
         self._temp_support = None
         self._voltage_support = None
         self._is_copper = None
+        self._status_flags_masked = None
+        self._last_status_flags = None
 
     def get_model(self):
         return self.xcvr_eeprom.read(consts.VENDOR_PART_NO_FIELD)
@@ -111,6 +126,12 @@ class Sff8636Api(XcvrApi):
             dict: A dictionary containing boolean values for various flags, as defined in
                 the TRANSCEIVER_STATUS_FLAGS table in STATE_DB.
         """
+        if self.flag_summary_polling:
+            last = self._last_status_flags
+            if last is not None and self.get_interrupt_asserted() is False and \
+               self.get_status_flags_masked() is False:
+                return {key: False if isinstance(value, bool) else value for key, value in last.items()}
+
         rx_los = self.get_rx_los()
         tx_fault = self.get_tx_fault()
         read_failed = rx_los is None or \
@@ -124,8 +145,34 @@ class Sff8636Api(XcvrApi):
         for lane in range(1, len(tx_fault) + 1):
             trans_status_flags['tx%dfault' % lane] = tx_fault[lane - 1]
 
+        if self.flag_summary_polling:
+            self._last_status_flags = trans_status_flags
         return trans_status_flags
 
+    def get_interrupt_asserted(self):
+        """
+        Returns True if the IntL pin is asserted, i.e. an unmasked flag is latched, None on read failure
+        """
+        intl = self.xcvr_eeprom.read(consts.INTL_FIELD)
+        if intl is None:
+            return None
+        # Status bit reflects the active-low pin state
+        return not intl
+
+    def get_status_flags_masked(self):
+        """
+        Returns True if any LOS or Tx fault flag is masked from asserting IntL, None on read failure
+
+        The masks are read once, assuming they are not changed while the module is plugged.
+        """
+        if self._status_flags_masked is None:
+            los_mask = self.xcvr_eeprom.read(consts.LOS_MASK_FIELD)
+            tx_fault_mask = self.xcvr_eeprom.read(consts.TX_FAULT_MASK_FIELD)
+            if los_mask is None or tx_fault_mask is None:
+                return None
+            self._status_flags_masked = bool(los_mask & 0x0f or tx_fault_mask & 0x0f)
+        return self._status_flags_masked
+
     def get_transceiver_dom_real_value(self):
         """
         Retrieves DOM sensor values for this transceiver
@@ -5,10 +5,44 @@
     xcvrs in SONiC
 """
 from math import log10
+from ..utils.cache import invalidate_cached_api_returns
+
 class XcvrApi(object):
+    # (offset, size) ranges read by get_cache_fingerprint() to identify the plugged module
+    CACHE_FINGERPRINT_RANGES = ()
+    # (offset, size) ranges of the latched (clear-on-read) flags, see XcvrFlagAccumulator
+    LATCHED_FLAG_RANGES = ()
+
     def __init__(self, xcvr_eeprom):
         self.xcvr_eeprom = xcvr_eeprom
 
+    def get_cache_fingerprint(self):
+        """
+        Retrieves a cheap-to-read fingerprint of the plugged module, used to
+        invalidate cached API return values when the module is swapped
+
+        Returns:
+            A tuple of bytearrays read from CACHE_FINGERPRINT_RANGES, or None if
+            fingerprinting is not supported or a read failed
+        """
+        if not self.CACHE_FINGERPRINT_RANGES:
+            return None
+        fingerprint = []
+        for offset, size in self.CACHE_FINGERPRINT_RANGES:
+            raw_data = self.xcvr_eeprom.read_raw(offset, size, True)
+            if raw_data is None:
+                return None
+            fingerprint.append(bytes(raw_data))
+        return tuple(fingerprint)
+
+    def invalidate_cache(self):
+        """
+        Drops all cached API return values, e.g. on module insertion or removal
+        """
+        invalidate_cached_api_returns(self)
+        self.__dict__.pop('_cache_fingerprint', None)
+        self.__dict__.pop('_cache_fingerprint_time', None)
+
     @staticmethod
     def mw_to_dbm(mW):
         if mW == 0:
@@ -4,34 +4,159 @@
    CDB Command handler
 """
 
+from concurrent.futures import Future
+from contextlib import contextmanager
+import threading
 import time
 from ..fields import cdb_consts
+from ..utils.polling import BackoffPoller, poll_with_backoff
 from ..xcvr_eeprom import XcvrEeprom
 
+# (status field, busy bit, failed bit, result bits, command result field) of each CDB instance
+CDB_STATUS_FIELDS = {
+    cdb_consts.CDB_INSTANCE_1: (cdb_consts.CDB1_CMD_STATUS, cdb_consts.CDB1_IS_BUSY, cdb_consts.CDB1_HAS_FAILED,
+                                cdb_consts.CDB1_STATUS, cdb_consts.CDB1_COMMAND_RESULT),
+    cdb_consts.CDB_INSTANCE_2: (cdb_consts.CDB2_CMD_STATUS, cdb_consts.CDB2_IS_BUSY, cdb_consts.CDB2_HAS_FAILED,
+                                cdb_consts.CDB2_STATUS, cdb_consts.CDB2_COMMAND_RESULT),
+}
+
 class CdbCmdHandler(XcvrEeprom):
+    # Maximum number of bytes the writer accepts in a single transaction (e.g. the optoe
+    # write_max), None if the writer does not split writes
+    writer_max_length = None
+
+    @classmethod
+    def set_writer_max_length(cls, length):
+        """
+        Set the writer_max_length to bound the CDB command and EPL writes to what the
+        writer issues as a single transaction. None to only honor the module advertisement.
+        """
+        cls.writer_max_length = None if length is None else int(length)
+
     def __init__(self, reader, writer, mem_map):
         super(CdbCmdHandler, self).__init__(reader, writer, mem_map)
+        # Measured seconds from write to completion of the last run of each command id
+        self.cmd_latency = {}
+        # Module CDB advertisement of page 01h, read on first use
+        self._advertisement = None
+        # Number of commands submitted with submit_cmd() still being processed
+        self.pending_cmds = 0
+        self._pending_lock = threading.Lock()
+        # Held from the write of a command to its completion, so that each CDB instance
+        # processes one command at a time while the instances proceed in parallel
+        self._instance_locks = {instance: threading.Lock() for instance in CDB_STATUS_FIELDS}
+        # Held while the bank of a CDB instance other than 1 is selected
+        self._bank_lock = threading.RLock()
+        # Last status read from each CDB instance
+        self.last_status = {instance: None for instance in CDB_STATUS_FIELDS}
+
+    def _read_advertisement(self):
+        """
+        Returns the CDB advertisement of page 01h, None if it cannot be read
+        """
+        if self._advertisement is None:
+            adv = self.read(cdb_consts.CDB_WRITE_CAPABILITIES)
+            if isinstance(adv, dict):
+                self._advertisement = adv
+        return self._advertisement
+
+    def get_instances_supported(self):
+        """
+        Returns the number of CDB instances advertised by the module, 1 if the
+        advertisement cannot be read
+        """
+        adv = self._read_advertisement()
+        if adv is None:
+            return cdb_consts.CDB_INSTANCE_1
+        return adv[cdb_consts.CDB_ADVERTISEMENT][cdb_consts.CDB_INSTANCES_SUPPORTED]
+
+    @contextmanager
+    def _select_instance(self, instance):
+        """
+        Make pages 9Fh-AFh address the CDB of instance, which lives in bank (instance - 1)
+        """
+        assert instance in CDB_STATUS_FIELDS, "Invalid CDB instance %r" % instance
+        with self._bank_lock:
+            if instance == cdb_consts.CDB_INSTANCE_1:
+                yield
+                return
+            self.write_raw(cdb_consts.BANK_SELECT_OFFSET, 1, bytearray([instance - 1]))
+            try:
+                yield
+            finally:
+                self.write_raw(cdb_consts.BANK_SELECT_OFFSET, 1, bytearray([0]))
+
+    def get_write_capabilities(self):
+        """
+        Get the CDB write capabilities advertised by the module in page 01h
+
+        Returns a tuple of (True if EPL writes may cross page boundaries, maximum bytes
+        per write transaction, True if the module triggers a command at the end of the
+        write transaction of its CMD bytes instead of on the write of the CMD bytes).
+        The conservative (False, 8, False) is returned while the advertisement cannot be read.
+        """
+        adv = self._read_advertisement()
+        if adv is None:
+            return False, cdb_consts.CDB_WRITE_LENGTH_UNIT, False
+        autopaging = bool(adv[cdb_consts.CDB_ADVERTISEMENT][cdb_consts.CDB_AUTO_PAGING_SUPPORTED])
+        max_length = (adv[cdb_consts.CDB_RW_LENGTH_EXTENSION] + 1) * cdb_consts.CDB_WRITE_LENGTH_UNIT
+        single_write = bool(adv[cdb_consts.CDB_TRIGGER_ADVERTISEMENT][cdb_consts.CDB_COMMAND_TRIGGER_METHOD])
+        if self.writer_max_length is not None:
+            max_length = min(max_length, self.writer_max_length)
+        return autopaging, max_length, single_write
 
-    def read_reply(self, cdb_cmd_id):
+    def read_reply(self, cdb_cmd_id, instance=cdb_consts.CDB_INSTANCE_1):
         """
         Read a reply from the CDB
         """
         cdb_cmd = self.mem_map.get_cdb_cmd(cdb_cmd_id)
         reply_field = cdb_cmd.get_reply_field()
         if reply_field is not None:
-            return self.read(reply_field)
+            with self._select_instance(instance):
+                return self.read(reply_field)
         return None
 
-    def write_cmd(self, cdb_cmd_id, payload=None):
+    def read_reply_raw(self, instance=cdb_consts.CDB_INSTANCE_1):
+        """
+        Read the variable length reply of the last command, as advertised by its
+        RPL length, from the CDB
+
+        Returns:
+            The bytes of the reply, None if it cannot be read or its check code is wrong
+        """
+        with self._select_instance(instance):
+            rpl_length = self.read(cdb_consts.CDB_RPL_LENGTH)
+            rpl_chkcode = self.read(cdb_consts.CDB_RPL_CHKCODE)
+            if rpl_length is None or rpl_chkcode is None or rpl_length > cdb_consts.RPL_MAX_SIZE:
+                return None
+            if rpl_length == 0:
+                return b''
+            rpl = self.read_raw(self.mem_map.getaddr(cdb_consts.LPL_PAGE, cdb_consts.RPL_DATA_START_OFFSET),
+                                rpl_length, return_raw=True)
+        if rpl is None:
+            return None
+        if rpl_chkcode != 0xff - (sum(rpl) & 0xff):
+            print(f"CDB reply check code mismatch: {rpl_chkcode}")
+            return None
+        return bytes(rpl)
+
+    def write_cmd(self, cdb_cmd_id, payload=None, instance=cdb_consts.CDB_INSTANCE_1):
         """
         Write CDB command
         """
+        with self._select_instance(instance):
+            return self._write_cmd(cdb_cmd_id, payload)
+
+    def _write_cmd(self, cdb_cmd_id, payload):
         cdb_cmd = self.mem_map.get_cdb_cmd(cdb_cmd_id)
         if payload is not None:
             bytes = cdb_cmd.encode(payload)
         else:
             bytes = cdb_cmd.encode()
-        # TODO Check the module capability CdbCommandTriggerMethod to write in single I2C transaction
+        _, max_length, single_write = self.get_write_capabilities()
+        if single_write and len(bytes) <= max_length:
+            # The module processes the command once the whole transaction is written
+            return self.writer(cdb_cmd.getaddr(), len(bytes), bytes)
         # Write the bytes starting from the 3rd byte(0x9F:130)
         self.writer(cdb_cmd.getaddr() + 2, len(bytes) - 2, bytes[2:])
         # Finally write the first two CMD bytes to trigger CDB processing
@@ -49,76 +174,175 @@ class CdbCmdHandler(XcvrEeprom):
         return self.write_raw((page * cdb_consts.PAGE_SIZE) + 128, len(data), data)
 
 
-    def wait_for_cdb_status(self, timeout=None):
+    def _cdb_status_done(self, instance=cdb_consts.CDB_INSTANCE_1):
         """
-        Wait for CDB status to be ready
-        Returns False if failed to get the status
-        True otherwise
+        Return the done callable polling the CDB status until the command completes
+
+        A status that is not busy is only trusted once the module was seen busy or
+        the command capture time (tCDBC) elapsed, as it may still be the status of
+        the previous command.
         """
-        delay = 0
-        if timeout is None:
-            timeout = cdb_consts.CDB_MAX_ACCESS_HOLD_OFF_PERIOD  + 5000  # 5 sec safety margin
-        status = None
+        capture_time = cdb_consts.CDB_MAX_CAPTURE_TIME / 1000
+        busy_key = CDB_STATUS_FIELDS[instance][1]
+        busy_seen = [False]
 
-        assert timeout > delay, "Timeout must be greater than delay"
+        def done(status, elapsed):
+            if (status is None) or \
+                    (True == status[busy_key]):
+                busy_seen[0] = True
+                return False
+            return busy_seen[0] or elapsed >= capture_time
+        return done
 
-        while (delay < timeout):
-            time.sleep(cdb_consts.CDB_MAX_CAPTURE_TIME / 1000)
-            delay += cdb_consts.CDB_MAX_CAPTURE_TIME
+    def _read_cdb_status(self, instance=cdb_consts.CDB_INSTANCE_1):
+        status = self.read(CDB_STATUS_FIELDS[instance][0])
+        self.last_status[instance] = status
+        return status
 
-            status = self.read(cdb_consts.CDB1_CMD_STATUS)
-            if (status is None) or \
-                    (True == status[cdb_consts.CDB1_IS_BUSY]):
-                continue
+    @staticmethod
+    def _get_status_timeout(timeout):
+        if timeout is None:
+            timeout = cdb_consts.CDB_MAX_ACCESS_HOLD_OFF_PERIOD  + 5000  # 5 sec safety margin
+        assert timeout > 0, "Timeout must be greater than 0"
+        return timeout / 1000
 
-            if (True == status[cdb_consts.CDB1_HAS_FAILED]):
-                break
+    def wait_for_cdb_status(self, timeout=None, instance=cdb_consts.CDB_INSTANCE_1):
+        """
+        Wait for CDB status to be ready
 
-            if (False == status[cdb_consts.CDB1_IS_BUSY]) and \
-                    (False == status[cdb_consts.CDB1_HAS_FAILED]):
-                break
+        The status is polled with an exponential backoff starting well below a
+        millisecond. A status that is not busy is only trusted once the module
+        was seen busy or the command capture time (tCDBC) elapsed, as it may
+        still be the status of the previous command.
 
-        if delay >= timeout or status is None:
+        Returns False if failed to get the status
+        True otherwise
+        """
+        status, _, completed = poll_with_backoff(
+            lambda: self._read_cdb_status(instance), self._cdb_status_done(instance),
+            self._get_status_timeout(timeout))
+        if not completed or status is None:
             return [False, status]
 
         return [True, status]
 
-    def send_cmd(self, cdb_cmd_id, payload=None, timeout=None):
+    def _get_cmd_result(self, cdb_cmd_id, start, ret, status, instance=cdb_consts.CDB_INSTANCE_1):
         """
-        Send CDB command, wait for completion and check status
+        Check the status of a CDB command once its wait is over
         """
-        # Write the command to the CDB
-        if True != self.write_cmd(cdb_cmd_id, payload):
-            print(f"Failed to write CDB command: {cdb_cmd_id}")
-            return None
-
-        # Wait for the command to complete
-        ret, status = self.wait_for_cdb_status(timeout)
         if not ret:
             print(f"CDB command: {cdb_cmd_id} failed to complete or read status")
             return None
+        self.cmd_latency[cdb_cmd_id] = time.monotonic() - start
+        _, busy_key, failed_key, status_key, _ = CDB_STATUS_FIELDS[instance]
 
-        is_busy = status[cdb_consts.CDB1_IS_BUSY]
+        is_busy = status[busy_key]
         if True == is_busy:
-            print(f"CDB command: {cdb_cmd_id} is busy with status: {status[cdb_consts.CDB1_STATUS]}")
+            print(f"CDB command: {cdb_cmd_id} is busy with status: {status[status_key]}")
             return False
 
-        is_failed = status[cdb_consts.CDB1_HAS_FAILED]
+        is_failed = status[failed_key]
         if True == is_failed:
-            print(f"CDB command: {cdb_cmd_id} failed with status: {status[cdb_consts.CDB1_STATUS]}")
+            print(f"CDB command: {cdb_cmd_id} failed with status: {status[status_key]}")
             return False
 
-        return status[cdb_consts.CDB1_STATUS] == 0x1
+        return status[status_key] == 0x1
 
-    def get_last_cmd_status(self):
+    def send_cmd(self, cdb_cmd_id, payload=None, timeout=None, instance=cdb_consts.CDB_INSTANCE_1):
+        """
+        Send CDB command, wait for completion and check status
+
+        Commands sent to the same CDB instance are serialized, while the commands of
+        different instances run in parallel on modules supporting two instances.
+        """
+        with self._instance_locks[instance]:
+            # Write the command to the CDB
+            start = time.monotonic()
+            if True != self.write_cmd(cdb_cmd_id, payload, instance):
+                print(f"Failed to write CDB command: {cdb_cmd_id}")
+                return None
+
+            # Wait for the command to complete
+            ret, status = self.wait_for_cdb_status(timeout, instance)
+            return self._get_cmd_result(cdb_cmd_id, start, ret, status, instance)
+
+    def submit_cmd(self, cdb_cmd_id, payload=None, timeout=None, poller=None, instance=cdb_consts.CDB_INSTANCE_1):
+        """
+        Send CDB command without waiting for its completion
+
+        The CDB status is polled by poller (the shared BackoffPoller by default), so
+        that the calling thread is free and the commands of many modules overlap.
+        Unless the module supports background mode, it should not be accessed other
+        than through the CDB status until the command completes, see is_accessible().
+
+        The call blocks while a command of the same CDB instance is still processed.
+
+        Returns a concurrent.futures.Future resolving to the send_cmd() result
+        """
+        future = Future()
+        future.set_running_or_notify_cancel()
+        instance_lock = self._instance_locks[instance]
+        instance_lock.acquire()
+        start = time.monotonic()
+        try:
+            written = self.write_cmd(cdb_cmd_id, payload, instance)
+        except Exception:
+            instance_lock.release()
+            raise
+        if True != written:
+            instance_lock.release()
+            print(f"Failed to write CDB command: {cdb_cmd_id}")
+            future.set_result(None)
+            return future
+
+        with self._pending_lock:
+            self.pending_cmds += 1
+
+        def complete(poll_future):
+            with self._pending_lock:
+                self.pending_cmds -= 1
+            instance_lock.release()
+            try:
+                status, _, completed = poll_future.result()
+                future.set_result(self._get_cmd_result(cdb_cmd_id, start, completed and status is not None,
+                                                       status, instance))
+            except Exception as e:
+                future.set_exception(e)
+
+        poller = BackoffPoller.get_shared() if poller is None else poller
+        poll_future = poller.submit(lambda: self._read_cdb_status(instance), self._cdb_status_done(instance),
+                                    self._get_status_timeout(timeout), start=start)
+        poll_future.add_done_callback(complete)
+        return future
+
+    def is_background_mode_supported(self):
+        """
+        Returns True if the module advertises that it can be accessed while it
+        processes a CDB command, False if not or if the advertisement cannot be read
+        """
+        adv = self._read_advertisement()
+        return adv is not None and \
+            bool(adv[cdb_consts.CDB_ADVERTISEMENT][cdb_consts.CDB_BACKGROUND_MODE_SUPPORTED])
+
+    def is_accessible(self):
+        """
+        Returns True if the module can be accessed (e.g. polled for DOM or VDM data),
+        False while a command submitted with submit_cmd() runs in foreground mode
+        """
+        with self._pending_lock:
+            if self.pending_cmds == 0:
+                return True
+        return self.is_background_mode_supported()
+
+    def get_last_cmd_status(self, instance=cdb_consts.CDB_INSTANCE_1):
         """
         Get the status of the last CDB command
         Returns None if Module failed to reply to I2C command
         """
-        status = self.read(cdb_consts.CDB1_COMMAND_RESULT)
+        status = self.read(CDB_STATUS_FIELDS[instance][4])
         return status
     
-    def write_lpl_block(self, blkaddr, blkdata):
+    def write_lpl_block(self, blkaddr, blkdata, instance=cdb_consts.CDB_INSTANCE_1):
         """
         Write LPL block
         """
@@ -127,17 +351,32 @@ class CdbCmdHandler(XcvrEeprom):
             "blkdata" : blkdata
         }
         # Send the CDB write firmware LPL command
-        if True != self.write_cmd(cdb_consts.CDB_WRITE_FIRMWARE_LPL_CMD, payload):
-            status = self.get_last_cmd_status()
+        if True != self.write_cmd(cdb_consts.CDB_WRITE_FIRMWARE_LPL_CMD, payload, instance):
+            status = self.get_last_cmd_status(instance)
             print(f"Write LPL block status: {status}")
 
-    def write_epl_pages(self, blkdata):
+    def write_epl_pages(self, blkdata, instance=cdb_consts.CDB_INSTANCE_1):
         """
         Write EPL pages starting from page 0xA0
+
+        If the module supports autopaging, consecutive pages are written with as few
+        transactions as its max write length allows, pages 0xA0-0xAF being contiguous.
         """
         pages = len(blkdata) // cdb_consts.PAGE_SIZE
         assert pages <= cdb_consts.EPL_MAX_PAGES, "Data exceeds maximum number of EPL pages"
 
+        with self._select_instance(instance):
+            self._write_epl_pages(blkdata, pages)
+
+    def _write_epl_pages(self, blkdata, pages):
+        autopaging, max_length, _ = self.get_write_capabilities()
+        if autopaging:
+            start = (cdb_consts.EPL_PAGE * cdb_consts.PAGE_SIZE) + 128
+            for offset in range(0, len(blkdata), max_length):
+                data = blkdata[offset : offset + max_length]
+                assert True == self.write_raw(start + offset, len(data), data)
+            return
+
         for page in range(pages):
             page_data = blkdata[page * cdb_consts.PAGE_SIZE : (page + 1) * cdb_consts.PAGE_SIZE]
             assert True == self.write_epl_page(page + cdb_consts.EPL_PAGE, page_data)
@@ -147,7 +386,7 @@ class CdbCmdHandler(XcvrEeprom):
             remaining_data = blkdata[pages * cdb_consts.PAGE_SIZE:]
             assert True == self.write_epl_page(pages + cdb_consts.EPL_PAGE, remaining_data)
 
-    def write_epl_block(self, blkaddr, blkdata):
+    def write_epl_block(self, blkaddr, blkdata, instance=cdb_consts.CDB_INSTANCE_1):
         """
         Write EPL block
         """
@@ -157,4 +396,4 @@ class CdbCmdHandler(XcvrEeprom):
         }
 
         # Send the CDB write firmware EPL command
-        return self.send_cmd(cdb_consts.CDB_WRITE_FIRMWARE_EPL_CMD, payload)
+        return self.send_cmd(cdb_consts.CDB_WRITE_FIRMWARE_EPL_CMD, payload, instance=instance)
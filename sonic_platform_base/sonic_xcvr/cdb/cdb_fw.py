@@ -6,14 +6,28 @@
 """
 
 from ..fields import cdb_consts
+from ..utils.fw_image import FwDownloadCheckpoint, FwImage
 from .cdb import CdbCmdHandler
 
 class CdbFwHandler(CdbCmdHandler):
+    # When enabled, a failed firmware download is left in progress and resumed by the next download of the same image
+    download_resume = False
+
+    @classmethod
+    def set_download_resume(cls, enabled: bool):
+        """
+        Set the download_resume flag to control whether download_fw_image keeps a
+        checkpoint of the acknowledged blocks and resumes from it on retry.
+        """
+        cls.download_resume = bool(enabled)
+
     def __init__(self, reader, writer, mem_map):
         super(CdbFwHandler, self).__init__(reader, writer, mem_map)
         self.start_payload_size = 0
         self.is_lpl_only = False
         self.rw_length_ext = 0
+        # FwDownloadCheckpoint of the last firmware download, in download_resume mode
+        self.download_checkpoint = None
         assert True == self.initFwHandler(), "Failed to initialize firmware handler"
 
     def initFwHandler(self):
@@ -57,51 +71,61 @@ class CdbFwHandler(CdbCmdHandler):
         Start firmware download
         :param imgpath: path to the firmware image
         """
-        with open(imgpath, 'rb') as fw_file:
-            fw_file.seek(0, 2)  # Move to the end of the file
-            filesize = fw_file.tell() # Get the file size
-            fw_file.seek(0, 0)  # Move back to the start of the file
-            # Read the image file header bytes
-            header_data = None
-            if self.start_payload_size > 0:
-                header_data = fw_file.read(self.start_payload_size)
-                if len(header_data) < self.start_payload_size:
-                    raise ValueError(f"Firmware image file is too small < {self.start_payload_size} bytes for header")
-
-        # Verify the header with the module
-        payload = {
-            "imgsize" : filesize,
-            "imghdr" : header_data
-        }
-
-        # Send the CDB start firmware download command
-        return self.send_cmd(cdb_consts.CDB_START_FIRMWARE_DOWNLOAD_CMD, payload)
+        with FwImage(imgpath, self.start_payload_size) as image:
+            # Verify the header with the module
+            payload = {
+                "imgsize" : image.size,
+                "imghdr" : bytes(image.header) if self.start_payload_size > 0 else None
+            }
+
+            # Send the CDB start firmware download command
+            return self.send_cmd(cdb_consts.CDB_START_FIRMWARE_DOWNLOAD_CMD, payload)
+
+    def get_resume_address(self, imgpath):
+        """
+        Get the address a download of an image can be resumed from
+        :param imgpath: path to the firmware image
+        :return: the address following the last block of the image acknowledged by the
+                 module, 0 if the download must be started with start_fw_download()
+        """
+        if not self.download_resume or self.download_checkpoint is None:
+            return 0
+        try:
+            with FwImage(imgpath) as image:
+                return self.download_checkpoint.get_resume_address(image.get_digest(), image.size)
+        except OSError:
+            return 0
 
     def download_fw_image(self, imgpath):
         """
         Download firmware image using the CDB command(LPL or EPL)
+
+        The image is memory-mapped and its blocks are written from memoryview slices
+        of the mapping, without copying them.
+
+        In download_resume mode, the address following the last acknowledged block is
+        kept with the image digest, and a failed download is not aborted. If
+        get_resume_address() is not 0, call download_fw_image() again without
+        start_fw_download() to resume the download from that address. If the module
+        does not acknowledge the first resumed block, the download is aborted and
+        (False, 0) is returned, so that it is restarted with start_fw_download().
         :param imgpath: path to the firmware image
         """
+        checkpoint = None
+        blkaddr = 0
         try:
-            with open(imgpath, 'rb') as fw_file:
-                # Step 1. Read the initial payload (header)
-                # TODO Skip the header using fseek
-                header_data = None
-                if self.start_payload_size > 0:
-                    header_data = fw_file.read(self.start_payload_size)
-                    if len(header_data) < self.start_payload_size:
-                        raise ValueError(f"Firmware image file is too small: expected at least {self.start_payload_size} bytes for header")
-
-                # 2 Read and write firmware data in chunks, handling partial chunks
-                blkaddr = 0
-                while True:
-                    # Read a chunk of data up to self.rw_length_ext bytes
-                    blkdata = fw_file.read(self.rw_length_ext)
-
-                    # Exit loop if no more data
-                    if not blkdata:
-                        break
-
+            with FwImage(imgpath, self.start_payload_size) as image:
+                if self.download_resume:
+                    checkpoint = FwDownloadCheckpoint(image.get_digest(), image.size)
+                    if self.download_checkpoint is not None:
+                        blkaddr = self.download_checkpoint.get_resume_address(checkpoint.digest,
+                                                                              checkpoint.imagesize)
+                        checkpoint.address = blkaddr
+                self.download_checkpoint = checkpoint
+                resuming = blkaddr > 0
+
+                # Write firmware data in blocks of up to self.rw_length_ext bytes, following the header
+                for blkaddr, blkdata in image.get_blocks(self.rw_length_ext, blkaddr):
                     # TODO Handle LPL only supported case
                     # TODO Handle auto paging for EPL
                     # Write the block data to the EPL
@@ -112,12 +136,19 @@ class CdbFwHandler(CdbCmdHandler):
                         self.write_epl_pages(blkdata)
                         if True != self.write_epl_block(blkaddr, blkdata):
                             print(f"Failed to write EPL block at address {blkaddr}")
+                            if resuming:
+                                # The module no longer has the download in progress
+                                self.download_checkpoint = None
+                                self.abort_fw_download()
+                                return False, 0
                             return False, blkaddr
 
-                    # Update address for next chunk by the actual number of bytes written
-                    blkaddr += len(blkdata)
+                    resuming = False
+                    if checkpoint is not None:
+                        checkpoint.address = blkaddr + len(blkdata)
 
-                return True, blkaddr  # Return success and total bytes written
+                self.download_checkpoint = None
+                return True, len(image.payload)  # Return success and total bytes written
 
         except FileNotFoundError:
             print(f"Error: Firmware image file not found: {imgpath}")
@@ -127,6 +158,8 @@ class CdbFwHandler(CdbCmdHandler):
             return False, 0
         except Exception as e:
             print(f"Error downloading firmware image: {str(e)}")
+            if checkpoint is not None:
+                return False, checkpoint.address
             self.abort_fw_download()  # Abort on error
         return False, 0
 
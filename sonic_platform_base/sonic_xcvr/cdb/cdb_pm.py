@@ -4,3 +4,63 @@
     CDB Performance Monitoring handler
     CMD : 0200h to 027Fh
 """
+
+from ..fields import cdb_consts
+from .cdb import CdbCmdHandler
+
+class CdbPmHandler(CdbCmdHandler):
+    def __init__(self, reader, writer, mem_map):
+        super(CdbPmHandler, self).__init__(reader, writer, mem_map)
+        # Decoded reply of CMD 0200h, read on first use
+        self.pm_features = None
+
+    def get_pm_features(self):
+        """
+        Get the PM features, i.e. which PM commands the module supports
+        Returns None if the module failed to report them
+        """
+        if self.pm_features is None:
+            if True != self.send_cmd(cdb_consts.CDB_GET_PM_FEATURES_CMD):
+                print("Failed to get PM features")
+                return None
+            self.pm_features = self.read_reply(cdb_consts.CDB_GET_PM_FEATURES_CMD)
+        return self.pm_features
+
+    def is_media_pm_supported(self):
+        """
+        Returns True if the media lane FEC and link PMs can be retrieved with CDB commands
+        """
+        features = self.get_pm_features()
+        if not isinstance(features, dict):
+            return False
+        return bool(features.get(cdb_consts.CDB_MEDIA_FEC_PM_SUPPORTED)) and \
+            bool(features.get(cdb_consts.CDB_MEDIA_LINK_PM_SUPPORTED))
+
+    def get_pm(self, cdb_cmd_id):
+        """
+        Send a PM command and read its reply
+        Returns None if the command failed
+        """
+        if True != self.send_cmd(cdb_cmd_id):
+            print(f"Failed to get PM with CDB command: {cdb_cmd_id}")
+            return None
+        return self.read_reply(cdb_cmd_id)
+
+    def get_media_pm(self):
+        """
+        Get the media lane FEC and link PMs, the content of C-CMIS pages 34h and 35h,
+        with one CDB command each instead of one read per PM
+
+        Returns:
+            A dict mapping the PM field names of pages 34h and 35h to their values,
+            None if the module does not support the PM commands or one of them failed
+        """
+        if not self.is_media_pm_supported():
+            return None
+        pm = {}
+        for cdb_cmd_id in (cdb_consts.CDB_GET_MEDIA_FEC_PM_CMD, cdb_consts.CDB_GET_MEDIA_LINK_PM_CMD):
+            reply = self.get_pm(cdb_cmd_id)
+            if reply is None:
+                return None
+            pm.update(reply)
+        return pm
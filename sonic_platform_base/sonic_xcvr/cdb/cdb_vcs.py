@@ -4,3 +4,158 @@
     CDB Versatile Control Set Commands
     CMD : 4000h - 4003h
 """
+
+import struct
+
+from ..fields import cdb_consts
+from .cdb import CdbCmdHandler
+
+# Bytes of an entry before its value: 2 bytes parameter id and 1 byte value length
+VCS_ENTRY_HEADER_SIZE = 3
+# Bytes of a read request entry: 2 bytes parameter id
+VCS_READ_ENTRY_SIZE = 2
+# Bytes of the entry count leading the payloads and replies
+VCS_COUNT_SIZE = 1
+
+class CdbVcsHandler(CdbCmdHandler):
+    def __init__(self, reader, writer, mem_map):
+        super(CdbVcsHandler, self).__init__(reader, writer, mem_map)
+        # Decoded reply of CMD 4000h, read on first use
+        self.vcs_features = None
+
+    def get_vcs_features(self):
+        """
+        Get the VCS features, i.e. the maximum number of entries of one command
+        and the maximum size of a parameter value
+        Returns None if the module failed to report them
+        """
+        if self.vcs_features is None:
+            if True != self.send_cmd(cdb_consts.CDB_VCS_GET_FEATURES_CMD):
+                print("Failed to get VCS features")
+                return None
+            features = self.read_reply(cdb_consts.CDB_VCS_GET_FEATURES_CMD)
+            if not isinstance(features, dict) or not features.get(cdb_consts.CDB_VCS_MAX_ENTRIES):
+                print("Invalid VCS features")
+                return None
+            self.vcs_features = features
+        return self.vcs_features
+
+    @staticmethod
+    def _get_batches(entries, entry_sizes, max_entries, max_size):
+        """
+        Split entries into consecutive batches of at most max_entries entries and
+        max_size bytes, counting VCS_COUNT_SIZE bytes for the entry count
+        """
+        batch, size = [], VCS_COUNT_SIZE
+        for entry, entry_size in zip(entries, entry_sizes):
+            if batch and (len(batch) == max_entries or size + entry_size > max_size):
+                yield batch
+                batch, size = [], VCS_COUNT_SIZE
+            batch.append(entry)
+            size += entry_size
+        if batch:
+            yield batch
+
+    @staticmethod
+    def parse_write_reply(reply):
+        """
+        Returns the list of the results of the entries of a VCS write reply, None if it is malformed
+        """
+        if not reply or len(reply) != VCS_COUNT_SIZE + reply[0]:
+            return None
+        return list(reply[VCS_COUNT_SIZE:])
+
+    @staticmethod
+    def parse_read_reply(reply):
+        """
+        Returns the list of the (parameter id, value) entries of a VCS read reply, None if it is malformed
+        """
+        if not reply:
+            return None
+        entries, offset = [], VCS_COUNT_SIZE
+        for _ in range(reply[0]):
+            if offset + VCS_ENTRY_HEADER_SIZE > len(reply):
+                return None
+            param_id, length = struct.unpack_from(">HB", reply, offset)
+            offset += VCS_ENTRY_HEADER_SIZE
+            if offset + length > len(reply):
+                return None
+            entries.append((param_id, reply[offset:offset + length]))
+            offset += length
+        return entries
+
+    def write_params(self, params, apply=False, instance=cdb_consts.CDB_INSTANCE_1):
+        """
+        Write VCS parameters, as many per CDB command as the module and the LPL allow
+
+        Args:
+            params: iterable of (parameter id, value bytes) pairs, written in order
+            apply: send CMD 4003h once every parameter was written successfully
+
+        Returns:
+            A dict mapping each parameter id to its result, 0 on success, None if
+            the command of its batch failed
+        """
+        params = [(param_id, bytes(value)) for param_id, value in params]
+        features = self.get_vcs_features()
+        if features is None:
+            return {param_id: None for param_id, _ in params}
+        max_value_size = min(features[cdb_consts.CDB_VCS_MAX_VALUE_SIZE],
+                             cdb_consts.LPL_MAX_PAYLOAD_SIZE - VCS_COUNT_SIZE - VCS_ENTRY_HEADER_SIZE)
+        assert all(len(value) <= max_value_size for _, value in params), \
+            "VCS parameter value exceeds the maximum value size"
+        results = {}
+        for batch in self._get_batches(params, [VCS_ENTRY_HEADER_SIZE + len(value) for _, value in params],
+                                       features[cdb_consts.CDB_VCS_MAX_ENTRIES], cdb_consts.LPL_MAX_PAYLOAD_SIZE):
+            batch_results = None
+            if True == self.send_cmd(cdb_consts.CDB_VCS_WRITE_CMD, batch, instance=instance):
+                batch_results = self.parse_write_reply(self.read_reply_raw(instance))
+                if batch_results is not None and len(batch_results) != len(batch):
+                    batch_results = None
+            if batch_results is None:
+                print(f"Failed to write VCS parameters: {[param_id for param_id, _ in batch]}")
+                batch_results = [None] * len(batch)
+            for (param_id, _), result in zip(batch, batch_results):
+                results[param_id] = result
+        if apply and all(result == 0 for result in results.values()):
+            if True != self.apply_params(instance):
+                return {param_id: None for param_id in results}
+        return results
+
+    def read_params(self, param_ids, instance=cdb_consts.CDB_INSTANCE_1):
+        """
+        Read VCS parameters, as many per CDB command as the module and the RPL allow
+
+        Returns:
+            A dict mapping each parameter id to its value bytes, None if the module
+            did not return it or the command of its batch failed
+        """
+        param_ids = list(param_ids)
+        values = dict.fromkeys(param_ids)
+        features = self.get_vcs_features()
+        if features is None:
+            return values
+        # A batch must fit both the LPL of the request and the RPL of the reply
+        max_entries = min(features[cdb_consts.CDB_VCS_MAX_ENTRIES],
+                          (cdb_consts.LPL_MAX_PAYLOAD_SIZE - VCS_COUNT_SIZE) // VCS_READ_ENTRY_SIZE,
+                          (cdb_consts.RPL_MAX_SIZE - VCS_COUNT_SIZE) //
+                          (VCS_ENTRY_HEADER_SIZE + features[cdb_consts.CDB_VCS_MAX_VALUE_SIZE]))
+        assert max_entries > 0, "VCS maximum value size exceeds the reply size"
+        for batch in self._get_batches(param_ids, [VCS_READ_ENTRY_SIZE] * len(param_ids),
+                                       max_entries, cdb_consts.LPL_MAX_PAYLOAD_SIZE):
+            entries = None
+            if True == self.send_cmd(cdb_consts.CDB_VCS_READ_CMD, batch, instance=instance):
+                entries = self.parse_read_reply(self.read_reply_raw(instance))
+            if entries is None:
+                print(f"Failed to read VCS parameters: {batch}")
+                continue
+            for param_id, value in entries:
+                if param_id in values:
+                    values[param_id] = value
+        return values
+
+    def apply_params(self, instance=cdb_consts.CDB_INSTANCE_1):
+        """
+        Apply the VCS parameters written so far
+        """
+        return self.send_cmd(cdb_consts.CDB_VCS_APPLY_CMD, instance=instance)
@@ -7,6 +7,12 @@ CDB1_IS_BUSY = "Cdb1IsBusy"
 CDB1_HAS_FAILED = "Cdb1HasFailed"
 CDB1_CMD_STATUS_FIELD = "Cdb1CmdStatus"
 CDB1_COMMAND_RESULT ="Cdb1CommandResult"
+CDB2_STATUS = "Cdb2Status"
+CDB2_CMD_STATUS = "Cdb2CmdStatus"
+CDB2_IS_BUSY = "Cdb2IsBusy"
+CDB2_HAS_FAILED = "Cdb2HasFailed"
+CDB2_CMD_STATUS_FIELD = "Cdb2CmdStatusField"
+CDB2_COMMAND_RESULT = "Cdb2CommandResult"
 
 
 #Firmware Info
@@ -46,15 +52,49 @@ CDB_READ_WRITE_LENGTH_EXT = "CdbReadWriteLengthExt"
 CDB_WRITE_MECHANISM = "CdbWriteMechanism"
 CDB_READ_MECHANISM = "CdbReadMechanism"
 
+# CDB Advertisement (Page 01h)
+CDB_WRITE_CAPABILITIES = "CdbWriteCapabilities"
+CDB_ADVERTISEMENT = "CdbAdvertisement"
+CDB_INSTANCES_SUPPORTED = "CdbInstancesSupported"
+CDB_BACKGROUND_MODE_SUPPORTED = "CdbBackgroundModeSupported"
+CDB_AUTO_PAGING_SUPPORTED = "CdbAutoPagingSupported"
+CDB_MAX_PAGES_EPL = "CdbMaxPagesEPL"
+CDB_RW_LENGTH_EXTENSION = "CdbRwLengthExtension"
+CDB_TRIGGER_ADVERTISEMENT = "CdbTriggerAdvertisement"
+CDB_COMMAND_TRIGGER_METHOD = "CdbCommandTriggerMethod"
 
+# Performance Monitoring
+CDB_PM_FEATURES = "CdbPmFeatures"
+CDB_MEDIA_FEC_PM_SUPPORTED = "CdbMediaFecPmSupported"
+CDB_MEDIA_LINK_PM_SUPPORTED = "CdbMediaLinkPmSupported"
+CDB_MEDIA_FEC_PM = "CdbMediaLaneFecPm"
+CDB_MEDIA_LINK_PM = "CdbMediaLaneLinkPm"
+
+# Versatile Control Set
+CDB_VCS_FEATURES = "CdbVcsFeatures"
+CDB_VCS_MAX_ENTRIES = "CdbVcsMaxEntries"
+CDB_VCS_MAX_VALUE_SIZE = "CdbVcsMaxValueSize"
+
+# Reply header
+CDB_RPL_LENGTH = "CdbRplLength"
+CDB_RPL_CHKCODE = "CdbRplChkCode"
+
+
+CDB_INSTANCE_1 = 1
+CDB_INSTANCE_2 = 2
+BANK_SELECT_OFFSET = 126 # Selects the bank of pages 10h-FFh, bank N holding CDB instance N+1
+CDB_ADV_PAGE = 0x01
 LPL_PAGE = 0x9F
 EPL_PAGE = 0xA0
 EPL_MAX_PAGES = 16
 PAGE_SIZE = 128
 CDB_LPL_CMD_START_OFFSET = 128
+RPL_LENGTH_OFFSET = 134
 RPL_DATA_START_OFFSET = 136
+RPL_MAX_SIZE = 120
 LPL_MAX_PAYLOAD_SIZE = 116
 EPL_MAX_PAYLOAD_SIZE = 2048
+CDB_WRITE_LENGTH_UNIT = 8 # Max write length is (CdbReadWriteLengthExtension + 1) * 8 bytes
 
 CDB_MAX_ACCESS_HOLD_OFF_PERIOD = 4960 # tCDBF msec
 CDB_MAX_CAPTURE_TIME = 100 # tCDBC msec
@@ -77,3 +117,10 @@ CDB_COMPLETE_FIRMWARE_DOWNLOAD_CMD = 0x0107
 CDB_COPY_FIRMWARE_IMAGE_CMD = 0x0108
 CDB_RUN_FIRMWARE_IMAGE_CMD = 0x0109
 CDB_COMMIT_FIRMWARE_IMAGE_CMD = 0x010A
+CDB_GET_PM_FEATURES_CMD = 0x0200
+CDB_GET_MEDIA_FEC_PM_CMD = 0x0210
+CDB_GET_MEDIA_LINK_PM_CMD = 0x0211
+CDB_VCS_GET_FEATURES_CMD = 0x4000
+CDB_VCS_WRITE_CMD = 0x4001
+CDB_VCS_READ_CMD = 0x4002
+CDB_VCS_APPLY_CMD = 0x4003
@@ -7,6 +7,7 @@ STATUS_FIELD = "Status Indicators"
 STATUS_IND_BITS_FIELD = "Status Indicator Bits"
 
 FLAT_MEM_FIELD = "Flat_mem"
+INTL_FIELD = "IntL"
 CONNECTOR_FIELD = "Connector"
 
 DIAG_MON_TYPE_FIELD = "Diagnostic Monitoring Type"
@@ -24,6 +25,8 @@ MODULE_MONITORS_PAGE0_FIELD = "Module Monitors Page 0"
 MODULE_MONITORS_FIELD = "Module Monitors"
 
 RX_LOS_FIELD = "RxLOS"
+LOS_MASK_FIELD = "LOSMask"
+TX_FAULT_MASK_FIELD = "TxFaultMask"
 RX_LOS_SUPPORT = "RxLOSSupported"
 RX_POWER_FIELD = "RxPower"
 RX_POWER_SUPPORT_FIELD = "RxPowerSupported"
@@ -248,7 +251,9 @@ MODULE_FIRMWARE_FAULT_INFO = "FirmwareFault"
 MODULE_FLAG_BYTE1 = "ModuleFlagByte1"
 MODULE_FLAG_BYTE2 = "ModuleFlagByte2"
 MODULE_FLAG_BYTE3 = "ModuleFlagByte3"
+LANE_FLAGS_SUMMARY_BANK0 = "LaneFlagsSummaryBank0"
 CDB1_STATUS = "Cdb1Status"
+CDB2_STATUS = "Cdb2Status"
 MODULE_FAULT_CAUSE = "ModuleFaultCause"
 DATA_PATH_STATE= "DataPathState"
 TX_OUTPUT_STATUS = "TxOutputStatus"
@@ -4,6 +4,8 @@ from .. import consts
 from ...codes.public.cdb import CdbCodes
 from ...fields import cdb_consts
 class CableLenField(NumberRegField):
+    __slots__ = ()
+
     def __init__(self, name, offset, *fields, **kwargs):
         kwargs["deps"] = [consts.LEN_MULT_FIELD]
         super(CableLenField, self).__init__(name, offset, *fields, **kwargs)
@@ -15,8 +17,16 @@ class CableLenField(NumberRegField):
         return base_len * mult
 
 class CdbStatusField(NumberRegField):
+    """
+    Interprets the status of a CDB instance, given the names of its (busy, failed,
+    result) fields in status_deps. Defaults to CDB instance 1.
+    """
+    __slots__ = ("status_deps",)
+
     def __init__(self, name, offset, *fields, **kwargs):
-        kwargs["deps"] = [cdb_consts.CDB1_IS_BUSY, cdb_consts.CDB1_HAS_FAILED, cdb_consts.CDB1_STATUS]
+        self.status_deps = tuple(kwargs.pop("status_deps", (
+            cdb_consts.CDB1_IS_BUSY, cdb_consts.CDB1_HAS_FAILED, cdb_consts.CDB1_STATUS)))
+        kwargs["deps"] = list(self.status_deps)
         super(CdbStatusField, self).__init__(name, offset, *fields, **kwargs)
 
     def get_status(self, codes, status):
@@ -26,9 +36,10 @@ class CdbStatusField(NumberRegField):
         return codes[status] if status in codes else "Unknown"
 
     def decode(self, raw_data, **decoded_deps):
-        is_busy = decoded_deps.get(cdb_consts.CDB1_IS_BUSY)
-        failed = decoded_deps.get(cdb_consts.CDB1_HAS_FAILED)
-        cmd_status = decoded_deps.get(cdb_consts.CDB1_STATUS)
+        busy_key, failed_key, status_key = self.status_deps
+        is_busy = decoded_deps.get(busy_key)
+        failed = decoded_deps.get(failed_key)
+        cmd_status = decoded_deps.get(status_key)
        
         if is_busy:
             status = self.get_status(CdbCodes.CDB_IN_PROGRESS, cmd_status)
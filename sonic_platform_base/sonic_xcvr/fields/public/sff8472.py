@@ -4,6 +4,8 @@ from ..xcvr_field import NumberRegField
 from .. import consts
 
 class TempField(NumberRegField):
+    __slots__ = ()
+
     def __init__(self, name, offset, *fields, **kwargs):
         kwargs["deps"] = [consts.INT_CAL_FIELD, consts.EXT_CAL_FIELD, consts.T_SLOPE_FIELD, consts.T_OFFSET_FIELD]
         super(TempField, self).__init__(name, offset, *fields, **kwargs)
@@ -22,6 +24,8 @@ class TempField(NumberRegField):
         return float('NaN')
 
 class VoltageField(NumberRegField):
+    __slots__ = ()
+
     def __init__(self, name, offset, *fields, **kwargs):
         kwargs["deps"] = [consts.INT_CAL_FIELD, consts.EXT_CAL_FIELD, consts.V_SLOPE_FIELD, consts.V_OFFSET_FIELD]
         super(VoltageField, self).__init__(name, offset, *fields, **kwargs)
@@ -40,6 +44,8 @@ class VoltageField(NumberRegField):
         return float('NaN')
 
 class TxBiasField(NumberRegField):
+    __slots__ = ()
+
     def __init__(self, name, offset, *fields, **kwargs):
         kwargs["deps"] = [consts.INT_CAL_FIELD, consts.EXT_CAL_FIELD, consts.TX_I_SLOPE_FIELD, consts.TX_I_OFFSET_FIELD]
         super(TxBiasField, self).__init__(name, offset, *fields, **kwargs)
@@ -58,6 +64,8 @@ class TxBiasField(NumberRegField):
         return float('NaN')
 
 class TxPowerField(NumberRegField):
+    __slots__ = ()
+
     def __init__(self, name, offset, *fields, **kwargs):
         kwargs["deps"] = [consts.INT_CAL_FIELD, consts.EXT_CAL_FIELD, consts.TX_PWR_SLOPE_FIELD, consts.TX_PWR_OFFSET_FIELD]
         super(TxPowerField, self).__init__(name, offset, *fields, **kwargs)
@@ -76,6 +84,8 @@ class TxPowerField(NumberRegField):
         return float('NaN')
 
 class RxPowerField(NumberRegField):
+    __slots__ = ()
+
     def __init__(self, name, offset, *fields, **kwargs):
         kwargs["deps"] = [consts.INT_CAL_FIELD, consts.EXT_CAL_FIELD, consts.RX_PWR_0_FIELD, consts.RX_PWR_1_FIELD,
                           consts.RX_PWR_2_FIELD, consts.RX_PWR_3_FIELD, consts.RX_PWR_4_FIELD]
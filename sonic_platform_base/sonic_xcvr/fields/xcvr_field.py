@@ -15,6 +15,8 @@ class XcvrField(object):
         offset: integer, the absolute offset of the field in a memory map, assuming a linear address space
         ro: boolean, True if the field is read-only and False otherwise
     """
+    __slots__ = ("name", "offset", "ro", "deps", "bitmask")
+
     def __init__(self, name, offset, **kwargs):
         self.name = name
         self.offset = offset
@@ -83,6 +85,8 @@ class RegBitField(XcvrField):
     Args:
         bitpos: the bit position of this field relative to its parent's offset
     """
+    __slots__ = ("bitpos",)
+
     def __init__(self, name, bitpos, offset=None, **kwargs):
         super(RegBitField, self).__init__(name, offset, **kwargs)
         assert bitpos < 64
@@ -114,6 +118,8 @@ class RegBitsField(XcvrField):
     Args:
         bitpos: the bit position of this field relative to its parent's offset
     """
+    __slots__ = ("size", "bitpos")
+
     def __init__(self, name, bitpos, offset=None, **kwargs):
         super(RegBitsField, self).__init__(name, offset, **kwargs)
         self.size = self.size = kwargs.get("size", 1) #No of bits
@@ -143,6 +149,8 @@ class RegField(XcvrField):
     """
     Field denoting one or more bytes, but logically interpreted as one unit (e.g. a 4-byte integer)
     """
+    __slots__ = ("fields", "size", "start_bitpos")
+
     def __init__(self, name, offset, *fields, **kwargs):
         super(RegField, self).__init__(name, offset, **kwargs)
         self.fields = fields
@@ -174,6 +182,8 @@ class NumberRegField(RegField):
     """
     Interprets byte(s) as a number
     """
+    __slots__ = ("scale", "format", "bitdecode")
+
     def __init__(self, name, offset, *fields, **kwargs):
         super(NumberRegField, self).__init__(name, offset, *fields, **kwargs)
         self.scale = kwargs.get("scale")
@@ -205,6 +215,8 @@ class FixedNumberRegField(NumberRegField):
     """
     Interprets byte(s) as a fixed-point number
     """
+    __slots__ = ("num_frac_bits",)
+
     def __init__(self, name, offset, num_frac_bits, *fields, **kwargs):
         super(FixedNumberRegField, self).__init__(name, offset, *fields, **kwargs)
         self.num_frac_bits = num_frac_bits
@@ -221,6 +233,8 @@ class StringRegField(RegField):
     """
     Interprets byte(s) as a string
     """
+    __slots__ = ("encoding", "format")
+
     def __init__(self, name, offset, *fields, **kwargs):
         super(StringRegField, self).__init__(name, offset, *fields, **kwargs)
         self.encoding = kwargs.get("encoding", "ascii")
@@ -233,6 +247,8 @@ class CodeRegField(RegField):
     """
     Interprets byte(s) as a code
     """
+    __slots__ = ("code_dict", "format")
+
     def __init__(self, name, offset, code_dict, *fields, **kwargs):
         super(CodeRegField, self).__init__(name, offset, *fields, **kwargs)
         self.code_dict = code_dict
@@ -250,6 +266,8 @@ class HexRegField(RegField):
     """
     Interprets bytes as a series of hex pairs
     """
+    __slots__ = ()
+
     def __init__(self, name, offset, *fields, **kwargs):
         super(HexRegField, self).__init__(name, offset, *fields, **kwargs)
 
@@ -260,6 +278,8 @@ class ServerFWVersionRegField(RegField):
     """
     Returns the raw byte(s)
     """
+    __slots__ = ()
+
     def __init__(self, name, offset, *fields, **kwargs):
         super(ServerFWVersionRegField, self).__init__(name, offset, *fields, **kwargs)
 
@@ -285,6 +305,8 @@ class RegGroupField(XcvrField):
 
     The member fields need not be contiguous, but the first field must be the one with the smallest offset.
     """
+    __slots__ = ("fields",)
+
     def __init__(self, name, *fields, **kwargs):
         super(RegGroupField, self).__init__(name, fields[0].get_offset(), **kwargs)
         self.fields = fields
@@ -325,6 +347,8 @@ class DateField(StringRegField):
     """
     Common representation of date codes in xcvr memory maps
     """
+    __slots__ = ()
+
     def __init__(self, name, offset, *fields, **kwargs):
         super(DateField, self).__init__(name, offset, *fields, **kwargs)
 
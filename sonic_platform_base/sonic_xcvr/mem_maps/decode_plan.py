@@ -0,0 +1,268 @@
+"""
+    decode_plan.py
+
+    Precompiled, flat representation of the fields of a XcvrMemMap used to decode
+    bulk EEPROM reads without walking the XcvrField class hierarchy per field.
+"""
+
+import struct
+import sys
+
+from ..fields.xcvr_field import (
+    CodeRegField,
+    FixedNumberRegField,
+    HexRegField,
+    NumberRegField,
+    RegBitField,
+    RegBitsField,
+    RegGroupField,
+    StringRegField,
+)
+
+NATIVE_BYTE_ORDER = '<' if sys.byteorder == 'little' else '>'
+# Format characters whose size and layout do not depend on byte order or alignment
+BYTE_FORMAT_CHARS = set('0123456789Bbs?cx')
+
+class PlanEntry(object):
+    """
+    Decode recipe for one field of a mem map
+
+    Args:
+        field: the XcvrField this entry was compiled from
+        kind: one of the PlanEntry kind constants, selecting how the value is produced
+        fmt: struct format of the field body, without byte order prefix
+        order: '<' or '>' if the format depends on byte order, None otherwise
+    """
+    __slots__ = ("name", "field", "offset", "size", "kind", "fmt", "order",
+                 "mask", "shift", "scale", "divisor", "table", "encoding", "deps", "members")
+
+    NUMBER = 0
+    CODE = 1
+    STRING = 2
+    HEX = 3
+    BIT = 4
+    GROUP = 5
+    GENERIC = 6
+
+    def __init__(self, field, kind, fmt=None, order=None):
+        self.name = field.name
+        self.field = field
+        self.offset = field.get_offset()
+        self.size = field.get_size()
+        self.kind = kind
+        self.fmt = fmt
+        self.order = order
+        self.mask = None
+        self.shift = 0
+        self.scale = None
+        self.divisor = None
+        self.table = None
+        self.encoding = None
+        self.deps = field.get_deps()
+        self.members = None
+
+    def is_leaf(self):
+        return self.fmt is not None
+
+    def convert(self, value):
+        """
+        Turn the value unpacked for this entry into its decoded result
+        """
+        kind = self.kind
+        if kind == PlanEntry.BIT:
+            return bool((value >> self.shift) & 1)
+        if kind == PlanEntry.STRING:
+            return value.decode(self.encoding, 'ignore')
+        if kind == PlanEntry.HEX:
+            return '-'.join(["%02x" % byte for byte in value])
+        if self.mask is not None:
+            value = (value & self.mask) >> self.shift
+        if kind == PlanEntry.CODE:
+            return self.table.get(value, "Unknown")
+        if self.scale is not None:
+            value = value / self.scale
+        if self.divisor is not None:
+            value = value / self.divisor
+        return value
+
+def _split_format(fmt, size):
+    """
+    Return: (byte order, body) of a struct format, or None if it cannot be flattened
+    """
+    try:
+        if struct.calcsize(fmt) != size or len(struct.unpack(fmt, bytes(size))) != 1:
+            return None
+    except struct.error:
+        return None
+    prefix = fmt[0]
+    if prefix in '<>!=':
+        order = {'!': '>', '=': NATIVE_BYTE_ORDER}.get(prefix, prefix)
+        body = fmt[1:]
+    else:
+        body = fmt[1:] if prefix == '@' else fmt
+        if not set(body) <= BYTE_FORMAT_CHARS:
+            return None
+        order = None
+    if set(body) <= BYTE_FORMAT_CHARS:
+        order = None
+    return order, body
+
+def compile_field(field):
+    """
+    Compile one XcvrField into a PlanEntry, falling back to PlanEntry.GENERIC
+    (i.e. field.decode()) whenever the field's decoding cannot be expressed as a table entry
+    """
+    cls = type(field)
+    if field.get_offset() is None:
+        return None
+    if cls.decode is RegGroupField.decode:
+        entry = PlanEntry(field, PlanEntry.GROUP)
+        entry.members = [member.name for member in field.fields]
+        return entry
+    if field.get_deps():
+        return PlanEntry(field, PlanEntry.GENERIC)
+
+    if cls.decode is RegBitField.decode:
+        entry = PlanEntry(field, PlanEntry.BIT, 'B')
+        entry.shift = field.bitpos % 8
+        return entry
+    if cls.decode is RegBitsField.decode:
+        entry = PlanEntry(field, PlanEntry.NUMBER, 'B')
+        entry.mask = field.bitmask
+        entry.shift = field.bitpos
+        return entry
+    if cls.decode is HexRegField.decode:
+        return PlanEntry(field, PlanEntry.HEX, '%ds' % field.get_size())
+
+    if cls.decode is NumberRegField.decode and not field.bitdecode:
+        kind = PlanEntry.NUMBER
+    elif cls.decode is FixedNumberRegField.decode and not field.bitdecode:
+        kind = PlanEntry.NUMBER
+    elif cls.decode is CodeRegField.decode:
+        kind = PlanEntry.CODE
+    elif cls.decode is StringRegField.decode:
+        kind = PlanEntry.STRING
+    else:
+        return PlanEntry(field, PlanEntry.GENERIC)
+
+    split = _split_format(field.format, field.get_size())
+    if split is None:
+        return PlanEntry(field, PlanEntry.GENERIC)
+    entry = PlanEntry(field, kind, split[1], split[0])
+    if kind in (PlanEntry.NUMBER, PlanEntry.CODE):
+        entry.mask = field.get_bitmask()
+        entry.shift = field.start_bitpos if entry.mask is not None else 0
+    if kind == PlanEntry.NUMBER:
+        entry.scale = field.scale
+        if isinstance(field, FixedNumberRegField):
+            entry.divisor = 1 << field.num_frac_bits
+    elif kind == PlanEntry.CODE:
+        entry.table = field.code_dict
+    elif kind == PlanEntry.STRING:
+        entry.encoding = field.encoding
+    return entry
+
+class DecodePlan(object):
+    """
+    Flat decode plan for all fields of a XcvrMemMap
+
+    Leaf fields covered by a buffer are decoded by a small number of precompiled
+    struct.Struct layers (one unpack_from per layer, with fields that overlap each
+    other spread over separate layers). Group fields and fields with custom decoding
+    or dependencies are resolved afterwards in dependency order.
+
+    Args:
+        fields: dict mapping field names to XcvrFields, as returned by XcvrMemMap._get_all_fields()
+    """
+    def __init__(self, fields):
+        self.entries = {}
+        for name, field in fields.items():
+            entry = compile_field(field)
+            if entry is not None:
+                self.entries[name] = entry
+        self._leaves = sorted((entry for entry in self.entries.values() if entry.is_leaf()),
+                              key=lambda entry: (entry.offset, entry.size))
+        self._layers = {}
+
+    def get_layers(self, start, size):
+        """
+        Return: list of (struct.Struct, [PlanEntry]) decoding every leaf within [start, start + size)
+        """
+        key = (start, size)
+        layers = self._layers.get(key)
+        if layers is None:
+            layers = self._layers[key] = self._build_layers(start, size)
+        return layers
+
+    def _build_layers(self, start, size):
+        # Each pending layer is [byte order, end offset, format parts, entries]
+        pending = []
+        for entry in self._leaves:
+            if entry.offset < start or entry.offset + entry.size > start + size:
+                continue
+            for layer in pending:
+                if layer[1] <= entry.offset and (layer[0] is None or entry.order is None or
+                                                 layer[0] == entry.order):
+                    break
+            else:
+                layer = [None, start, [], []]
+                pending.append(layer)
+            if entry.offset > layer[1]:
+                layer[2].append('%dx' % (entry.offset - layer[1]))
+            layer[2].append(entry.fmt)
+            layer[3].append(entry)
+            layer[0] = layer[0] or entry.order
+            layer[1] = entry.offset + entry.size
+        return [(struct.Struct((order or '<') + ''.join(parts)), entries)
+                for order, _, parts, entries in pending]
+
+    def decode(self, buffers, names=None):
+        """
+        Decode fields from raw EEPROM data
+
+        Args:
+            buffers: an iterable of (offset, bytearray) tuples. A bytearray of None denotes a failed read.
+
+            names: an iterable of field names to decode. Defaults to every field
+            fully covered by the buffers.
+
+        Returns:
+            A dict mapping field names to decoded values. Requested fields not covered
+            by any buffer are mapped to None.
+        """
+        values = {}
+        raw = []
+        for start, data in buffers:
+            if data is None:
+                continue
+            raw.append((start, data))
+            for layer, entries in self.get_layers(start, len(data)):
+                for entry, value in zip(entries, layer.unpack_from(data)):
+                    values[entry.name] = entry.convert(value)
+
+        def slice_of(entry):
+            for start, data in raw:
+                if start <= entry.offset and entry.offset + entry.size <= start + len(data):
+                    return data[entry.offset - start:entry.offset - start + entry.size]
+            return None
+
+        def resolve(name):
+            if name in values:
+                return values[name]
+            entry = self.entries.get(name)
+            value = None
+            if entry is not None and not entry.is_leaf():
+                if entry.kind == PlanEntry.GROUP:
+                    if slice_of(entry) is not None:
+                        value = {member: resolve(member) for member in entry.members}
+                else:
+                    raw_data = slice_of(entry)
+                    if raw_data:
+                        decoded_deps = {dep: resolve(dep) for dep in entry.deps}
+                        value = entry.field.decode(raw_data, **decoded_deps)
+            values[name] = value
+            return value
+
+        if names is None:
+            names = [name for name, entry in self.entries.items() if slice_of(entry) is not None]
+        return {name: resolve(name) for name in names}
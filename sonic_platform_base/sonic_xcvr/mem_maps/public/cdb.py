@@ -1,5 +1,5 @@
 
-from ...fields import cdb_consts
+from ...fields import cdb_consts, consts
 from ..xcvr_mem_map import XcvrMemMap
 
 from ...fields.xcvr_field import (
@@ -37,6 +37,15 @@ class CdbMemMap(XcvrMemMap):
                            deps=[(cdb_consts.CDB1_IS_BUSY, cdb_consts.CDB1_HAS_FAILED, cdb_consts.CDB1_STATUS)]),
         )
 
+        self.cdb2_status = RegGroupField(cdb_consts.CDB2_CMD_STATUS_FIELD,
+            NumberRegField(cdb_consts.CDB2_CMD_STATUS, self.getaddr(0x0, 38),
+                RegBitField(cdb_consts.CDB2_IS_BUSY, 7),
+                RegBitField(cdb_consts.CDB2_HAS_FAILED, 6),
+                RegBitsField(cdb_consts.CDB2_STATUS, bitpos=0, size=6), bitdecode=True),
+            CdbStatusField(cdb_consts.CDB2_COMMAND_RESULT, self.getaddr(0x0, 38), size=1, format="B",
+                           status_deps=(cdb_consts.CDB2_IS_BUSY, cdb_consts.CDB2_HAS_FAILED, cdb_consts.CDB2_STATUS)),
+        )
+
         self.cdb1_firmware_info = RegGroupField(cdb_consts.CDB1_FIRMWARE_INFO,
                     NumberRegField(cdb_consts.CDB1_FIRMWARE_STATUS, self.getaddr(cdb_consts.LPL_PAGE, 136),
                        RegBitField(cdb_consts.CDB1_BANKA_OPER_STATUS, 0),
@@ -74,6 +83,88 @@ class CdbMemMap(XcvrMemMap):
                     self.codes.CDB_READ_METHOD),
         )
 
+        self.cdb_write_capabilities = RegGroupField(cdb_consts.CDB_WRITE_CAPABILITIES,
+            NumberRegField(cdb_consts.CDB_ADVERTISEMENT, self.getaddr(cdb_consts.CDB_ADV_PAGE, 163),
+                    RegBitsField(cdb_consts.CDB_INSTANCES_SUPPORTED, bitpos=6, size=2),
+                    RegBitField(cdb_consts.CDB_BACKGROUND_MODE_SUPPORTED, 5),
+                    RegBitField(cdb_consts.CDB_AUTO_PAGING_SUPPORTED, 4),
+                    RegBitsField(cdb_consts.CDB_MAX_PAGES_EPL, bitpos=0, size=4), bitdecode=True),
+            NumberRegField(cdb_consts.CDB_RW_LENGTH_EXTENSION, self.getaddr(cdb_consts.CDB_ADV_PAGE, 164)),
+            NumberRegField(cdb_consts.CDB_TRIGGER_ADVERTISEMENT, self.getaddr(cdb_consts.CDB_ADV_PAGE, 165),
+                    RegBitField(cdb_consts.CDB_COMMAND_TRIGGER_METHOD, 5), bitdecode=True),
+        )
+
+        # Replies of the PM commands, in the layout of C-CMIS pages 34h and 35h from the start of the reply (9Fh:136)
+        self.cdb_pm_features = NumberRegField(cdb_consts.CDB_PM_FEATURES, self.getaddr(cdb_consts.LPL_PAGE, 136),
+                RegBitField(cdb_consts.CDB_MEDIA_FEC_PM_SUPPORTED, 0),
+                RegBitField(cdb_consts.CDB_MEDIA_LINK_PM_SUPPORTED, 1), bitdecode=True)
+
+        self.cdb_media_fec_pm = RegGroupField(cdb_consts.CDB_MEDIA_FEC_PM,
+            NumberRegField(consts.RX_BITS_PM, self.getaddr(cdb_consts.LPL_PAGE, 136), format=">Q", size=8),
+            NumberRegField(consts.RX_BITS_SUB_INTERVAL_PM, self.getaddr(cdb_consts.LPL_PAGE, 144), format=">Q", size=8),
+            NumberRegField(consts.RX_CORR_BITS_PM, self.getaddr(cdb_consts.LPL_PAGE, 152), format=">Q", size=8),
+            NumberRegField(consts.RX_MIN_CORR_BITS_SUB_INTERVAL_PM, self.getaddr(cdb_consts.LPL_PAGE, 160), format=">Q", size=8),
+            NumberRegField(consts.RX_MAX_CORR_BITS_SUB_INTERVAL_PM, self.getaddr(cdb_consts.LPL_PAGE, 168), format=">Q", size=8),
+            NumberRegField(consts.RX_FRAMES_PM, self.getaddr(cdb_consts.LPL_PAGE, 176), format=">I", size=4),
+            NumberRegField(consts.RX_FRAMES_SUB_INTERVAL_PM, self.getaddr(cdb_consts.LPL_PAGE, 180), format=">I", size=4),
+            NumberRegField(consts.RX_FRAMES_UNCORR_ERR_PM, self.getaddr(cdb_consts.LPL_PAGE, 184), format=">I", size=4),
+            NumberRegField(consts.RX_MIN_FRAMES_UNCORR_ERR_SUB_INTERVAL_PM, self.getaddr(cdb_consts.LPL_PAGE, 188), format=">I", size=4),
+            NumberRegField(consts.RX_MAX_FRAMES_UNCORR_ERR_SUB_INTERVAL_PM, self.getaddr(cdb_consts.LPL_PAGE, 192), format=">I", size=4),
+        )
+
+        self.cdb_media_link_pm = RegGroupField(cdb_consts.CDB_MEDIA_LINK_PM,
+            NumberRegField(consts.RX_AVG_CD_PM, self.getaddr(cdb_consts.LPL_PAGE, 136), format=">i", size=4),
+            NumberRegField(consts.RX_MIN_CD_PM, self.getaddr(cdb_consts.LPL_PAGE, 140), format=">i", size=4),
+            NumberRegField(consts.RX_MAX_CD_PM, self.getaddr(cdb_consts.LPL_PAGE, 144), format=">i", size=4),
+            NumberRegField(consts.RX_AVG_DGD_PM, self.getaddr(cdb_consts.LPL_PAGE, 148), format=">H", size=2, scale=100.0),
+            NumberRegField(consts.RX_MIN_DGD_PM, self.getaddr(cdb_consts.LPL_PAGE, 150), format=">H", size=2, scale=100.0),
+            NumberRegField(consts.RX_MAX_DGD_PM, self.getaddr(cdb_consts.LPL_PAGE, 152), format=">H", size=2, scale=100.0),
+            NumberRegField(consts.RX_AVG_SOPMD_PM, self.getaddr(cdb_consts.LPL_PAGE, 154), format=">H", size=2, scale=100.0),
+            NumberRegField(consts.RX_MIN_SOPMD_PM, self.getaddr(cdb_consts.LPL_PAGE, 156), format=">H", size=2, scale=100.0),
+            NumberRegField(consts.RX_MAX_SOPMD_PM, self.getaddr(cdb_consts.LPL_PAGE, 158), format=">H", size=2, scale=100.0),
+            NumberRegField(consts.RX_AVG_PDL_PM, self.getaddr(cdb_consts.LPL_PAGE, 160), format=">H", size=2, scale=10.0),
+            NumberRegField(consts.RX_MIN_PDL_PM, self.getaddr(cdb_consts.LPL_PAGE, 162), format=">H", size=2, scale=10.0),
+            NumberRegField(consts.RX_MAX_PDL_PM, self.getaddr(cdb_consts.LPL_PAGE, 164), format=">H", size=2, scale=10.0),
+            NumberRegField(consts.RX_AVG_OSNR_PM, self.getaddr(cdb_consts.LPL_PAGE, 166), format=">H", size=2, scale=10.0),
+            NumberRegField(consts.RX_MIN_OSNR_PM, self.getaddr(cdb_consts.LPL_PAGE, 168), format=">H", size=2, scale=10.0),
+            NumberRegField(consts.RX_MAX_OSNR_PM, self.getaddr(cdb_consts.LPL_PAGE, 170), format=">H", size=2, scale=10.0),
+            NumberRegField(consts.RX_AVG_ESNR_PM, self.getaddr(cdb_consts.LPL_PAGE, 172), format=">H", size=2, scale=10.0),
+            NumberRegField(consts.RX_MIN_ESNR_PM, self.getaddr(cdb_consts.LPL_PAGE, 174), format=">H", size=2, scale=10.0),
+            NumberRegField(consts.RX_MAX_ESNR_PM, self.getaddr(cdb_consts.LPL_PAGE, 176), format=">H", size=2, scale=10.0),
+            NumberRegField(consts.RX_AVG_CFO_PM, self.getaddr(cdb_consts.LPL_PAGE, 178), format=">h", size=2),
+            NumberRegField(consts.RX_MIN_CFO_PM, self.getaddr(cdb_consts.LPL_PAGE, 180), format=">h", size=2),
+            NumberRegField(consts.RX_MAX_CFO_PM, self.getaddr(cdb_consts.LPL_PAGE, 182), format=">h", size=2),
+            NumberRegField(consts.RX_AVG_EVM_PM, self.getaddr(cdb_consts.LPL_PAGE, 184), format=">H", size=2, scale=655.35),
+            NumberRegField(consts.RX_MIN_EVM_PM, self.getaddr(cdb_consts.LPL_PAGE, 186), format=">H", size=2, scale=655.35),
+            NumberRegField(consts.RX_MAX_EVM_PM, self.getaddr(cdb_consts.LPL_PAGE, 188), format=">H", size=2, scale=655.35),
+            NumberRegField(consts.TX_AVG_POWER_PM, self.getaddr(cdb_consts.LPL_PAGE, 190), format=">h", size=2, scale=100.0),
+            NumberRegField(consts.TX_MIN_POWER_PM, self.getaddr(cdb_consts.LPL_PAGE, 192), format=">h", size=2, scale=100.0),
+            NumberRegField(consts.TX_MAX_POWER_PM, self.getaddr(cdb_consts.LPL_PAGE, 194), format=">h", size=2, scale=100.0),
+            NumberRegField(consts.RX_AVG_POWER_PM, self.getaddr(cdb_consts.LPL_PAGE, 196), format=">h", size=2, scale=100.0),
+            NumberRegField(consts.RX_MIN_POWER_PM, self.getaddr(cdb_consts.LPL_PAGE, 198), format=">h", size=2, scale=100.0),
+            NumberRegField(consts.RX_MAX_POWER_PM, self.getaddr(cdb_consts.LPL_PAGE, 200), format=">h", size=2, scale=100.0),
+            NumberRegField(consts.RX_AVG_SIG_POWER_PM, self.getaddr(cdb_consts.LPL_PAGE, 202), format=">h", size=2, scale=100.0),
+            NumberRegField(consts.RX_MIN_SIG_POWER_PM, self.getaddr(cdb_consts.LPL_PAGE, 204), format=">h", size=2, scale=100.0),
+            NumberRegField(consts.RX_MAX_SIG_POWER_PM, self.getaddr(cdb_consts.LPL_PAGE, 206), format=">h", size=2, scale=100.0),
+            NumberRegField(consts.RX_AVG_SOPROC_PM, self.getaddr(cdb_consts.LPL_PAGE, 208), format=">H", size=2),
+            NumberRegField(consts.RX_MIN_SOPROC_PM, self.getaddr(cdb_consts.LPL_PAGE, 210), format=">H", size=2),
+            NumberRegField(consts.RX_MAX_SOPROC_PM, self.getaddr(cdb_consts.LPL_PAGE, 212), format=">H", size=2),
+            NumberRegField(consts.RX_AVG_MER_PM, self.getaddr(cdb_consts.LPL_PAGE, 214), format=">H", size=2, scale=10.0),
+            NumberRegField(consts.RX_MIN_MER_PM, self.getaddr(cdb_consts.LPL_PAGE, 216), format=">H", size=2, scale=10.0),
+            NumberRegField(consts.RX_MAX_MER_PM, self.getaddr(cdb_consts.LPL_PAGE, 218), format=">H", size=2, scale=10.0),
+        )
+
+        # Reply length and check code of the commands with variable length replies
+        self.cdb_rpl_length = NumberRegField(cdb_consts.CDB_RPL_LENGTH,
+                self.getaddr(cdb_consts.LPL_PAGE, cdb_consts.RPL_LENGTH_OFFSET))
+        self.cdb_rpl_chkcode = NumberRegField(cdb_consts.CDB_RPL_CHKCODE,
+                self.getaddr(cdb_consts.LPL_PAGE, cdb_consts.RPL_LENGTH_OFFSET + 1))
+
+        self.cdb_vcs_features = RegGroupField(cdb_consts.CDB_VCS_FEATURES,
+            NumberRegField(cdb_consts.CDB_VCS_MAX_ENTRIES, self.getaddr(cdb_consts.LPL_PAGE, 136)),
+            NumberRegField(cdb_consts.CDB_VCS_MAX_VALUE_SIZE, self.getaddr(cdb_consts.LPL_PAGE, 137)),
+        )
+
         self.cdb1_query_status_cmd = CdbStatusQuery()
         self.cdb1_firmware_info_cmd = CdbGetFirmwareInfo()
         self.cdb1_firmware_mgmt_features_cmd = CdbGetFirmwareMgmtFeatures()
@@ -84,6 +175,13 @@ class CdbMemMap(XcvrMemMap):
         self.cdb1_commit_fw_download_cmd = CdbCommitFirmwareDownload()
         self.cdb1_write_lpl_block_cmd = CdbWriteLplBlock()
         self.cdb1_write_epl_block_cmd = CdbWriteEplBlock()
+        self.cdb1_pm_features_cmd = CdbGetPmFeatures()
+        self.cdb1_media_fec_pm_cmd = CdbGetMediaFecPm()
+        self.cdb1_media_link_pm_cmd = CdbGetMediaLinkPm()
+        self.cdb1_vcs_features_cmd = CdbVcsGetFeatures()
+        self.cdb1_vcs_write_cmd = CdbVcsWrite()
+        self.cdb1_vcs_read_cmd = CdbVcsRead()
+        self.cdb1_vcs_apply_cmd = CdbVcsApply()
 
     def _get_all_cdb_cmds(self):
         if not self.cdb_cmds:
@@ -360,3 +458,131 @@ class CdbWriteEplBlock(CDBCommand):
         lpl_data = struct.pack(">I", blkaddr) # EPL block data is written separately
         return super(CdbWriteEplBlock, self).encode(payload=lpl_data)
 
+class CdbGetPmFeatures(CDBCommand):
+    """
+    CDB command 0x0200 to get the PM features, i.e. which PM commands are supported
+
+    Args:
+        id: 2 bytes identifier
+        epl: 2 bytes extended payload length
+        lpl: 1 byte length of payload
+        checksum: 1 byte checksum
+    """
+    def __init__(self, cmd_id=cdb_consts.CDB_GET_PM_FEATURES_CMD,
+                 reply_field=cdb_consts.CDB_PM_FEATURES):
+        super(CdbGetPmFeatures, self).__init__(cmd_id,
+                                            epl=0,
+                                            lpl=0,
+                                            rpl_field=reply_field)
+
+class CdbGetMediaFecPm(CDBCommand):
+    """
+    CDB command 0x0210 to get the media lane FEC PMs of C-CMIS page 34h
+
+    Args:
+        id: 2 bytes identifier
+        epl: 2 bytes extended payload length
+        lpl: 1 byte length of payload
+        checksum: 1 byte checksum
+    """
+    def __init__(self, cmd_id=cdb_consts.CDB_GET_MEDIA_FEC_PM_CMD,
+                 reply_field=cdb_consts.CDB_MEDIA_FEC_PM):
+        super(CdbGetMediaFecPm, self).__init__(cmd_id,
+                                            epl=0,
+                                            lpl=0,
+                                            rpl_field=reply_field)
+
+class CdbGetMediaLinkPm(CDBCommand):
+    """
+    CDB command 0x0211 to get the media lane link PMs of C-CMIS page 35h
+
+    Args:
+        id: 2 bytes identifier
+        epl: 2 bytes extended payload length
+        lpl: 1 byte length of payload
+        checksum: 1 byte checksum
+    """
+    def __init__(self, cmd_id=cdb_consts.CDB_GET_MEDIA_LINK_PM_CMD,
+                 reply_field=cdb_consts.CDB_MEDIA_LINK_PM):
+        super(CdbGetMediaLinkPm, self).__init__(cmd_id,
+                                            epl=0,
+                                            lpl=0,
+                                            rpl_field=reply_field)
+
+class CdbVcsGetFeatures(CDBCommand):
+    """
+    CDB command 0x4000 to get the Versatile Control Set features, i.e. the maximum
+    number of entries of a command and the maximum size of a parameter value
+
+    Args:
+        id: 2 bytes identifier
+        epl: 2 bytes extended payload length
+        lpl: 1 byte length of payload
+        checksum: 1 byte checksum
+    """
+    def __init__(self, cmd_id=cdb_consts.CDB_VCS_GET_FEATURES_CMD,
+                 reply_field=cdb_consts.CDB_VCS_FEATURES):
+        super(CdbVcsGetFeatures, self).__init__(cmd_id,
+                                            epl=0,
+                                            lpl=0,
+                                            rpl_field=reply_field)
+
+class CdbVcsWrite(CDBCommand):
+    """
+    CDB command 0x4001 to write a batch of Versatile Control Set parameters
+
+    The LPL holds the number of entries followed by, for each entry, its 2 bytes
+    parameter id, 1 byte value length and value. The reply holds the number of
+    entries followed by a 1 byte result per entry, 0 on success.
+
+    Args:
+        id: 2 bytes identifier
+        epl: 2 bytes extended payload length
+        lpl: 1 byte length of payload
+        checksum: 1 byte checksum
+    """
+    def __init__(self, cmd_id=cdb_consts.CDB_VCS_WRITE_CMD):
+        super(CdbVcsWrite, self).__init__(cmd_id,
+                                            epl=0, lpl=0)
+
+    def encode(self, payload):
+        lpl_data = struct.pack("B", len(payload))
+        for param_id, value in payload:
+            lpl_data += struct.pack(">HB", param_id, len(value)) + bytes(value)
+        return super(CdbVcsWrite, self).encode(payload=lpl_data)
+
+class CdbVcsRead(CDBCommand):
+    """
+    CDB command 0x4002 to read a batch of Versatile Control Set parameters
+
+    The LPL holds the number of entries followed by their 2 bytes parameter ids.
+    The reply holds the number of entries followed by, for each entry, its 2 bytes
+    parameter id, 1 byte value length and value.
+
+    Args:
+        id: 2 bytes identifier
+        epl: 2 bytes extended payload length
+        lpl: 1 byte length of payload
+        checksum: 1 byte checksum
+    """
+    def __init__(self, cmd_id=cdb_consts.CDB_VCS_READ_CMD):
+        super(CdbVcsRead, self).__init__(cmd_id,
+                                            epl=0, lpl=0)
+
+    def encode(self, payload):
+        lpl_data = struct.pack(">B%dH" % len(payload), len(payload), *payload)
+        return super(CdbVcsRead, self).encode(payload=lpl_data)
+
+class CdbVcsApply(CDBCommand):
+    """
+    CDB command 0x4003 to apply the Versatile Control Set parameters written so far
+
+    Args:
+        id: 2 bytes identifier
+        epl: 2 bytes extended payload length
+        lpl: 1 byte length of payload
+        checksum: 1 byte checksum
+    """
+    def __init__(self, cmd_id=cdb_consts.CDB_VCS_APPLY_CMD):
+        super(CdbVcsApply, self).__init__(cmd_id,
+                                            epl=0, lpl=0)
@@ -126,11 +126,13 @@ class CmisFlatMemMap(XcvrMemMap):
             CodeRegField(consts.MODULE_STATE, self.getaddr(0x0, 3), self.codes.MODULE_STATE,
                  *(RegBitField("Bit%d" % (bit), bit) for bit in range (1, 4))
             ),
+            NumberRegField(consts.LANE_FLAGS_SUMMARY_BANK0, self.getaddr(0x0, 4), size=1),
             NumberRegField(consts.MODULE_FIRMWARE_FAULT_INFO, self.getaddr(0x0, 8), size=1),
             NumberRegField(consts.MODULE_FLAG_BYTE1, self.getaddr(0x0, 9), size=1),
             NumberRegField(consts.MODULE_FLAG_BYTE2, self.getaddr(0x0, 10), size=1),
             NumberRegField(consts.MODULE_FLAG_BYTE3, self.getaddr(0x0, 11), size=1),
             NumberRegField(consts.CDB1_STATUS, self.getaddr(0x0, 37), size=1),
+            NumberRegField(consts.CDB2_STATUS, self.getaddr(0x0, 38), size=1),
             CodeRegField(consts.MODULE_FAULT_CAUSE, self.getaddr(0x0, 41), self.codes.MODULE_FAULT_CAUSE),
         )
 
@@ -27,6 +27,8 @@ class Sff8636MemMap(XcvrMemMap):
             )
         )
 
+        self.INTL = RegBitField(consts.INTL_FIELD, 1, self.get_addr(0, 2))
+
         self.SERIAL_ID = RegGroupField(consts.SERIAL_ID_FIELD,
             CodeRegField(consts.ID_FIELD, self.get_addr(0, 0), self.codes.XCVR_IDENTIFIERS),
             CodeRegField(consts.ID_ABBRV_FIELD, self.get_addr(0, 0), self.codes.XCVR_IDENTIFIER_ABBRV),
@@ -100,6 +102,10 @@ class Sff8636MemMap(XcvrMemMap):
               for channel, bitpos in zip(range(1, 5), range(0, 4)))
         )
 
+        self.LOS_MASK = NumberRegField(consts.LOS_MASK_FIELD, self.get_addr(0, 100), ro=False)
+
+        self.TX_FAULT_MASK = NumberRegField(consts.TX_FAULT_MASK_FIELD, self.get_addr(0, 101), ro=False)
+
         self.TX_DISABLE = NumberRegField(consts.TX_DISABLE_FIELD, self.get_addr(0, 86),
             *(RegBitField("Tx%dDisable" % channel, bitpos, ro=False)
               for channel, bitpos in zip(range(1, 5), range(0, 4))),
@@ -4,13 +4,49 @@
    Base class for representing xcvr memory maps in SONiC
 """
 
+import threading
+
 from  ..fields.xcvr_field import XcvrField
+from .decode_plan import DecodePlan
+
+_shared_mem_maps = {}
+_shared_mem_maps_lock = threading.Lock()
+
+def get_shared_mem_map(mem_map_class, codes):
+   """
+   Return a mem map instance shared by every caller asking for the same (mem_map_class, codes) pair
+
+   Mem maps and their field trees are immutable once built, so a single instance can
+   safely back the XcvrEeprom of every port using that memory layout.
+
+   Args:
+      mem_map_class: the XcvrMemMap subclass to instantiate
+      codes: the XcvrCodes class passed to its constructor
+
+   Returns:
+      The shared XcvrMemMap instance
+   """
+   key = (mem_map_class, codes)
+   mem_map = _shared_mem_maps.get(key)
+   if mem_map is None:
+      with _shared_mem_maps_lock:
+         mem_map = _shared_mem_maps.get(key)
+         if mem_map is None:
+            mem_map = mem_map_class(codes)
+            # Build the field lookup table up front so concurrent readers never race on it
+            mem_map._get_all_fields()
+            _shared_mem_maps[key] = mem_map
+   return mem_map
 
 class XcvrMemMap(object):
+   # Decode plans shared by all instances built from the same mem map class and codes
+   _decode_plans = {}
+
    def __init__(self, codes):
       self.codes = codes
       self._fields = None
-   
+      self._decode_plan = None
+
    def _get_all_fields(self):
       if self._fields is None:
          self._fields = {}
@@ -23,3 +59,15 @@ class XcvrMemMap(object):
 
    def get_field(self, field_name):
       return self._get_all_fields()[field_name]
+
+   def get_decode_plan(self):
+      """
+      Return: the DecodePlan for this mem map, compiled once per (mem map class, codes) pair
+      """
+      if self._decode_plan is None:
+         key = (type(self), self.codes)
+         plan = XcvrMemMap._decode_plans.get(key)
+         if plan is None:
+            plan = XcvrMemMap._decode_plans[key] = DecodePlan(self._get_all_fields())
+         self._decode_plan = plan
+      return self._decode_plan
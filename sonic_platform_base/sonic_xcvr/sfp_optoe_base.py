@@ -5,15 +5,67 @@
     in SONiC
 """
 
+import copy
+import errno
+import os
+import threading
+
 from ..sfp_base import SfpBase
+from .xcvr_flag_accumulator import XcvrFlagAccumulator
 
 SFP_OPTOE_PAGE_SELECT_OFFSET = 127
 SFP_OPTOE_UPPER_PAGE0_OFFSET = 128
 SFP_OPTOE_PAGE_SIZE = 128
 
+# errnos meaning the eeprom device went away (e.g. module removed, driver rebound)
+# and the persistent file descriptor must be reopened
+SFP_OPTOE_STALE_FD_ERRNOS = (errno.ENODEV, errno.ENXIO, errno.EBADF, errno.ENOENT, errno.ESTALE)
+
 class SfpOptoeBase(SfpBase):
+    # When enabled, each port keeps one file descriptor to its eeprom open and
+    # accesses it with os.pread()/os.pwrite() instead of opening the file per access
+    persistent_eeprom_fd = False
+
+    _eeprom_fd = None
+    _eeprom_fd_path = None
+    _eeprom_fd_lock = None
+    # Guards the creation of the per port _eeprom_fd_lock by subclasses not calling __init__
+    _eeprom_fd_lock_guard = threading.Lock()
+
+    # XcvrIoStats accounting the eeprom accesses of the XcvrApis created from now on, if any
+    xcvr_io_stats = None
+
+    # When enabled, the latched flags read by the XcvrApis refreshed from now on go
+    # through a per port XcvrFlagAccumulator, so that consumers do not clear each other's flags
+    xcvr_flag_accumulation = False
+
+    _xcvr_flag_accumulator = None
+
+    @classmethod
+    def set_persistent_eeprom_fd(cls, enabled: bool):
+        """
+        Set the persistent_eeprom_fd flag to control how read_eeprom/write_eeprom access the eeprom.
+        """
+        cls.persistent_eeprom_fd = bool(enabled)
+
+    @classmethod
+    def set_xcvr_io_stats(cls, io_stats):
+        """
+        Set the XcvrIoStats instrumenting the XcvrApis refreshed from now on. None disables instrumentation.
+        """
+        cls.xcvr_io_stats = io_stats
+
+    @classmethod
+    def set_xcvr_flag_accumulation(cls, enabled: bool):
+        """
+        Set the xcvr_flag_accumulation flag to control whether the XcvrApis refreshed from now on
+        accumulate the latched flags they read.
+        """
+        cls.xcvr_flag_accumulation = bool(enabled)
+
     def __init__(self, bank=0):
         SfpBase.__init__(self, bank=bank)
+        self._eeprom_fd_lock = threading.RLock()
 
     def get_model(self):
         api = self.get_xcvr_api()
@@ -318,7 +370,139 @@ class SfpOptoeBase(SfpBase):
         except (OSError, IOError):
             pass
 
+    def _get_eeprom_fd_lock(self):
+        """
+        Returns the lock of the persistent file descriptor of this port's eeprom
+        """
+        if self._eeprom_fd_lock is None:
+            with self._eeprom_fd_lock_guard:
+                if self._eeprom_fd_lock is None:
+                    self._eeprom_fd_lock = threading.RLock()
+        return self._eeprom_fd_lock
+
+    def _get_eeprom_fd(self):
+        """
+        Returns the persistent file descriptor of the eeprom, opening it if needed
+        """
+        path = self.get_eeprom_path()
+        with self._get_eeprom_fd_lock():
+            if self._eeprom_fd is not None and self._eeprom_fd_path != path:
+                self._close_eeprom_fd()
+            if self._eeprom_fd is None:
+                try:
+                    fd = os.open(path, os.O_RDWR)
+                except PermissionError:
+                    fd = os.open(path, os.O_RDONLY)
+                self._eeprom_fd = fd
+                self._eeprom_fd_path = path
+            return self._eeprom_fd
+
+    def _close_eeprom_fd(self):
+        fd, self._eeprom_fd = self._eeprom_fd, None
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def close_eeprom_fd(self):
+        """
+        Closes the persistent eeprom file descriptor, if any. It is reopened on next access.
+        """
+        with self._get_eeprom_fd_lock():
+            self._close_eeprom_fd()
+
+    def _access_eeprom_fd(self, access):
+        """
+        Runs access(fd) on the persistent eeprom file descriptor, reopening it once if
+        the device went away. Returns None if the access failed.
+
+        The file descriptor lock is held during the access, so that the descriptor
+        cannot be closed (and its number reused) by another thread meanwhile.
+        """
+        with self._get_eeprom_fd_lock():
+            for attempt in range(2):
+                try:
+                    return access(self._get_eeprom_fd())
+                except (OSError, IOError) as e:
+                    if e.errno not in SFP_OPTOE_STALE_FD_ERRNOS:
+                        return None
+                    self._close_eeprom_fd()
+        return None
+
+    def refresh_xcvr_api(self):
+        """
+        Updates the XcvrApi associated with this SFP, instrumenting its eeprom
+        accesses if xcvr_io_stats is set and accumulating its latched flags if
+        xcvr_flag_accumulation is set
+
+        The XcvrApi is created by a copy of this SFP's factory whose reader and
+        writer are instrumented, so that platform-specific factories and accessors
+        are preserved.
+        """
+        io_stats = self.xcvr_io_stats
+        if io_stats is None and not self.xcvr_flag_accumulation:
+            super(SfpOptoeBase, self).refresh_xcvr_api()
+            return
+        factory = copy.copy(self._xcvr_api_factory)
+        if io_stats is not None:
+            factory.reader, factory.writer = io_stats.instrument(factory.reader, factory.writer,
+                                                                 self._get_xcvr_io_stats_port())
+        accumulator = None
+        if self.xcvr_flag_accumulation:
+            # Outermost, so that the reads served from the accumulated flags are not accounted
+            accumulator = self.get_xcvr_flag_accumulator()
+            accumulator.set_ranges(())
+            factory.reader = accumulator.wrap(factory.reader)
+        if io_stats is not None:
+            with io_stats.api_call("XcvrApiFactory.create_xcvr_api"):
+                api = factory.create_xcvr_api()
+            api = io_stats.instrument_api(api) if api is not None else None
+        else:
+            api = factory.create_xcvr_api()
+        if accumulator is not None and api is not None:
+            accumulator.set_ranges(api.LATCHED_FLAG_RANGES)
+        self._xcvr_api = api
+
+    def get_xcvr_flag_accumulator(self):
+        """
+        Retrieves the XcvrFlagAccumulator of this SFP, kept across XcvrApi refreshes
+        so that its consumers stay registered
+
+        Returns:
+            An XcvrFlagAccumulator, whose latched ranges are those of the current
+            XcvrApi if xcvr_flag_accumulation is set
+        """
+        if self._xcvr_flag_accumulator is None:
+            self._xcvr_flag_accumulator = XcvrFlagAccumulator()
+        return self._xcvr_flag_accumulator
+
+    def _get_xcvr_io_stats_port(self):
+        try:
+            return self.get_name()
+        except NotImplementedError:
+            return "sfp%x" % id(self)
+
+    def remove_xcvr_api(self):
+        """
+        Removes the cached XcvrApi and the persistent eeprom file descriptor
+        so that both are refreshed on next access.
+        """
+        super(SfpOptoeBase, self).remove_xcvr_api()
+        if self._xcvr_flag_accumulator is not None:
+            # The flags accumulated may be those of another module
+            self._xcvr_flag_accumulator.set_ranges(())
+        self.close_eeprom_fd()
+
     def read_eeprom(self, offset, num_bytes):
+        if self.persistent_eeprom_fd:
+            if offset >= SFP_OPTOE_UPPER_PAGE0_OFFSET and \
+                offset < (SFP_OPTOE_UPPER_PAGE0_OFFSET+SFP_OPTOE_PAGE_SIZE):
+                current_page = self.read_eeprom(SFP_OPTOE_PAGE_SELECT_OFFSET, 1)
+                if current_page and current_page[0] != 0:
+                    self.set_page0()
+            raw_data = self._access_eeprom_fd(lambda fd: os.pread(fd, num_bytes, offset))
+            return bytearray(raw_data) if raw_data is not None else None
         try:
             with open(self.get_eeprom_path(), mode='rb', buffering=0) as f:
                 if offset >= SFP_OPTOE_UPPER_PAGE0_OFFSET  and \
@@ -333,6 +517,9 @@ class SfpOptoeBase(SfpBase):
             return None
 
     def write_eeprom(self, offset, num_bytes, write_buffer):
+        if self.persistent_eeprom_fd:
+            written = self._access_eeprom_fd(lambda fd: os.pwrite(fd, bytes(write_buffer[0:num_bytes]), offset))
+            return written is not None
         try:
             with open(self.get_eeprom_path(), mode='r+b', buffering=0) as f:
                 f.seek(offset)
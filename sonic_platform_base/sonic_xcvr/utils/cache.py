@@ -1,19 +1,81 @@
 from collections import abc
+import functools
 import os
+import time
+
+# Names of the instance attributes holding values cached by read_only_cached_api_return
+_cache_names = set()
+
+def _cache_time_name(cache_name):
+    return f'{cache_name}_time'
+
+def invalidate_cached_api_returns(api):
+    """Drop every value cached by read_only_cached_api_return on api."""
+    for cache_name in _cache_names:
+        api.__dict__.pop(cache_name, None)
+        api.__dict__.pop(_cache_time_name(cache_name), None)
+
+def validate_cache_fingerprint(api):
+    """
+    Invalidate the caches of api if the module fingerprint changed.
+
+    The fingerprint is read with api.get_cache_fingerprint() at most once every
+    api.cache_fingerprint_interval seconds. Fingerprinting is disabled if the
+    interval is None.
+    """
+    interval = getattr(api, 'cache_fingerprint_interval', None)
+    if interval is None:
+        return
+    now = time.monotonic()
+    checked = getattr(api, '_cache_fingerprint_time', None)
+    if checked is not None and now - checked < interval:
+        return
+    fingerprint = api.get_cache_fingerprint()
+    api._cache_fingerprint_time = now
+    if fingerprint is None or fingerprint != getattr(api, '_cache_fingerprint', None):
+        invalidate_cached_api_returns(api)
+        api._cache_fingerprint = fingerprint
+
+def read_only_cached_api_return(func=None, ttl=None):
+    """
+    Cache until func() returns a non-None, non-empty collections cache_value.
+
+    Used either bare or as read_only_cached_api_return(ttl=seconds) for
+    semi-static values, which are then re-read once older than ttl seconds.
+    """
+    if func is None:
+        return lambda func: read_only_cached_api_return(func, ttl)
 
-def read_only_cached_api_return(func):
-    """Cache until func() returns a non-None, non-empty collections cache_value."""
     cache_name = f'_{func.__name__}_cache'
+    cache_time_name = _cache_time_name(cache_name)
+    _cache_names.add(cache_name)
     def wrapper(self):
         if not self.cache_enabled:
             return func(self)
+        validate_cache_fingerprint(self)
+        if ttl is not None and hasattr(self, cache_name) and \
+                time.monotonic() - getattr(self, cache_time_name, 0) >= ttl:
+            delattr(self, cache_name)
         if not hasattr(self, cache_name):
             cache_value = func(self)
             setattr(self, cache_name, cache_value)
+            setattr(self, cache_time_name, time.monotonic())
         else:
             cache_value = getattr(self, cache_name)
             if cache_value is None or (isinstance(cache_value, abc.Iterable) and not cache_value):
                 cache_value = func(self)
                 setattr(self, cache_name, cache_value)
+                setattr(self, cache_time_name, time.monotonic())
         return cache_value
     return wrapper
+
+def memoized_eeprom_reads(func):
+    """
+    Run func(self, ...) inside self.xcvr_eeprom.memoize(), so that fields (and shared
+    field dependencies) read several times by one API call are read only once.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with self.xcvr_eeprom.memoize():
+            return func(self, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,103 @@
+import hashlib
+import mmap
+import os
+
+class FwImage(object):
+    """
+    Firmware image file memory-mapped once, handing out memoryview slices of its
+    content so that downloading it neither copies nor allocates per block
+
+    The image is made of the start payload (header) sent with CMD 0101h, followed
+    by the payload written block by block with CMD 0103h/0104h, block addresses
+    being relative to the start of the payload.
+
+    Args:
+        imagepath: path of the firmware image file
+        start_payload_size: size in bytes of the start payload
+
+    Raises:
+        OSError if the image cannot be read, ValueError if it is smaller than the start payload
+    """
+    def __init__(self, imagepath, start_payload_size=0):
+        with open(imagepath, 'rb') as f:
+            self.size = os.fstat(f.fileno()).st_size
+            # Empty files cannot be mapped
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        if self.size < start_payload_size:
+            self.close()
+            raise ValueError("Firmware image file is too small: expected at least %d bytes for header, got %d"
+                             % (start_payload_size, self.size))
+        self.data = memoryview(self._mmap if self._mmap is not None else b'')
+        self.header = self.data[:start_payload_size]
+        self.payload = self.data[start_payload_size:]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        for view in ('payload', 'header', 'data'):
+            if hasattr(self, view):
+                getattr(self, view).release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Slices are still referenced, the mapping is closed once they are released
+                pass
+            self._mmap = None
+
+    def get_digest(self):
+        """
+        Return: the SHA-256 hex digest of the whole image
+        """
+        return hashlib.sha256(self.data).hexdigest()
+
+    def get_blocks(self, block_size, address=0):
+        """
+        Iterate over the payload in blocks of block_size bytes (the last one may be shorter)
+
+        Args:
+            block_size: maximum size in bytes of a block
+            address: payload address of the first block
+
+        Returns:
+            An iterator of (address, memoryview of the block data) tuples
+        """
+        if address >= len(self.payload):
+            return
+        for block_address in range(address, len(self.payload), block_size):
+            yield block_address, self.payload[block_address:block_address + block_size]
+
+class FwDownloadCheckpoint(object):
+    """
+    Progress of a firmware download, used to resume an interrupted download of the
+    same image instead of restarting it from address 0
+
+    Attributes:
+        digest: FwImage.get_digest() of the image being downloaded
+        imagesize: size in bytes of the image being downloaded
+        address: block address (relative to the end of the start payload) following
+                 the last block acknowledged by the module
+    """
+    __slots__ = ("digest", "imagesize", "address")
+
+    def __init__(self, digest, imagesize, address=0):
+        self.digest = digest
+        self.imagesize = imagesize
+        self.address = address
+
+    def get_resume_address(self, digest, imagesize):
+        """
+        Return: the address to resume a download of the image with digest and imagesize
+                from, 0 if it is not the image of this checkpoint
+        """
+        if digest != self.digest or imagesize != self.imagesize:
+            return 0
+        return self.address
+
+    def __repr__(self):
+        return "FwDownloadCheckpoint(digest=%r, imagesize=%r, address=%#x)" % (
+            self.digest, self.imagesize, self.address)
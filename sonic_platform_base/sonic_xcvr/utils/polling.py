@@ -0,0 +1,173 @@
+from concurrent.futures import Future
+import heapq
+import itertools
+import threading
+import time
+
+# Default polling intervals (seconds) of poll_with_backoff
+POLL_MIN_INTERVAL = 0.0005
+POLL_MAX_INTERVAL = 0.1
+POLL_BACKOFF = 2.0
+
+def poll_with_backoff(poll, done, timeout, min_interval=POLL_MIN_INTERVAL,
+                      max_interval=POLL_MAX_INTERVAL, backoff=POLL_BACKOFF, start=None):
+    """
+    Call poll() until done(value, elapsed) returns True or timeout seconds elapsed.
+
+    The first poll is made immediately. The interval between polls starts at
+    min_interval and is multiplied by backoff after each poll, up to max_interval,
+    so that fast operations are detected within a fraction of a millisecond without
+    hammering the bus during slow ones. The last sleep is cut so as not to overshoot
+    the timeout.
+
+    Args:
+        poll: callable returning the polled value
+        done: callable taking (value, seconds elapsed since start) and returning True
+              when polling should stop
+        timeout: maximum seconds to poll for, measured from start
+        start: time.monotonic() of the start of the operation, defaults to now
+
+    Returns:
+        A tuple of (last polled value, seconds elapsed since start, True if done)
+    """
+    start = time.monotonic() if start is None else start
+    interval = min_interval
+    while True:
+        value = poll()
+        elapsed = time.monotonic() - start
+        if done(value, elapsed):
+            return value, elapsed, True
+        if elapsed >= timeout:
+            return value, elapsed, False
+        time.sleep(min(interval, timeout - elapsed))
+        interval = min(interval * backoff, max_interval)
+
+class BackoffPoller(object):
+    """
+    Polls many operations concurrently on a single thread, each with the exponential
+    backoff of poll_with_backoff(), completing a Future per operation
+
+    This lets callers submit long running operations (e.g. CDB commands on many
+    modules) and wait for them only when and if they need to, instead of pinning a
+    thread per operation. The polling thread is started on the first submit().
+    """
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def get_shared(cls):
+        """
+        Return: the BackoffPoller shared by all the callers not providing their own
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        # Heap of (next poll time, sequence, operation)
+        self._heap = []
+        self._seq = itertools.count()
+        self._thread = None
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Stop the polling thread, failing the operations still pending with a RuntimeError
+        """
+        with self._cond:
+            self._closed = True
+            heap, self._heap = self._heap, []
+            thread, self._thread = self._thread, None
+            self._cond.notify()
+        for _, _, operation in heap:
+            operation["future"].set_exception(RuntimeError("BackoffPoller closed"))
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def get_pending(self):
+        """
+        Return: the number of operations still being polled
+        """
+        with self._cond:
+            return len(self._heap)
+
+    def submit(self, poll, done, timeout, min_interval=POLL_MIN_INTERVAL,
+               max_interval=POLL_MAX_INTERVAL, backoff=POLL_BACKOFF, start=None):
+        """
+        Poll an operation the same as poll_with_backoff() without blocking the caller
+
+        Returns:
+            A concurrent.futures.Future resolving to the poll_with_backoff() result tuple,
+            or raising the exception raised by poll() or done(). It cannot be cancelled.
+        """
+        future = Future()
+        future.set_running_or_notify_cancel()
+        operation = {
+            "future": future, "poll": poll, "done": done, "timeout": timeout,
+            "interval": min_interval, "max_interval": max_interval, "backoff": backoff,
+            "start": time.monotonic() if start is None else start,
+        }
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BackoffPoller is closed")
+            heapq.heappush(self._heap, (time.monotonic(), next(self._seq), operation))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="backoff_poller", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def _poll(self, operation):
+        """
+        Poll an operation once
+
+        Returns: the time of the next poll, None once the operation is completed
+        """
+        future = operation["future"]
+        try:
+            value = operation["poll"]()
+            elapsed = time.monotonic() - operation["start"]
+            if operation["done"](value, elapsed):
+                future.set_result((value, elapsed, True))
+                return None
+        except Exception as e:
+            future.set_exception(e)
+            return None
+        timeout = operation["timeout"]
+        if elapsed >= timeout:
+            future.set_result((value, elapsed, False))
+            return None
+        interval = operation["interval"]
+        operation["interval"] = min(interval * operation["backoff"], operation["max_interval"])
+        return time.monotonic() + min(interval, timeout - elapsed)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if self._heap:
+                        delay = self._heap[0][0] - time.monotonic()
+                        if delay <= 0:
+                            break
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+                if self._closed:
+                    return
+                _, seq, operation = heapq.heappop(self._heap)
+            # Poll outside of the lock so that operations can be submitted meanwhile
+            next_due = self._poll(operation)
+            if next_due is not None:
+                with self._cond:
+                    if not self._closed:
+                        heapq.heappush(self._heap, (next_due, seq, operation))
+                        continue
+                operation["future"].set_exception(RuntimeError("BackoffPoller closed"))
@@ -6,6 +6,7 @@
 """
 import re
 from .xcvr_eeprom import XcvrEeprom
+from .mem_maps.xcvr_mem_map import get_shared_mem_map
 # TODO: remove the following imports
 from .codes.public.cmis import CmisCodes
 from .api.public.cmis import CmisApi
@@ -92,10 +93,10 @@ class XcvrApiFactory(object):
         elif vendor_name == 'Hisense' and vendor_pn is not None and re.match(HISENSE_2X100G_VENDOR_PN, vendor_pn):
             api = self._create_api(CmisCodes, CmisMemMap, CmisAocSingleBankApi)
         else:
-            xcvr_eeprom = XcvrEeprom(self.reader, self.writer, CmisMemMap(CmisCodes))
+            xcvr_eeprom = XcvrEeprom(self.reader, self.writer, get_shared_mem_map(CmisMemMap, CmisCodes))
             api = CmisApi(xcvr_eeprom, init_cdb_fw_handler=True)
             if api.is_coherent_module():
-                xcvr_eeprom = XcvrEeprom(self.reader, self.writer, CCmisMemMap(CmisCodes))
+                xcvr_eeprom = XcvrEeprom(self.reader, self.writer, get_shared_mem_map(CCmisMemMap, CmisCodes))
                 api = CCmisApi(xcvr_eeprom, init_cdb_fw_handler=True)
         return api
 
@@ -111,7 +112,7 @@ class XcvrApiFactory(object):
 
     def _create_api(self, codes_class, mem_map_class, api_class):
         codes = codes_class
-        mem_map = mem_map_class(codes)
+        mem_map = get_shared_mem_map(mem_map_class, codes)
         xcvr_eeprom = XcvrEeprom(self.reader, self.writer, mem_map)
         return api_class(xcvr_eeprom)
 
@@ -0,0 +1,136 @@
+"""
+    xcvr_benchmark.py
+
+    Benchmark of XcvrApi calls against EEPROM images recorded from real modules,
+    measuring EEPROM transactions, bytes and wall time per call
+
+    Usage: python -m sonic_platform_base.sonic_xcvr.xcvr_benchmark [options] IMAGE...
+"""
+
+import argparse
+from collections import namedtuple
+import json
+import os
+import sys
+import time
+
+from .xcvr_api_factory import XcvrApiFactory
+from .xcvr_eeprom_image import EepromImage, EepromReplay
+from .xcvr_io_stats import OP_READ, OP_WRITE, XcvrIoStats
+
+# (benchmark name, XcvrApi method name)
+DEFAULT_BENCHMARK_CALLS = (
+    ("info", "get_transceiver_info"),
+    ("dom", "get_transceiver_dom_real_value"),
+    ("dom_flags", "get_transceiver_dom_flags"),
+    ("status_flags", "get_transceiver_status_flags"),
+    ("thresholds", "get_transceiver_threshold_info"),
+    ("vdm", "get_transceiver_vdm_real_value"),
+    ("pm", "get_transceiver_pm"),
+)
+
+# Averages per iteration of one benchmark call on one image. error is the repr of the
+# exception that stopped the iterations, if any, making the averages partial. Calls
+# the XcvrApi does not implement are not reported.
+XcvrBenchmarkResult = namedtuple("XcvrBenchmarkResult", [
+    "image", "api", "name", "iterations", "reads", "writes", "bytes", "page_switches",
+    "wall_time", "error"])
+
+def run_benchmark(image, image_name="image", calls=DEFAULT_BENCHMARK_CALLS, iterations=10,
+                  latency=0.0, byte_latency=0.0, cold=True):
+    """
+    Benchmark XcvrApi calls against an EepromImage
+
+    Args:
+        image: EepromImage to replay
+        image_name: name reported in the results
+        calls: iterable of (benchmark name, XcvrApi method name)
+        iterations: number of times each call is made
+        latency: simulated seconds per EEPROM transaction
+        byte_latency: simulated seconds per EEPROM byte transferred
+        cold: drop the API return value cache before each iteration, so that the
+              cost of the first call after insertion is measured
+
+    Returns:
+        A list of XcvrBenchmarkResult
+    """
+    stats = XcvrIoStats()
+    # Writes (e.g. VDM freeze requests) are not applied, so every iteration sees the same image
+    replay = EepromReplay(image, latency, byte_latency, read_only=True)
+    reader, writer = stats.instrument(replay.reader, replay.writer, image_name)
+    api = XcvrApiFactory(reader, writer).create_xcvr_api()
+    if api is None:
+        return []
+    api_name = type(api).__name__
+
+    results = []
+    for name, call in calls:
+        method = getattr(api, call, None)
+        if method is None:
+            continue
+        stats.reset()
+        error = None
+        start = time.monotonic()
+        try:
+            for _ in range(iterations):
+                if cold and hasattr(api, "invalidate_cache"):
+                    api.invalidate_cache()
+                with stats.api_call(name):
+                    method()
+        except NotImplementedError:
+            continue
+        except Exception as e:
+            error = repr(e)
+        wall_time = time.monotonic() - start
+
+        counters = stats.to_dict().get(image_name, {}).get(name, {})
+        read, write = counters.get(OP_READ, {}), counters.get(OP_WRITE, {})
+        results.append(XcvrBenchmarkResult(
+            image_name, api_name, name, iterations,
+            read.get("count", 0) / iterations,
+            write.get("count", 0) / iterations,
+            (read.get("bytes", 0) + write.get("bytes", 0)) / iterations,
+            (read.get("page_switches", 0) + write.get("page_switches", 0)) / iterations,
+            wall_time / iterations, error))
+    return results
+
+def format_results(results):
+    """
+    Return: the results as a text table
+    """
+    header = ("image", "api", "call", "reads", "writes", "bytes", "page_sw", "time_ms")
+    rows = [header]
+    for result in results:
+        if result.error is not None:
+            rows.append((result.image, result.api, result.name, "error: %s" % result.error, "", "", "", ""))
+            continue
+        rows.append((result.image, result.api, result.name, "%.1f" % result.reads,
+                     "%.1f" % result.writes, "%.1f" % result.bytes, "%.1f" % result.page_switches,
+                     "%.3f" % (result.wall_time * 1000)))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip()
+                     for row in rows)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark XcvrApi calls against recorded EEPROM images")
+    parser.add_argument("images", nargs="+", help="EEPROM images written by EepromImage.save()")
+    parser.add_argument("-n", "--iterations", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per transaction")
+    parser.add_argument("--byte-latency", type=float, default=0.0, help="simulated seconds per byte")
+    parser.add_argument("--warm", action="store_true", help="keep the API return value cache between iterations")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    for path in args.images:
+        results.extend(run_benchmark(EepromImage.load(path), os.path.basename(path),
+                                     iterations=args.iterations, latency=args.latency,
+                                     byte_latency=args.byte_latency, cold=not args.warm))
+    if args.json:
+        print(json.dumps([result._asdict() for result in results], indent=2))
+    else:
+        print(format_results(results))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
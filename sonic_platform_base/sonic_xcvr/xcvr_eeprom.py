@@ -4,30 +4,172 @@
    Common API used by all XcvrApis to read and write to various fields that can be found in a xcvr EEPROM
 """
 
+from contextlib import contextmanager
 import struct
+import threading
+
+EEPROM_PAGE_SIZE = 128
+# Lower page and upper page 00h are always accessible without a page switch
+EEPROM_UNPAGED_SIZE = 2 * EEPROM_PAGE_SIZE
 
 class XcvrEeprom(object):
    def __init__(self, reader, writer, mem_map):
       self.reader = reader
       self.writer = writer
       self.mem_map = mem_map
+      # Snapshots and memos belong to the thread that opened them, as the same
+      # XcvrEeprom may be read concurrently by several threads
+      self._local = threading.local()
+      self._stats_lock = threading.Lock()
+      self.memo_hits = 0
+      self.memo_misses = 0
+
+   @property
+   def _snapshot(self):
+      snapshot = getattr(self._local, "snapshot", None)
+      if snapshot is None:
+         snapshot = self._local.snapshot = {}
+      return snapshot
+
+   @property
+   def _memo(self):
+      return getattr(self._local, "memo", None)
+
+   @_memo.setter
+   def _memo(self, memo):
+      self._local.memo = memo
 
    def read(self, field_name):
       """
       Read a value from a field in EEPROM
 
+      Dependencies shared by several fields of one read() call tree (or of one
+      memoize() block) are read and decoded only once.
+
       Args:
          field_name: a string denoting the XcvrField to read from
 
       Returns:
          The value of the field, if the read is successful and None otherwise
       """
+      with self.memoize():
+         return self._read_memoized(field_name)
+
+   def _read_memoized(self, field_name):
+      memo = self._memo
+      if field_name in memo:
+         with self._stats_lock:
+            self.memo_hits += 1
+         return memo[field_name]
+      with self._stats_lock:
+         self.memo_misses += 1
       field = self.mem_map.get_field(field_name)
-      raw_data = self.reader(field.get_offset(), field.get_size())
+      raw_data = self._read(field.get_offset(), field.get_size())
       if raw_data:
          deps = field.get_deps()
-         decoded_deps = {dep: self.read(dep) for dep in deps}
-         return field.decode(raw_data, **decoded_deps)
+         decoded_deps = {dep: self._read_memoized(dep) for dep in deps}
+         value = field.decode(raw_data, **decoded_deps)
+         memo[field_name] = value
+         return value
+      return None
+
+   @contextmanager
+   def memoize(self):
+      """
+      Context manager memoizing decoded fields across the read() calls in the block
+
+      Every field is read and decoded at most once within the block (failed reads are
+      retried), so it must only wrap reads of fields that are not expected to change
+      meanwhile, e.g. the static fields and calibration constants read by a single API
+      call. Writes drop the memoized values. Nested blocks share the outermost memo.
+      The memo is private to the calling thread, reads from other threads bypass it.
+
+      The memo_hits and memo_misses attributes count the reads served from and
+      missing the memo.
+      """
+      if self._memo is not None:
+         yield self
+         return
+      self._memo = {}
+      try:
+         yield self
+      finally:
+         self._memo = None
+
+   def get_memo_stats(self):
+      """
+      Return: dict with the number of memoized read hits and misses
+      """
+      return {"hits": self.memo_hits, "misses": self.memo_misses}
+
+   def read_fields(self, field_names, max_gap=0):
+      """
+      Read several fields in EEPROM using as few reader transactions as possible
+
+      The byte ranges of the requested fields (and of all their dependencies) are
+      coalesced into contiguous ranges that never cross a page boundary, each range
+      is read once and every field is decoded from the in-memory copy using the
+      mem map's precompiled DecodePlan.
+
+      Args:
+         field_names: an iterable of strings denoting the XcvrFields to read from
+
+         max_gap: an integer indicating how many unrequested bytes may be read to join
+         two ranges on the same page. Defaults to 0 since reading over clear-on-read
+         registers (e.g. latched flags) has side effects.
+
+      Returns:
+         A dict mapping each requested field name to its value, or to None if the read failed
+      """
+      field_names = list(field_names)
+      fields = {}
+      pending = list(field_names)
+      while pending:
+         name = pending.pop()
+         if name not in fields:
+            fields[name] = self.mem_map.get_field(name)
+            pending.extend(fields[name].get_deps())
+            # Nested fields are not guaranteed to lie within their group's offset range
+            pending.extend(fields[name].get_fields())
+
+      buffers = [(start, self._read(start, end - start))
+                 for start, end in self._coalesce_ranges(fields.values(), max_gap)]
+
+      return self.mem_map.get_decode_plan().decode(buffers, field_names)
+
+   @staticmethod
+   def _page_of(offset):
+      """
+      Return: the page an offset of the linear address space belongs to
+      """
+      if offset < EEPROM_UNPAGED_SIZE:
+         return 0
+      return offset // EEPROM_PAGE_SIZE - 1
+
+   @staticmethod
+   def _coalesce_ranges(fields, max_gap):
+      """
+      Return: sorted list of (start, end) byte ranges covering all fields
+      """
+      ranges = []
+      for start, end in sorted((f.get_offset(), f.get_offset() + f.get_size()) for f in fields):
+         if ranges:
+            prev_start, prev_end = ranges[-1]
+            if start < prev_end or (start - prev_end <= max_gap and
+                  XcvrEeprom._page_of(start) == XcvrEeprom._page_of(prev_end - 1)):
+               ranges[-1] = (prev_start, max(prev_end, end))
+               continue
+         ranges.append((start, end))
+      return ranges
+
+   @staticmethod
+   def _slice_buffers(buffers, offset, size):
+      """
+      Return: the bytes at [offset, offset + size) from the buffer covering them, None if unavailable
+      """
+      for start, data in buffers:
+         if data is not None and start <= offset and offset + size <= start + len(data):
+            return data[offset - start:offset - start + size]
       return None
 
    def read_raw(self, offset, size, return_raw = False):
@@ -42,7 +184,7 @@ class XcvrEeprom(object):
       Returns:
          The value(s) of the field, if the read is successful and None otherwise
       """
-      raw_data = self.reader(offset, size)
+      raw_data = self._read(offset, size)
       if raw_data is None:
          return None
       if return_raw:
@@ -72,6 +214,7 @@ class XcvrEeprom(object):
          encoded_data = field.encode(value, self.reader(field.get_offset(), field.get_size()))
       else:
          encoded_data = field.encode(value)
+      self._invalidate_snapshot(field.get_offset(), field.get_size())
       return self.writer(field.get_offset(), field.get_size(), encoded_data)
 
    def write_raw(self, offset, size, bytearray_data):
@@ -89,4 +232,68 @@ class XcvrEeprom(object):
       Returns:
          Boolean, True if the write is successful and False otherwise
       """
-      return self.writer(offset, size, bytearray_data)
\ No newline at end of file
+      self._invalidate_snapshot(offset, size)
+      return self.writer(offset, size, bytearray_data)
+
+   @contextmanager
+   def snapshot(self, pages):
+      """
+      Context manager serving reads from a one-time copy of whole EEPROM pages
+
+      Each requested page is read once on entry; read(), read_fields() and read_raw()
+      calls inside the block that fall entirely within a captured page are served from
+      that copy, so related fields are read coherently. Writes drop the pages they touch.
+      All captured pages are discarded on exit. The snapshot only serves the calling thread.
+
+      Note that every byte of a captured page is read, which clears any clear-on-read
+      (latched flag) registers it contains, even if they are never consumed in the block.
+
+      Args:
+         pages: an iterable of integers denoting pages in the linear address space.
+         Page 0 covers the lower page and upper page 00h, page N (N > 0) covers the
+         128 bytes starting at offset (N + 1) * 128.
+      """
+      captured = []
+      try:
+         for page in pages:
+            if page in self._snapshot:
+               continue
+            start, size = self._page_range(page)
+            self._snapshot[page] = (start, self.reader(start, size))
+            captured.append(page)
+         yield self
+      finally:
+         for page in captured:
+            self._snapshot.pop(page, None)
+
+   @staticmethod
+   def _page_range(page):
+      """
+      Return: (offset, size) of a page in the linear address space
+      """
+      if page == 0:
+         return 0, EEPROM_UNPAGED_SIZE
+      return (page + 1) * EEPROM_PAGE_SIZE, EEPROM_PAGE_SIZE
+
+   def _read(self, offset, size):
+      """
+      Read bytes from the active snapshot if it covers them, from the reader otherwise
+      """
+      if self._snapshot:
+         page = self._page_of(offset)
+         if page in self._snapshot:
+            raw_data = self._slice_buffers([self._snapshot[page]], offset, size)
+            if raw_data is not None:
+               return raw_data
+      return self.reader(offset, size)
+
+   def _invalidate_snapshot(self, offset, size):
+      """
+      Drop the snapshot pages overlapping [offset, offset + size), and any memoized fields
+      """
+      if self._memo:
+         self._memo.clear()
+      for page in list(self._snapshot):
+         start, page_size = self._page_range(page)
+         if offset < start + page_size and start < offset + size:
+            self._snapshot[page] = (start, None)
\ No newline at end of file
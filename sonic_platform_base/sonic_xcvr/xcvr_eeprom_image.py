@@ -0,0 +1,217 @@
+"""
+    xcvr_eeprom_image.py
+
+    Capture of transceiver EEPROM contents from a live module and replay of the
+    captured image as an XcvrEeprom reader/writer, e.g. to run and benchmark
+    XcvrApis without hardware
+"""
+
+from collections import namedtuple
+import gzip
+import json
+import time
+
+from .xcvr_api_factory import XcvrApiFactory
+from .xcvr_eeprom import EEPROM_PAGE_SIZE, EEPROM_UNPAGED_SIZE
+
+EEPROM_IMAGE_FORMAT = "sonic-xcvr-eeprom-image"
+EEPROM_IMAGE_VERSION = 1
+
+# One access made through an EepromCapture. data is None for failed accesses.
+EepromAccess = namedtuple("EepromAccess", ["op", "offset", "size", "data"])
+
+class EepromImage(object):
+    """
+    Sparse copy of the linear EEPROM address space, kept as 128-byte blocks
+
+    Block 0 and 1 are the lower page and upper page 00h, block N + 1 is page N.
+    Bytes never captured read as 0.
+
+    Args:
+        metadata: dict of JSON serializable values describing the image (e.g. vendor, part number)
+    """
+    def __init__(self, metadata=None):
+        self.blocks = {}
+        self.metadata = dict(metadata or {})
+
+    def get_pages(self):
+        """
+        Return: sorted list of the pages with captured content, page 0 standing for the unpaged memory
+        """
+        return sorted(set(max(block - 1, 0) for block in self.blocks))
+
+    def read(self, offset, size):
+        data = bytearray(size)
+        for block, block_offset, data_offset, length in self._split(offset, size):
+            content = self.blocks.get(block)
+            if content is not None:
+                data[data_offset:data_offset + length] = content[block_offset:block_offset + length]
+        return data
+
+    def write(self, offset, data):
+        for block, block_offset, data_offset, length in self._split(offset, len(data)):
+            content = self.blocks.get(block)
+            if content is None:
+                content = self.blocks[block] = bytearray(EEPROM_PAGE_SIZE)
+            content[block_offset:block_offset + length] = data[data_offset:data_offset + length]
+
+    @staticmethod
+    def _split(offset, size):
+        """
+        Return: list of (block, offset in block, offset in data, length) covering [offset, offset + size)
+        """
+        chunks = []
+        end = offset + size
+        while offset < end:
+            block, block_offset = divmod(offset, EEPROM_PAGE_SIZE)
+            length = min(EEPROM_PAGE_SIZE - block_offset, end - offset)
+            chunks.append((block, block_offset, size - (end - offset), length))
+            offset += length
+        return chunks
+
+    def to_dict(self):
+        return {
+            "format": EEPROM_IMAGE_FORMAT,
+            "version": EEPROM_IMAGE_VERSION,
+            "metadata": self.metadata,
+            "blocks": {str(block): content.hex() for block, content in sorted(self.blocks.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, image_dict):
+        if image_dict.get("format") != EEPROM_IMAGE_FORMAT or \
+           image_dict.get("version") != EEPROM_IMAGE_VERSION:
+            raise ValueError("Unsupported EEPROM image format")
+        image = cls(image_dict.get("metadata"))
+        for block, content in image_dict["blocks"].items():
+            content = bytearray.fromhex(content)
+            if len(content) != EEPROM_PAGE_SIZE:
+                raise ValueError("Invalid EEPROM image block %s" % block)
+            image.blocks[int(block)] = content
+        return image
+
+    def save(self, path):
+        """
+        Write the image to a gzip compressed JSON file
+        """
+        with gzip.open(path, "wt") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read an image written by save()
+        """
+        with gzip.open(path, "rt") as f:
+            return cls.from_dict(json.load(f))
+
+class EepromCapture(object):
+    """
+    Reader/writer pair forwarding to a live module's reader/writer, recording every
+    access and the bytes read or written into an EepromImage
+
+    Args:
+        reader: callable reading (offset, num_bytes) and returning a bytearray, None on failure
+        writer: callable writing (offset, num_bytes, data) and returning True on success
+        image: EepromImage to fill, a new one by default
+    """
+    def __init__(self, reader, writer, image=None):
+        self._reader = reader
+        self._writer = writer
+        self.image = image if image is not None else EepromImage()
+        self.accesses = []
+
+    @classmethod
+    def from_sfp(cls, sfp, image=None):
+        """
+        Return: an EepromCapture of the module plugged in a SfpOptoeBase
+        """
+        return cls(sfp.read_eeprom, sfp.write_eeprom, image)
+
+    def reader(self, offset, num_bytes):
+        data = self._reader(offset, num_bytes)
+        self.accesses.append(EepromAccess("read", offset, num_bytes,
+                                          bytes(data) if data is not None else None))
+        if data is not None:
+            self.image.write(offset, data)
+        return data
+
+    def writer(self, offset, num_bytes, write_buffer):
+        result = self._writer(offset, num_bytes, write_buffer)
+        data = bytes(write_buffer[:num_bytes])
+        self.accesses.append(EepromAccess("write", offset, num_bytes, data if result else None))
+        if result:
+            self.image.write(offset, data)
+        return result
+
+    def capture_pages(self, pages):
+        """
+        Read whole pages into the image, page 0 standing for the lower page and upper page 00h
+
+        Note that reading a page clears the clear-on-read (latched flag) registers it contains.
+
+        Returns:
+            A list of the pages that could not be read
+        """
+        failed = []
+        for page in pages:
+            if page == 0:
+                offset, size = 0, EEPROM_UNPAGED_SIZE
+            else:
+                offset, size = (page + 1) * EEPROM_PAGE_SIZE, EEPROM_PAGE_SIZE
+            if self.reader(offset, size) is None:
+                failed.append(page)
+        return failed
+
+    def create_xcvr_api(self):
+        """
+        Return: the XcvrApi of the live module, with its accesses captured
+        """
+        return XcvrApiFactory(self.reader, self.writer).create_xcvr_api()
+
+class EepromReplay(object):
+    """
+    Reader/writer pair serving an EepromImage, with simulated transaction latency
+
+    Writes update the image (so written values read back), unless read_only is set,
+    in which case writes succeed without effect.
+
+    Args:
+        image: EepromImage to serve
+        latency: seconds spent per transaction
+        byte_latency: additional seconds spent per byte transferred
+    """
+    def __init__(self, image, latency=0.0, byte_latency=0.0, read_only=False):
+        self.image = image
+        self.latency = latency
+        self.byte_latency = byte_latency
+        self.read_only = read_only
+        self.read_count = 0
+        self.write_count = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def _delay(self, num_bytes):
+        delay = self.latency + self.byte_latency * num_bytes
+        if delay > 0:
+            time.sleep(delay)
+
+    def reader(self, offset, num_bytes):
+        self._delay(num_bytes)
+        self.read_count += 1
+        self.bytes_read += num_bytes
+        return self.image.read(offset, num_bytes)
+
+    def writer(self, offset, num_bytes, write_buffer):
+        self._delay(num_bytes)
+        self.write_count += 1
+        self.bytes_written += num_bytes
+        if not self.read_only:
+            self.image.write(offset, write_buffer[:num_bytes])
+        return True
+
+    def create_xcvr_api(self):
+        """
+        Return: the XcvrApi matching the replayed image
+        """
+        return XcvrApiFactory(self.reader, self.writer).create_xcvr_api()
@@ -0,0 +1,247 @@
+"""
+    xcvr_flag_accumulator.py
+
+    Optional layer over the EEPROM reader callable used by XcvrEeprom, reading the
+    latched (clear-on-read) flags of a module once per cycle and accumulating them
+    into sticky views, one per consumer, so that no consumer steals the flag events
+    of another
+"""
+
+from contextlib import contextmanager
+import threading
+import time
+
+# Seconds during which the flags read from the module are served from the accumulated state
+DEFAULT_FLAG_CYCLE = 1.0
+
+class XcvrFlagAccumulator(object):
+    """
+    Thread-safe accumulator of the latched flags of one module
+
+    Every read of latched flag bytes by the wrapped reader ORs the bytes read into
+    the view of every consumer, and the caller gets the bytes of the view of the
+    consumer running on its thread (see consumer()) instead of those of the module.
+    Reads falling entirely within a latched range read the whole range from the
+    module at most once every cycle seconds, and are served from the view otherwise.
+
+    Flags stay set in a view until its consumer acknowledges them, or, for consumers
+    registered with auto_acknowledge, until the module is read again once they were
+    returned to it, so that reads of the same flags within a cycle are consistent.
+    Reads made outside of any consumer block are served from the default consumer
+    (None), which auto-acknowledges, so that callers unaware of the accumulator keep
+    the clear-on-read semantics of the module without clearing the flags for anyone else.
+
+    Args:
+        ranges: iterable of (offset, size) latched flag ranges in the linear address space
+        cycle: seconds during which a latched range read from the module is not read again
+    """
+    def __init__(self, ranges=(), cycle=DEFAULT_FLAG_CYCLE):
+        self.cycle = cycle
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._auto_acknowledge = {None: True}
+        self._reader = None
+        self.set_ranges(ranges)
+
+    def set_ranges(self, ranges):
+        """
+        Set the latched flag ranges, e.g. the LATCHED_FLAG_RANGES of the XcvrApi of
+        the module, dropping the accumulated flags
+        """
+        with self._lock:
+            self.ranges = tuple(sorted(ranges))
+            # monotonic time of the last read of each whole range from the module
+            self._sampled = [None] * len(self.ranges)
+            self._views = {name: self._new_view() for name in self._auto_acknowledge}
+            # Flags returned to each auto-acknowledging consumer, cleared from its view on the next read
+            self._served = {name: self._new_view() for name, auto in self._auto_acknowledge.items() if auto}
+
+    def _new_view(self):
+        return [bytearray(size) for _, size in self.ranges]
+
+    def register(self, name, auto_acknowledge=False):
+        """
+        Register a consumer, whose view accumulates the flags read from now on
+        """
+        with self._lock:
+            if name not in self._views:
+                self._views[name] = self._new_view()
+            self._auto_acknowledge[name] = auto_acknowledge
+            if auto_acknowledge:
+                self._served.setdefault(name, self._new_view())
+            else:
+                self._served.pop(name, None)
+
+    def unregister(self, name):
+        with self._lock:
+            if name is not None:
+                self._views.pop(name, None)
+                self._auto_acknowledge.pop(name, None)
+                self._served.pop(name, None)
+
+    def get_current_consumer(self):
+        """
+        Return: name of the consumer running on this thread, None if there is none
+        """
+        return getattr(self._local, "consumer", None)
+
+    @contextmanager
+    def consumer(self, name):
+        """
+        Context manager serving the latched flags read in the block from the view of
+        consumer name, registering it if needed
+        """
+        with self._lock:
+            if name not in self._views:
+                self.register(name)
+        previous = self.get_current_consumer()
+        self._local.consumer = name
+        try:
+            yield self
+        finally:
+            self._local.consumer = previous
+
+    def acknowledge(self, name, offset=None, size=None):
+        """
+        Clear the flags of the view of consumer name, all of them or those of the
+        bytes [offset, offset + size)
+        """
+        with self._lock:
+            view = self._views.get(name)
+            if view is None:
+                return
+            served = self._served.get(name)
+            for i, (start, range_size) in enumerate(self.ranges):
+                if offset is None:
+                    lo, hi = start, start + range_size
+                else:
+                    lo, hi = max(start, offset), min(start + range_size, offset + size)
+                if lo < hi:
+                    view[i][lo - start:hi - start] = bytes(hi - lo)
+                    if served is not None:
+                        served[i][lo - start:hi - start] = bytes(hi - lo)
+
+    def get_flags(self, name, offset, size):
+        """
+        Return: the accumulated bytes [offset, offset + size) of the view of consumer
+        name, without reading the module or acknowledging them, None if the bytes are
+        not within a latched range or the consumer is unknown
+        """
+        with self._lock:
+            view = self._views.get(name)
+            i = self._get_range(offset, size)
+            if view is None or i is None:
+                return None
+            start = self.ranges[i][0]
+            return bytearray(view[i][offset - start:offset - start + size])
+
+    def refresh(self):
+        """
+        Read every latched range from the module and accumulate its flags
+
+        Returns:
+            False if a range could not be read, True otherwise
+        """
+        if self._reader is None:
+            return False
+        ok = True
+        with self._lock:
+            for i, (start, size) in enumerate(self.ranges):
+                ok = self._sample(self._reader, i) and ok
+        return ok
+
+    def _get_range(self, offset, size):
+        """
+        Return: index of the latched range [offset, offset + size) falls in, None if none
+        """
+        for i, (start, range_size) in enumerate(self.ranges):
+            if start <= offset and offset + size <= start + range_size:
+                return i
+        return None
+
+    def _sample(self, reader, i):
+        start, size = self.ranges[i]
+        raw_data = reader(start, size)
+        if raw_data is None:
+            return False
+        self._accumulate(i, 0, raw_data)
+        self._sampled[i] = time.monotonic()
+        return True
+
+    def _accumulate(self, i, pos, raw_data):
+        for name, view in self._views.items():
+            flags = view[i]
+            served = self._served.get(name)
+            if served is not None:
+                served = served[i]
+                for k in range(len(raw_data)):
+                    flags[pos + k] &= ~served[pos + k] & 0xff
+                    served[pos + k] = 0
+            for k, byte in enumerate(raw_data):
+                flags[pos + k] |= byte
+
+    def _serve(self, i, lo, hi):
+        """
+        Return: the bytes [lo, hi) of range i of the view of the current consumer,
+        recorded as returned if it auto-acknowledges
+        """
+        name = self.get_current_consumer()
+        if name not in self._views:
+            # Unregistered while its block runs
+            name = None
+        data = bytes(self._views[name][i][lo:hi])
+        served = self._served.get(name)
+        if served is not None:
+            served = served[i]
+            for k, byte in enumerate(data):
+                served[lo + k] |= byte
+        return data
+
+    def _read(self, reader, offset, size):
+        end = offset + size
+        overlapping = [i for i, (start, range_size) in enumerate(self.ranges)
+                       if start < end and offset < start + range_size]
+        if not overlapping:
+            return reader(offset, size)
+        with self._lock:
+            i = self._get_range(offset, size)
+            if i is not None:
+                sampled = self._sampled[i]
+                if sampled is None or time.monotonic() - sampled >= self.cycle:
+                    if not self._sample(reader, i):
+                        return None
+                start = self.ranges[i][0]
+                return bytearray(self._serve(i, offset - start, end - start))
+
+            # The read covers other bytes too, e.g. a whole page
+            raw_data = reader(offset, size)
+            if raw_data is None:
+                return None
+            raw_data = bytearray(raw_data)
+            now = time.monotonic()
+            for i in overlapping:
+                start, range_size = self.ranges[i]
+                lo, hi = max(start, offset), min(start + range_size, end)
+                self._accumulate(i, lo - start, raw_data[lo - offset:hi - offset])
+                if lo == start and hi == start + range_size:
+                    self._sampled[i] = now
+                raw_data[lo - offset:hi - offset] = self._serve(i, lo - start, hi - start)
+            return raw_data
+
+    def wrap(self, reader):
+        """
+        Wrap an EEPROM reader callable so that its reads of latched flags go through
+        this accumulator
+
+        Args:
+            reader: callable reading (offset, num_bytes) and returning a bytearray, None on failure
+
+        Returns:
+            The accumulating reader
+        """
+        self._reader = reader
+
+        def accumulating_reader(offset, num_bytes):
+            return self._read(reader, offset, num_bytes)
+
+        return accumulating_reader
@@ -0,0 +1,237 @@
+"""
+    xcvr_fw_upgrade.py
+
+    Orchestrator upgrading the firmware of many CMIS modules concurrently, with
+    bounded parallelism per I2C bus (or mux segment)
+"""
+
+import os
+import threading
+import time
+
+from .utils.polling import poll_with_backoff
+from .xcvr_poller import XcvrPoller
+
+STAGE_VALIDATE = "validate"
+STAGE_DOWNLOAD = "download"
+STAGE_RUN = "run"
+STAGE_COMMIT = "commit"
+STAGE_DONE = "done"
+
+# Seconds to wait for a module to run the downloaded image after CMD 0109h
+DEFAULT_RUN_TIMEOUT = 60
+
+class XcvrFwUpgradeResult(object):
+    """
+    Outcome of the firmware upgrade of one module
+
+    Attributes:
+        port: port identifier
+        ok: True if every stage attempted succeeded
+        stage: the stage that failed, STAGE_DONE if every stage attempted succeeded
+        info: text reported by the stages
+        durations: dict mapping each stage attempted to the seconds it took
+        firmware: (active, inactive) firmware versions before the upgrade, and after it
+                  once the downloaded image runs
+    """
+    __slots__ = ("port", "ok", "stage", "info", "durations", "firmware")
+
+    def __init__(self, port):
+        self.port = port
+        self.ok = False
+        self.stage = STAGE_VALIDATE
+        self.info = ''
+        self.durations = {}
+        self.firmware = None
+
+    def __repr__(self):
+        return "XcvrFwUpgradeResult(port=%r, ok=%r, stage=%r)" % (self.port, self.ok, self.stage)
+
+class XcvrFwUpgrader(object):
+    """
+    Upgrades the firmware of a set of modules concurrently
+
+    Each module goes through the validate, download, run and commit stages, the
+    same as CmisApi.module_fw_upgrade(), on a thread of an XcvrPoller so that at
+    most max_workers_per_bus modules of one I2C bus are upgraded at a time. A
+    module whose stage fails is left at that stage while the others proceed.
+
+    Args:
+        sfps: dict mapping port identifiers to SfpOptoeBase objects, or a list of
+              SfpOptoeBase objects (identified by their index)
+        bus_key: callable returning a hashable I2C bus/mux segment identifier for a
+                 SfpOptoeBase. Defaults to treating every port as its own bus.
+        max_workers_per_bus: maximum number of modules upgraded concurrently on one bus
+        max_workers: maximum number of upgrade threads overall
+        progress: callable taking (port, stage) called as each module enters a stage
+    """
+    def __init__(self, sfps, bus_key=None, max_workers_per_bus=1, max_workers=16, progress=None):
+        self.poller = XcvrPoller(sfps, bus_key, max_workers_per_bus, max_workers)
+        self.progress = progress
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.poller.close()
+
+    def get_progress(self):
+        """
+        Returns a dict mapping each port of the current or last upgrade to its current
+        stage, STAGE_DONE once upgraded
+        """
+        with self._lock:
+            return dict(self._stages)
+
+    def _enter_stage(self, result, stage):
+        result.stage = stage
+        with self._lock:
+            self._stages[result.port] = stage
+        if self.progress is not None:
+            self.progress(result.port, stage)
+
+    def _run_stage(self, result, stage, func, *args):
+        self._enter_stage(result, stage)
+        start = time.monotonic()
+        try:
+            ok, txt = func(*args)
+        except Exception as e:
+            ok, txt = False, "%s failed: %r\n" % (stage, e)
+        result.durations[stage] = time.monotonic() - start
+        result.info += txt or ''
+        return ok
+
+    def _validate(self, sfp, imagepath, module):
+        """
+        Check that the module supports firmware download of the image, filling module
+        with its XcvrApi, firmware info and firmware management features
+        """
+        api = module['api'] = sfp.get_xcvr_api()
+        if api is None or not hasattr(api, 'module_fw_download'):
+            return False, "Firmware upgrade not supported on this module\n"
+        fw_info = module['fw_info'] = api.get_module_fw_info()
+        if not fw_info['status']:
+            return False, fw_info['info']
+        feature = api.get_module_fw_mgmt_feature()
+        if not feature or not feature['status']:
+            return False, feature['info'] if feature else "Failed to get FW management features\n"
+        module['feature'] = feature['feature']
+        startLPLsize = feature['feature'][0]
+        try:
+            imagesize = os.path.getsize(imagepath)
+        except OSError as e:
+            return False, "Image path %s is incorrect: %s\n" % (imagepath, e)
+        if imagesize <= startLPLsize:
+            return False, "Image size %d is too small for start payload size %d\n" % (imagesize, startLPLsize)
+        return True, fw_info['info'] + feature['info']
+
+    @staticmethod
+    def _get_firmware(fw_info):
+        """
+        Return: the (active, inactive) firmware versions of a get_module_fw_info() result
+        """
+        try:
+            result = fw_info['result']
+            return result[8], result[9]
+        except (KeyError, TypeError, IndexError):
+            return None
+
+    @staticmethod
+    def _get_running_image(fw_info):
+        """
+        Return: the (image A running, image B running) flags of a get_module_fw_info() result
+        """
+        try:
+            result = fw_info['result']
+            return result[1], result[5]
+        except (KeyError, TypeError, IndexError):
+            return None
+
+    def _wait_for_run(self, api, previous_fw_info, timeout):
+        """
+        Wait for the module to answer CMD 0100h again, running the other image than before
+        """
+        previous_image = self._get_running_image(previous_fw_info)
+
+        def done(fw_info, elapsed):
+            if fw_info is None or not fw_info['status']:
+                return False
+            return self._get_running_image(fw_info) != previous_image
+
+        def poll():
+            try:
+                return api.get_module_fw_info()
+            except Exception:
+                return None
+
+        fw_info, _, completed = poll_with_backoff(poll, done, timeout, min_interval=1.0, max_interval=5.0)
+        if not completed:
+            return False, "Module did not run the downloaded image within %d s\n" % timeout
+        return True, fw_info['info']
+
+    def _run(self, api, previous_fw_info, run_timeout):
+        ok, txt = api.module_fw_run(mode=0x01)
+        if not ok:
+            return ok, txt
+        ok, wait_txt = self._wait_for_run(api, previous_fw_info, run_timeout)
+        return ok, txt + wait_txt
+
+    def _upgrade_module(self, port, sfp, imagepath, dry_run, commit, run_timeout):
+        result = XcvrFwUpgradeResult(port)
+        module = {}
+        if not self._run_stage(result, STAGE_VALIDATE, self._validate, sfp, imagepath, module):
+            return result
+        api, fw_info = module['api'], module['fw_info']
+        result.firmware = (self._get_firmware(fw_info), None)
+
+        if not dry_run:
+            if not self._run_stage(result, STAGE_DOWNLOAD, api.module_fw_download,
+                                   *(tuple(module['feature']) + (imagepath,))):
+                return result
+            if not self._run_stage(result, STAGE_RUN, self._run, api, fw_info, run_timeout):
+                return result
+            result.firmware = (result.firmware[0], self._get_firmware(api.get_module_fw_info()))
+            if commit and not self._run_stage(result, STAGE_COMMIT, api.module_fw_commit):
+                return result
+        result.ok = True
+        self._enter_stage(result, STAGE_DONE)
+        return result
+
+    def upgrade(self, imagepath, ports=None, dry_run=False, commit=True, run_timeout=DEFAULT_RUN_TIMEOUT):
+        """
+        Upgrade the firmware of modules to an image
+
+        Args:
+            imagepath: path of the firmware image file
+            ports: iterable of port identifiers to upgrade. Defaults to all ports.
+            dry_run: only run the validate stage, checking that each module supports
+                     firmware download and that the image fits its start payload
+            commit: commit the new image once it runs
+            run_timeout: seconds to wait for each module to run the downloaded image
+
+        Returns:
+            A dict mapping each port to its XcvrFwUpgradeResult
+        """
+        sfps = self.poller.sfps
+        ports = list(sfps if ports is None else ports)
+        port_of = {id(sfps[port]): port for port in ports}
+        with self._lock:
+            self._stages = {port: None for port in ports}
+
+        def upgrade_module(sfp):
+            return self._upgrade_module(port_of[id(sfp)], sfp, imagepath, dry_run, commit, run_timeout)
+
+        results = {}
+        for poll_result in self.poller.poll([upgrade_module], ports):
+            if poll_result.error is not None:
+                result = XcvrFwUpgradeResult(poll_result.port)
+                result.info = "Upgrade failed: %r\n" % poll_result.error
+            else:
+                result = poll_result.value
+            results[poll_result.port] = result
+        return results
@@ -0,0 +1,234 @@
+"""
+    xcvr_io_stats.py
+
+    Optional instrumentation of the EEPROM reader/writer callables used by XcvrEeprom,
+    accounting the I2C transactions, bytes, page switches and latency of each access
+    to the port and top-level XcvrApi method that caused it
+"""
+
+from contextlib import contextmanager
+import functools
+import inspect
+import threading
+import time
+
+from .xcvr_eeprom import XcvrEeprom
+
+# Upper bounds (seconds) of the latency histogram buckets; a last +Inf bucket is implied
+DEFAULT_LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                           0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+OP_READ = "read"
+OP_WRITE = "write"
+
+class XcvrIoCounter(object):
+    """
+    Accumulated cost of the EEPROM accesses of one (port, api, op)
+    """
+    __slots__ = ("count", "errors", "bytes", "page_switches", "duration", "buckets")
+
+    def __init__(self, num_buckets):
+        self.count = 0
+        self.errors = 0
+        self.bytes = 0
+        self.page_switches = 0
+        self.duration = 0.0
+        self.buckets = [0] * (num_buckets + 1)
+
+    def to_dict(self, bucket_bounds):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "page_switches": self.page_switches,
+            "duration": self.duration,
+            "latency_histogram": dict(zip(list(bucket_bounds) + [float('inf')], self.buckets)),
+        }
+
+class XcvrIoStats(object):
+    """
+    Thread-safe collector of EEPROM access statistics
+
+    Accesses are attributed to the port given to instrument() and to the outermost
+    XcvrApi method running on the calling thread (see instrument_api() and api_call()).
+    Accesses made outside of any API call are attributed to an api of None.
+
+    Args:
+        latency_buckets: increasing upper bounds, in seconds, of the latency histogram buckets
+    """
+    def __init__(self, latency_buckets=DEFAULT_LATENCY_BUCKETS):
+        self.latency_buckets = tuple(latency_buckets)
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def reset(self):
+        with self._lock:
+            self._counters = {}
+
+    def get_current_api_call(self):
+        """
+        Return: name of the outermost API call running on this thread, None if there is none
+        """
+        return getattr(self._local, "api_call", None)
+
+    @contextmanager
+    def api_call(self, name):
+        """
+        Context manager attributing the EEPROM accesses in the block to the API call name,
+        unless an outer API call is already running on this thread
+        """
+        if self.get_current_api_call() is not None:
+            yield
+            return
+        self._local.api_call = name
+        try:
+            yield
+        finally:
+            self._local.api_call = None
+
+    def record(self, port, op, size, duration, ok=True, page_switch=False):
+        """
+        Account one EEPROM access to port and to the current API call
+        """
+        key = (port, self.get_current_api_call(), op)
+        bucket = len(self.latency_buckets)
+        for i, bound in enumerate(self.latency_buckets):
+            if duration <= bound:
+                bucket = i
+                break
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = self._counters[key] = XcvrIoCounter(len(self.latency_buckets))
+            counter.count += 1
+            counter.bytes += size
+            counter.duration += duration
+            counter.buckets[bucket] += 1
+            if not ok:
+                counter.errors += 1
+            if page_switch:
+                counter.page_switches += 1
+
+    def instrument(self, reader, writer, port):
+        """
+        Wrap EEPROM reader and writer callables so that their accesses are recorded
+
+        Page switches are counted per returned pair of callables, as accesses to
+        a page (other than the unpaged lower memory and page 00h) different from the
+        page of the previous paged access.
+
+        Args:
+            reader: callable reading (offset, num_bytes) and returning a bytearray, None on failure
+            writer: callable writing (offset, num_bytes, data) and returning True on success
+            port: hashable identifier the accesses are attributed to
+
+        Returns:
+            A tuple of the instrumented (reader, writer)
+        """
+        last_page = [None]
+
+        def access(op, func, offset, size, *args):
+            page = XcvrEeprom._page_of(offset)
+            page_switch = page != 0 and page != last_page[0]
+            if page != 0:
+                last_page[0] = page
+            start = time.monotonic()
+            result = None
+            try:
+                result = func(offset, size, *args)
+            finally:
+                ok = result is not None and result is not False
+                self.record(port, op, size, time.monotonic() - start, ok, page_switch)
+            return result
+
+        def instrumented_reader(offset, num_bytes):
+            return access(OP_READ, reader, offset, num_bytes)
+
+        def instrumented_writer(offset, num_bytes, write_buffer):
+            return access(OP_WRITE, writer, offset, num_bytes, write_buffer)
+
+        return instrumented_reader, instrumented_writer
+
+    def instrument_api(self, api):
+        """
+        Attribute the EEPROM accesses of every public method of an XcvrApi (or any other
+        object) to "<class name>.<method name>" when it is the outermost API call
+
+        Methods are wrapped on the instance, so the object keeps its type.
+
+        Returns:
+            api
+        """
+        class_name = type(api).__name__
+        for name, _ in inspect.getmembers(type(api), inspect.isfunction):
+            if name.startswith("_"):
+                continue
+            setattr(api, name, self._wrap_api_method(getattr(api, name),
+                                                     "%s.%s" % (class_name, name)))
+        return api
+
+    def _wrap_api_method(self, method, call_name):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            with self.api_call(call_name):
+                return method(*args, **kwargs)
+        return wrapper
+
+    def to_dict(self):
+        """
+        Returns:
+            A dict mapping port -> api call -> op ("read" or "write") -> dict with the
+            count, errors, bytes, page_switches, total duration (seconds) and the
+            latency_histogram (bucket upper bound -> number of accesses in that bucket)
+        """
+        with self._lock:
+            counters = [(key, counter.to_dict(self.latency_buckets))
+                        for key, counter in self._counters.items()]
+        result = {}
+        for (port, api, op), counter in counters:
+            result.setdefault(port, {}).setdefault(api, {})[op] = counter
+        return result
+
+    def to_prometheus(self, prefix="xcvr_eeprom"):
+        """
+        Returns:
+            The statistics in the Prometheus text exposition format, the latency
+            histograms with cumulative buckets
+        """
+        with self._lock:
+            counters = sorted(((key, counter.to_dict(self.latency_buckets))
+                               for key, counter in self._counters.items()),
+                              key=lambda item: tuple(str(label) for label in item[0]))
+        lines = []
+        for metric, field, help_text in (("ops_total", "count", "EEPROM accesses"),
+                                         ("errors_total", "errors", "Failed EEPROM accesses"),
+                                         ("bytes_total", "bytes", "Bytes accessed in EEPROM"),
+                                         ("page_switches_total", "page_switches",
+                                          "EEPROM accesses switching the page")):
+            lines.append("# HELP %s_%s %s" % (prefix, metric, help_text))
+            lines.append("# TYPE %s_%s counter" % (prefix, metric))
+            for key, counter in counters:
+                lines.append("%s_%s{%s} %d" % (prefix, metric, self._labels(key), counter[field]))
+
+        metric = "%s_latency_seconds" % prefix
+        lines.append("# HELP %s EEPROM access latency" % metric)
+        lines.append("# TYPE %s histogram" % metric)
+        for key, counter in counters:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in counter["latency_histogram"].items():
+                cumulative += count
+                le = "+Inf" if bound == float('inf') else repr(bound)
+                lines.append('%s_bucket{%s,le="%s"} %d' % (metric, labels, le, cumulative))
+            lines.append("%s_sum{%s} %r" % (metric, labels, counter["duration"]))
+            lines.append("%s_count{%s} %d" % (metric, labels, counter["count"]))
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _labels(key):
+        port, api, op = key
+        def escape(value):
+            value = "" if value is None else str(value)
+            return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        return 'port="%s",api="%s",op="%s"' % (escape(port), escape(api), escape(op))
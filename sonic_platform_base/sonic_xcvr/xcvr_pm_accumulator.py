@@ -0,0 +1,254 @@
+"""
+    xcvr_pm_accumulator.py
+
+    Accumulator of the C-CMIS performance monitoring (pages 34h and 35h) of many
+    ports into fixed length bins (e.g. 15 minutes), with a bounded history per port
+"""
+
+from array import array
+import threading
+import time
+
+from .api.public.c_cmis import C_CMIS_PM_STATS
+from .fields import consts
+
+# Bin key and field of the page 34h counters accumulated as deltas between samples
+C_CMIS_PM_DELTAS = (
+    ('rx_bits', consts.RX_BITS_PM),
+    ('rx_corr_bits', consts.RX_CORR_BITS_PM),
+    ('rx_frames', consts.RX_FRAMES_PM),
+    ('rx_frames_uncorr_err', consts.RX_FRAMES_UNCORR_ERR_PM),
+)
+
+# Min, max and total fields of the pre-FEC ratios of the sub-intervals
+C_CMIS_PM_SUB_INTERVAL_RATIOS = (
+    (consts.RX_MIN_CORR_BITS_SUB_INTERVAL_PM, consts.RX_MAX_CORR_BITS_SUB_INTERVAL_PM,
+     consts.RX_BITS_SUB_INTERVAL_PM),
+    (consts.RX_MIN_FRAMES_UNCORR_ERR_SUB_INTERVAL_PM, consts.RX_MAX_FRAMES_UNCORR_ERR_SUB_INTERVAL_PM,
+     consts.RX_FRAMES_SUB_INTERVAL_PM),
+)
+
+# Bin keys of the gauges, accumulated as min/max/avg: pre-FEC BER and uncorrectable frame ratio
+# of the sub-intervals (min/max only, their avg is derived from the counter deltas) then page 35h
+PM_GAUGE_KEYS = ('preFEC_BER', 'preFEC_uncorr_frame_ratio') + tuple(stats[0] for stats in C_CMIS_PM_STATS)
+
+DEFAULT_PM_INTERVAL = 900.0
+DEFAULT_PM_HISTORY = 96
+
+def read_pm_fields(sfp):
+    """
+    Returns the raw PM fields of pages 34h and 35h of a SfpOptoeBase, None if its
+    module does not implement C-CMIS
+    """
+    api = sfp.get_xcvr_api()
+    if api is None or not hasattr(api, 'get_pm_fields'):
+        return None
+    return api.get_pm_fields()
+
+def _ratio(num, den):
+    return num / den if den else 0.0
+
+class XcvrPmRing(object):
+    """
+    Bins of one port, each stored at index bin_id % size of flat arrays so that
+    accumulating a sample and querying a bin take constant time and memory
+
+    Gauges g of the bin at index i are at i * len(PM_GAUGE_KEYS) + g in mins, maxs
+    and sums, counter deltas c at i * len(C_CMIS_PM_DELTAS) + c in deltas.
+    """
+    __slots__ = ("size", "bin_ids", "samples", "gauge_samples", "mins", "maxs", "sums", "deltas",
+                 "last_counters", "last_bin_id")
+
+    def __init__(self, size):
+        ngauges = len(PM_GAUGE_KEYS)
+        self.size = size
+        self.bin_ids = array('q', [-1]) * size
+        self.samples = array('L', [0]) * size
+        self.gauge_samples = array('L', [0]) * (size * ngauges)
+        self.mins = array('d', [0.0]) * (size * ngauges)
+        self.maxs = array('d', [0.0]) * (size * ngauges)
+        self.sums = array('d', [0.0]) * (size * ngauges)
+        self.deltas = array('d', [0.0]) * (size * len(C_CMIS_PM_DELTAS))
+        # Counter values of the previous sample, None before the first one
+        self.last_counters = None
+        self.last_bin_id = -1
+
+    def _open_bin(self, bin_id):
+        index = bin_id % self.size
+        if self.bin_ids[index] != bin_id:
+            self.bin_ids[index] = bin_id
+            self.samples[index] = 0
+            ngauges = len(PM_GAUGE_KEYS)
+            for g in range(index * ngauges, (index + 1) * ngauges):
+                self.gauge_samples[g] = 0
+                self.mins[g] = self.maxs[g] = self.sums[g] = 0.0
+            ndeltas = len(C_CMIS_PM_DELTAS)
+            for c in range(index * ndeltas, (index + 1) * ndeltas):
+                self.deltas[c] = 0.0
+        self.last_bin_id = max(self.last_bin_id, bin_id)
+        return index
+
+    def add(self, bin_id, gauges, counters):
+        """
+        Accumulate one sample into the bin bin_id
+
+        Args:
+            gauges: list of the PM_GAUGE_KEYS (min, max, avg) values, None for the unavailable ones
+            counters: list of the C_CMIS_PM_DELTAS counter values
+        """
+        if bin_id <= self.last_bin_id - self.size:
+            # Older than the history, its slot holds a newer bin
+            return
+        index = self._open_bin(bin_id)
+        self.samples[index] += 1
+        base = index * len(PM_GAUGE_KEYS)
+        for g, gauge in enumerate(gauges):
+            if gauge is None:
+                continue
+            gauge_min, gauge_max, gauge_avg = gauge
+            g += base
+            if self.gauge_samples[g] == 0:
+                self.mins[g], self.maxs[g] = gauge_min, gauge_max
+            else:
+                self.mins[g] = min(self.mins[g], gauge_min)
+                self.maxs[g] = max(self.maxs[g], gauge_max)
+            self.sums[g] += gauge_avg
+            self.gauge_samples[g] += 1
+        if self.last_counters is not None:
+            base = index * len(C_CMIS_PM_DELTAS)
+            for c, (last, value) in enumerate(zip(self.last_counters, counters)):
+                # A counter going backwards was cleared (module reset or PM restart)
+                self.deltas[base + c] += value - last if value >= last else value
+        self.last_counters = counters
+
+    def get(self, bin_id, interval):
+        """
+        Returns the dict of the bin bin_id, None if it is not in the history
+        """
+        index = bin_id % self.size
+        if bin_id < 0 or self.bin_ids[index] != bin_id:
+            return None
+        result = {'start': bin_id * interval, 'samples': self.samples[index]}
+        base = index * len(C_CMIS_PM_DELTAS)
+        for c, (key, _) in enumerate(C_CMIS_PM_DELTAS):
+            result[key] = int(self.deltas[base + c])
+        base = index * len(PM_GAUGE_KEYS)
+        for g, key in enumerate(PM_GAUGE_KEYS):
+            count = self.gauge_samples[base + g]
+            result[key + '_min'] = self.mins[base + g] if count else None
+            result[key + '_max'] = self.maxs[base + g] if count else None
+            result[key + '_avg'] = self.sums[base + g] / count if count else None
+        # Averages of the pre-FEC ratios over the whole bin
+        result['preFEC_BER_avg'] = _ratio(result['rx_corr_bits'], result['rx_bits'])
+        result['preFEC_uncorr_frame_ratio_avg'] = _ratio(result['rx_frames_uncorr_err'], result['rx_frames'])
+        return result
+
+class XcvrPmAccumulator(object):
+    """
+    Accumulates the C-CMIS PMs of many ports into bins of interval seconds, aligned
+    on multiples of interval in time.time(), keeping the last history bins per port.
+
+    Every sample (one read of pages 34h and 35h per port) updates the bin it falls in:
+    - the page 34h counters (bits, corrected bits, frames, uncorrectable frames) are
+      accumulated as deltas from the previous sample,
+    - the page 35h statistics and the pre-FEC ratios of the sub-intervals as the min of
+      their min, the max of their max and the mean of their avg.
+    The current and previous bins of a port are then queried in constant time by any
+    number of consumers, none of which needs to read the module itself.
+
+    Args:
+        interval: length of a bin in seconds
+        history: number of bins kept per port
+    """
+    def __init__(self, interval=DEFAULT_PM_INTERVAL, history=DEFAULT_PM_HISTORY):
+        assert interval > 0 and history >= 2
+        self.interval = interval
+        self.history = history
+        self._rings = {}
+        self._lock = threading.Lock()
+
+    def get_bin_id(self, now=None):
+        return int((time.time() if now is None else now) // self.interval)
+
+    @staticmethod
+    def _get_gauges(pm):
+        gauges = []
+        for min_field, max_field, total_field in C_CMIS_PM_SUB_INTERVAL_RATIOS:
+            if pm.get(total_field):
+                low, high = pm[min_field] / pm[total_field], pm[max_field] / pm[total_field]
+                # The avg is replaced by the ratio of the counter deltas of the bin
+                gauges.append((low, high, 0.0))
+            else:
+                gauges.append(None)
+        for _, avg_field, min_field, max_field in C_CMIS_PM_STATS:
+            values = (pm.get(min_field), pm.get(max_field), pm.get(avg_field))
+            gauges.append(None if None in values else values)
+        return gauges
+
+    def update(self, port, pm, now=None):
+        """
+        Accumulate one sample of a port
+
+        Args:
+            pm: dict of the raw PM fields of pages 34h and 35h, as returned by
+                CCmisApi.get_pm_fields()
+            now: time.time() of the sample
+        """
+        bin_id = self.get_bin_id(now)
+        gauges = self._get_gauges(pm)
+        counters = [pm.get(field) or 0 for _, field in C_CMIS_PM_DELTAS]
+        with self._lock:
+            ring = self._rings.get(port)
+            if ring is None:
+                ring = self._rings[port] = XcvrPmRing(self.history)
+            ring.add(bin_id, gauges, counters)
+
+    def collect(self, poller, ports=None, now=None):
+        """
+        Sample the PMs of ports through a XcvrPoller, reading each module once
+
+        Returns:
+            A dict mapping the ports whose PMs could not be read to the exception raised,
+            or None for the modules not implementing C-CMIS
+        """
+        failed = {}
+        for result in poller.poll((read_pm_fields,), ports):
+            if result.error is not None or result.value is None:
+                failed[result.port] = result.error
+                continue
+            self.update(result.port, result.value, now)
+        return failed
+
+    def remove(self, port):
+        """
+        Forget the history of a port, e.g. when its module is removed
+        """
+        with self._lock:
+            self._rings.pop(port, None)
+
+    def get_bin(self, port, offset=0):
+        """
+        Returns the dict of a bin of a port, None if it has no sample
+
+        Args:
+            offset: 0 for the current bin (the bin of the latest sample), 1 for the
+                    previous one, ... up to history - 1
+        """
+        with self._lock:
+            ring = self._rings.get(port)
+            if ring is None or not 0 <= offset < self.history:
+                return None
+            return ring.get(ring.last_bin_id - offset, self.interval)
+
+    def get_current(self, port):
+        return self.get_bin(port, 0)
+
+    def get_previous(self, port):
+        return self.get_bin(port, 1)
+
+    def get_history(self, port):
+        """
+        Returns the list of the bins of a port having samples, oldest first
+        """
+        bins = (self.get_bin(port, offset) for offset in reversed(range(self.history)))
+        return [b for b in bins if b is not None]
@@ -0,0 +1,208 @@
+"""
+    xcvr_poll_scheduler.py
+
+    Scheduler adapting the polling interval of each port and class of transceiver
+    data to how fast it changes, within a global I2C budget
+"""
+
+from collections import namedtuple
+import math
+import re
+import time
+
+# A class of data polled together. Its interval starts at min_interval, backs off
+# towards max_interval while the data is stable and returns to min_interval on changes.
+# cost is the share of the I2C budget one poll of this class consumes. is_flags tells
+# whether the call returns flags, any of them set denoting an active alarm or fault.
+XcvrPollClass = namedtuple("XcvrPollClass", ["name", "call", "min_interval", "max_interval", "cost", "is_flags"],
+                           defaults=(1.0, False))
+
+DEFAULT_POLL_CLASSES = (
+    XcvrPollClass("status", "get_transceiver_status", 1.0, 10.0),
+    XcvrPollClass("flags", "get_transceiver_status_flags", 1.0, 10.0, is_flags=True),
+    XcvrPollClass("dom_flags", "get_transceiver_dom_flags", 1.0, 10.0, is_flags=True),
+    XcvrPollClass("dom", "get_transceiver_dom_real_value", 2.0, 60.0),
+)
+
+MODULE_STATE_READY = 'ModuleReady'
+DATAPATH_STATE_ACTIVATED = 'DataPathActivated'
+DATAPATH_STATE_KEY_PATTERN = re.compile(r'^DP\d+State$')
+
+class XcvrPollEntry(object):
+    """
+    Scheduling state of one (port, poll class)
+    """
+    __slots__ = ("port", "poll_class", "interval", "next_due", "last_value")
+
+    def __init__(self, port, poll_class, now):
+        self.port = port
+        self.poll_class = poll_class
+        self.interval = poll_class.min_interval
+        self.next_due = now
+        self.last_value = None
+
+class XcvrPollScheduler(object):
+    """
+    Tracks when each (port, poll class) is due and adapts its interval to the observed data
+
+    After each poll, report the result with update(). The interval of the polled class
+    is multiplied by backoff while its values stay within rel_tol of the previous poll
+    and the module is stable, and reset to min_interval when the values change, a flag
+    is raised, or the port is in transition (module not in ModuleReady or a datapath
+    not in DataPathActivated, as reported by get_transceiver_status()).
+
+    Args:
+        ports: iterable of port identifiers
+        poll_classes: iterable of XcvrPollClass
+        budget: maximum poll cost per second over all ports, None for unlimited
+        burst: maximum poll cost spent at once when the budget allows it, defaults to
+               budget but never less than the cost of the costliest poll class
+        backoff: interval multiplier applied while the data is stable
+        rel_tol: relative change of a numeric value considered significant
+    """
+    def __init__(self, ports, poll_classes=DEFAULT_POLL_CLASSES, budget=None, burst=None,
+                 backoff=2.0, rel_tol=0.02, now=None):
+        assert backoff >= 1.0
+        assert budget is None or budget > 0
+        now = time.monotonic() if now is None else now
+        self.poll_classes = {poll_class.name: poll_class for poll_class in poll_classes}
+        self.budget = budget
+        max_cost = max((poll_class.cost for poll_class in self.poll_classes.values()), default=0)
+        if burst is None and budget is not None:
+            burst = max(budget, max_cost)
+        # A poll class costing more than the bucket can hold would never be polled
+        assert burst is None or burst >= max_cost
+        self.burst = burst
+        self.backoff = backoff
+        self.rel_tol = rel_tol
+        self._entries = {}
+        self._unstable_ports = set()
+        self._tokens = self.burst
+        self._last_refill = now
+        for port in ports:
+            self.add_port(port, now)
+
+    def add_port(self, port, now=None):
+        """
+        Start scheduling a port, e.g. on module insertion. All its poll classes are due immediately.
+        """
+        now = time.monotonic() if now is None else now
+        for name, poll_class in self.poll_classes.items():
+            self._entries[(port, name)] = XcvrPollEntry(port, poll_class, now)
+
+    def remove_port(self, port):
+        """
+        Stop scheduling a port, e.g. on module removal
+        """
+        for name in self.poll_classes:
+            self._entries.pop((port, name), None)
+        self._unstable_ports.discard(port)
+
+    def get_interval(self, port, name):
+        return self._entries[(port, name)].interval
+
+    def get_next_due(self):
+        """
+        Return: the earliest time any (port, poll class) is due, None if nothing is scheduled
+        """
+        if not self._entries:
+            return None
+        return min(entry.next_due for entry in self._entries.values())
+
+    def get_due(self, now=None):
+        """
+        Return the (port, poll class name) pairs due for polling, most overdue (relative
+        to their interval) first. When a budget is set, only as many pairs as the budget
+        allows are returned; the others stay due and are returned by later calls.
+
+        Returns:
+            A list of (port, poll class name)
+        """
+        now = time.monotonic() if now is None else now
+        due = [entry for entry in self._entries.values() if entry.next_due <= now]
+        due.sort(key=lambda entry: (entry.next_due - now) / entry.interval)
+        if self.budget is None:
+            return [(entry.port, entry.poll_class.name) for entry in due]
+
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.budget)
+        self._last_refill = now
+        selected = []
+        for entry in due:
+            if entry.poll_class.cost > self._tokens:
+                break
+            self._tokens -= entry.poll_class.cost
+            selected.append((entry.port, entry.poll_class.name))
+        return selected
+
+    def update(self, port, name, value, now=None):
+        """
+        Record the result of polling a class on a port and schedule its next poll
+
+        Args:
+            value: the value returned by the poll class call, None if the poll failed
+        """
+        now = time.monotonic() if now is None else now
+        entry = self._entries.get((port, name))
+        if entry is None:
+            return
+        if isinstance(value, dict) and 'module_state' in value:
+            if self._in_transition(value):
+                self._unstable_ports.add(port)
+            else:
+                self._unstable_ports.discard(port)
+
+        if value is None or port in self._unstable_ports or \
+           (entry.poll_class.is_flags and self._has_flag_set(value)) or \
+           entry.last_value is None or self._changed(entry.last_value, value):
+            entry.interval = entry.poll_class.min_interval
+        else:
+            entry.interval = min(entry.interval * self.backoff, entry.poll_class.max_interval)
+        entry.last_value = value
+        entry.next_due = now + entry.interval
+
+    def poll_due(self, poller, now=None):
+        """
+        Poll the due (port, poll class) pairs with an XcvrPoller and update the schedule
+
+        Returns:
+            A list of the XcvrPollResult of the polls made
+        """
+        now = time.monotonic() if now is None else now
+        ports_by_class = {}
+        for port, name in self.get_due(now):
+            ports_by_class.setdefault(name, []).append(port)
+
+        results = []
+        for name, ports in ports_by_class.items():
+            for result in poller.poll([self.poll_classes[name].call], ports):
+                self.update(result.port, name, result.value if result.error is None else None, now)
+                results.append(result)
+        return results
+
+    @staticmethod
+    def _in_transition(status):
+        if status.get('module_state') != MODULE_STATE_READY:
+            return True
+        return any(state not in (None, 'N/A', DATAPATH_STATE_ACTIVATED)
+                   for key, state in status.items() if DATAPATH_STATE_KEY_PATTERN.match(key))
+
+    @staticmethod
+    def _has_flag_set(value):
+        if not isinstance(value, dict):
+            return False
+        return any(flag is True for flag in value.values())
+
+    def _changed(self, old, new):
+        if isinstance(old, dict) and isinstance(new, dict):
+            if old.keys() != new.keys():
+                return True
+            return any(self._changed(old[key], new[key]) for key in old)
+        if isinstance(old, (list, tuple)) and isinstance(new, (list, tuple)):
+            return len(old) != len(new) or any(self._changed(a, b) for a, b in zip(old, new))
+        if isinstance(old, bool) or isinstance(new, bool):
+            return old != new
+        if isinstance(old, (int, float)) and isinstance(new, (int, float)):
+            if math.isnan(old) and math.isnan(new):
+                return False
+            return not math.isclose(old, new, rel_tol=self.rel_tol, abs_tol=1e-9)
+        return old != new
@@ -0,0 +1,168 @@
+"""
+    xcvr_poller.py
+
+    Engine polling transceiver APIs on many ports concurrently, with bounded
+    parallelism per I2C bus (or mux segment)
+"""
+
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import threading
+import time
+
+# Result of one API call on one port. Exactly one of value and error is meaningful.
+XcvrPollResult = namedtuple("XcvrPollResult", ["port", "call", "value", "error", "duration"])
+
+# Seconds between checks that polling workers are still alive while waiting for results
+RESULT_WAIT_INTERVAL = 1.0
+
+DEFAULT_POLL_CALLS = (
+    "get_transceiver_dom_real_value",
+    "get_transceiver_dom_flags",
+    "get_transceiver_status",
+    "get_transceiver_status_flags",
+)
+
+class XcvrPoller(object):
+    """
+    Runs API calls on a set of SfpOptoeBase objects concurrently across ports.
+
+    Ports sharing an I2C bus are polled by at most max_workers_per_bus threads at a
+    time, while independent buses proceed in parallel. All calls for a given port run
+    sequentially on the same thread, so multi-step accesses to one module never interleave.
+
+    Args:
+        sfps: dict mapping port identifiers to SfpOptoeBase objects, or a list of
+              SfpOptoeBase objects (identified by their index)
+        bus_key: callable returning a hashable I2C bus/mux segment identifier for a
+                 SfpOptoeBase. Defaults to treating every port as its own bus.
+        max_workers_per_bus: maximum number of ports polled concurrently on one bus
+        max_workers: maximum number of polling threads overall
+    """
+    def __init__(self, sfps, bus_key=None, max_workers_per_bus=1, max_workers=16):
+        assert max_workers_per_bus >= 1 and max_workers >= 1
+        self.sfps = dict(sfps) if isinstance(sfps, dict) else dict(enumerate(sfps))
+        self.bus_key = bus_key
+        self.max_workers_per_bus = max_workers_per_bus
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Stop the polling threads once pending work completes
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="xcvr_poller")
+            return self._executor
+
+    def get_buses(self, ports=None):
+        """
+        Returns a dict mapping each bus identifier to the list of ports on that bus
+
+        Raises:
+            ValueError: if a port is unknown
+        """
+        buses = {}
+        for port in (self.sfps if ports is None else ports):
+            if port not in self.sfps:
+                raise ValueError("Unknown port %r" % (port,))
+            key = port if self.bus_key is None else self.bus_key(self.sfps[port])
+            buses.setdefault(key, []).append(port)
+        return buses
+
+    @staticmethod
+    def _call(sfp, call):
+        if callable(call):
+            return call(sfp)
+        return getattr(sfp, call)()
+
+    def _poll_bus(self, ports, calls, results):
+        while True:
+            try:
+                port = ports.popleft()
+            except IndexError:
+                return
+            # Every call of a claimed port must get a result, or poll() would wait for it forever
+            posted = 0
+            try:
+                sfp = self.sfps[port]
+                for call in calls:
+                    start = time.monotonic()
+                    try:
+                        value, error = self._call(sfp, call), None
+                    except Exception as e:
+                        value, error = None, e
+                    results.put(XcvrPollResult(port, call, value, error, time.monotonic() - start))
+                    posted += 1
+            except BaseException as e:
+                for call in calls[posted:]:
+                    results.put(XcvrPollResult(port, call, None, e, 0.0))
+                if not isinstance(e, Exception):
+                    raise
+
+    def poll(self, calls=DEFAULT_POLL_CALLS, ports=None):
+        """
+        Poll ports concurrently and stream the results as they complete
+
+        Args:
+            calls: iterable of SfpOptoeBase method names (called without arguments)
+                   or callables taking a SfpOptoeBase
+            ports: iterable of port identifiers to poll. Defaults to all ports.
+
+        Returns:
+            A generator of XcvrPollResult, one per (port, call) pair, in completion order.
+            Exceptions raised by a call are reported in the result's error field.
+        """
+        calls = list(calls)
+        buses = self.get_buses(ports)
+        expected = len(calls) * sum(len(bus_ports) for bus_ports in buses.values())
+        if expected == 0:
+            return
+        results = queue.Queue()
+        executor = self._get_executor()
+        futures = []
+        for bus_ports in buses.values():
+            pending = deque(bus_ports)
+            for _ in range(min(self.max_workers_per_bus, len(bus_ports))):
+                futures.append(executor.submit(self._poll_bus, pending, calls, results))
+        for _ in range(expected):
+            while True:
+                try:
+                    yield results.get(timeout=RESULT_WAIT_INTERVAL)
+                    break
+                except queue.Empty:
+                    pass
+                # Do not wait for results no worker is left to produce
+                if all(future.done() for future in futures) and results.empty():
+                    for future in futures:
+                        if future.exception() is not None:
+                            raise future.exception()
+                    raise RuntimeError("XcvrPoller workers exited without polling every port")
+
+    def poll_all(self, calls=DEFAULT_POLL_CALLS, ports=None):
+        """
+        Poll ports concurrently and wait for every result
+
+        Returns:
+            A dict mapping each port to a dict mapping each call to its XcvrPollResult
+        """
+        polled = {}
+        for result in self.poll(calls, ports):
+            polled.setdefault(result.port, {})[result.call] = result
+        return polled
@@ -1,7 +1,8 @@
 from mock import MagicMock
 from mock import patch
 import pytest
-from sonic_platform_base.sonic_xcvr.api.public.c_cmis import CCmisApi, C_CMIS_XCVR_INFO_DEFAULT_DICT
+from sonic_platform_base.sonic_xcvr.api.public import c_cmis
+from sonic_platform_base.sonic_xcvr.api.public.c_cmis import CCmisApi, C_CMIS_XCVR_INFO_DEFAULT_DICT, C_CMIS_PM_FIELDS
 from sonic_platform_base.sonic_xcvr.mem_maps.public.c_cmis import CCmisMemMap
 from sonic_platform_base.sonic_xcvr.xcvr_eeprom import XcvrEeprom
 from sonic_platform_base.sonic_xcvr.codes.public.cmis import CmisCodes
@@ -161,6 +162,26 @@ class TestCCmis(object):
         result = self.api.get_pm_all()
         assert result == expected
 
+    def test_get_pm_all_via_cdb(self):
+        pm = {field: 2 for field in C_CMIS_PM_FIELDS}
+        self.api.xcvr_eeprom.read = MagicMock(side_effect=lambda field: pm[field])
+        expected = self.api.get_pm_all()
+        self.api.xcvr_eeprom.read.reset_mock()
+
+        with patch.object(c_cmis, 'CdbPm') as mock_cdb_pm, \
+             patch.object(self.api, 'is_cdb_supported', return_value=True), \
+             patch.object(CCmisApi, 'pm_via_cdb', True):
+            mock_cdb_pm.return_value.get_media_pm.return_value = pm
+            assert self.api.get_pm_all() == expected
+            self.api.xcvr_eeprom.read.assert_not_called()
+
+            # Fall back to the PM pages when the module does not support the PM commands
+            mock_cdb_pm.return_value.get_media_pm.return_value = None
+            assert self.api.get_pm_all() == expected
+            assert self.api.xcvr_eeprom.read.call_count == len(C_CMIS_PM_FIELDS)
+            mock_cdb_pm.assert_called_once()
+        self.api._cdb_pm_hdlr = None
+
     @pytest.mark.parametrize("mock_response, expected",[
         (
             (
@@ -1,16 +1,21 @@
 # test_cdb.py
+import itertools
 import pytest
 import struct
+import threading
 from unittest.mock import MagicMock, patch
 from sonic_platform_base.sonic_xcvr.mem_maps.public.cdb import (
     CdbMemMap, CDBCommand, CdbStatusQuery, CdbGetFirmwareInfo,
     CdbGetFirmwareMgmtFeatures, CdbStartFirmwareDownload,
     CdbAbortFirmwareDownload, CdbCompleteFirmwareDownload,
     CdbRunFirmwareDownload, CdbCommitFirmwareDownload,
-    CdbWriteLplBlock, CdbWriteEplBlock
+    CdbWriteLplBlock, CdbWriteEplBlock, CdbVcsWrite, CdbVcsRead
 )
-from sonic_platform_base.sonic_xcvr.fields import cdb_consts
+from sonic_platform_base.sonic_xcvr.fields import cdb_consts, consts
 from sonic_platform_base.sonic_xcvr.cdb.cdb import CdbCmdHandler
+from sonic_platform_base.sonic_xcvr.cdb.cdb_pm import CdbPmHandler
+from sonic_platform_base.sonic_xcvr.cdb.cdb_vcs import CdbVcsHandler
+from sonic_platform_base.sonic_xcvr.utils.polling import BackoffPoller
 
 
 class MockCodes:
@@ -628,8 +633,8 @@ class TestCdbCmdHandler:
         result = self.handler.send_cmd(cmd_id, payload)
         
         assert result == True
-        self.handler.write_cmd.assert_called_once_with(cmd_id, payload)
-        self.handler.wait_for_cdb_status.assert_called_once_with(None)
+        self.handler.write_cmd.assert_called_once_with(cmd_id, payload, cdb_consts.CDB_INSTANCE_1)
+        self.handler.wait_for_cdb_status.assert_called_once_with(None, cdb_consts.CDB_INSTANCE_1)
     
     def test_send_cmd_no_payload(self):
         """Test send_cmd without payload"""
@@ -645,7 +650,7 @@ class TestCdbCmdHandler:
         result = self.handler.send_cmd(cmd_id)
         
         assert result == True
-        self.handler.write_cmd.assert_called_once_with(cmd_id, None)
+        self.handler.write_cmd.assert_called_once_with(cmd_id, None, cdb_consts.CDB_INSTANCE_1)
     
     def test_send_cmd_with_timeout(self):
         """Test send_cmd with custom timeout"""
@@ -662,7 +667,7 @@ class TestCdbCmdHandler:
         result = self.handler.send_cmd(cmd_id, timeout=timeout)
         
         assert result == True
-        self.handler.wait_for_cdb_status.assert_called_once_with(timeout)
+        self.handler.wait_for_cdb_status.assert_called_once_with(timeout, cdb_consts.CDB_INSTANCE_1)
     
     def test_send_cmd_write_failure(self):
         """Test send_cmd when write_cmd fails"""
@@ -673,7 +678,7 @@ class TestCdbCmdHandler:
         result = self.handler.send_cmd(cmd_id)
         
         assert result is None
-        self.handler.write_cmd.assert_called_once_with(cmd_id, None)
+        self.handler.write_cmd.assert_called_once_with(cmd_id, None, cdb_consts.CDB_INSTANCE_1)
     
     def test_send_cmd_wait_status_timeout(self):
         """Test send_cmd when wait_for_cdb_status times out"""
@@ -860,4 +865,456 @@ class TestCdbCmdHandler:
             
             result = self.handler.send_cmd(cmd_id)
             
-            assert result == expected, f"Failed for combination: busy={is_busy}, failed={has_failed}, status={status}"
\ No newline at end of file
+            assert result == expected, f"Failed for combination: busy={is_busy}, failed={has_failed}, status={status}"
+
+    def _status(self, is_busy, has_failed=False, status=0x1):
+        return {
+            cdb_consts.CDB1_IS_BUSY: is_busy,
+            cdb_consts.CDB1_HAS_FAILED: has_failed,
+            cdb_consts.CDB1_STATUS: status
+        }
+
+    @patch('time.sleep')
+    def test_wait_for_cdb_status_polls_with_backoff(self, mock_sleep):
+        """Test wait_for_cdb_status returns as soon as a busy command completes"""
+        self.handler.read = MagicMock(side_effect=[self._status(True), None, self._status(True),
+                                                   self._status(False)])
+
+        ret, status = self.handler.wait_for_cdb_status()
+
+        assert ret == True
+        assert status[cdb_consts.CDB1_IS_BUSY] == False
+        delays = [call.args[0] for call in mock_sleep.call_args_list]
+        assert len(delays) == 3
+        assert delays[0] < 0.001
+        assert delays == sorted(delays)
+
+    @patch('time.sleep')
+    def test_wait_for_cdb_status_stale_status(self, mock_sleep):
+        """Test wait_for_cdb_status does not trust an idle status before the capture time"""
+        self.handler.read = MagicMock(return_value=self._status(False))
+
+        with patch('time.monotonic', side_effect=[0.0, 0.0, 0.05, 0.1]):
+            ret, _ = self.handler.wait_for_cdb_status()
+
+        assert ret == True
+        assert self.handler.read.call_count == 3
+
+    @patch('time.sleep')
+    def test_wait_for_cdb_status_timeout(self, mock_sleep):
+        """Test wait_for_cdb_status gives up after the timeout"""
+        self.handler.read = MagicMock(return_value=self._status(True))
+
+        with patch('time.monotonic', side_effect=[0.0, 0.5, 1.0]):
+            ret, status = self.handler.wait_for_cdb_status(1000)
+
+        assert ret == False
+        assert status[cdb_consts.CDB1_IS_BUSY] == True
+        assert self.handler.read.call_count == 2
+        mock_sleep.assert_called_once_with(0.0005)
+
+    def test_send_cmd_records_latency(self):
+        """Test send_cmd records the measured latency of completed commands"""
+        cmd_id = cdb_consts.CDB_GET_FIRMWARE_INFO_CMD
+        self.handler.write_cmd = MagicMock(return_value=True)
+        self.handler.wait_for_cdb_status = MagicMock(return_value=[True, self._status(False)])
+
+        with patch('time.monotonic', side_effect=[10.0, 10.25]):
+            assert self.handler.send_cmd(cmd_id) == True
+
+        assert self.handler.cmd_latency == {cmd_id: 0.25}
+
+        self.handler.wait_for_cdb_status = MagicMock(return_value=[False, None])
+        assert self.handler.send_cmd(cdb_consts.CDB_ABORT_FIRMWARE_DOWNLOAD_CMD) is None
+        assert list(self.handler.cmd_latency) == [cmd_id]
+
+
+class TestCdbWriteCapabilities:
+    """Test cases for the CdbCmdHandler use of the module advertised write capabilities"""
+
+    def setup_method(self):
+        self.eeprom = bytearray(256 * 128)
+        self.writer = MagicMock(return_value=True)
+        self.handler = CdbCmdHandler(self.read_eeprom, self.writer, CdbMemMap(MockCodes()))
+
+    def teardown_method(self):
+        CdbCmdHandler.set_writer_max_length(None)
+
+    def read_eeprom(self, offset, size):
+        return self.eeprom[offset:offset + size]
+
+    def advertise(self, autopaging, rw_length_ext, single_write):
+        self.eeprom[128 + 163] = 0x40 | (autopaging << 4) | 0xf
+        self.eeprom[128 + 164] = rw_length_ext
+        self.eeprom[128 + 165] = single_write << 5
+
+    def test_get_write_capabilities(self):
+        self.advertise(True, 255, True)
+        assert self.handler.get_write_capabilities() == (True, 2048, True)
+
+        CdbCmdHandler.set_writer_max_length(64)
+        assert self.handler.get_write_capabilities() == (True, 64, True)
+
+    def test_get_write_capabilities_unreadable(self):
+        self.handler.reader = MagicMock(return_value=None)
+        assert self.handler.get_write_capabilities() == (False, 8, False)
+
+        self.handler.reader = self.read_eeprom
+        self.advertise(False, 15, False)
+        assert self.handler.get_write_capabilities() == (False, 128, False)
+
+    def test_write_cmd_single_transaction(self):
+        self.advertise(False, 15, True)
+        payload = {"blkaddr": 0x10, "blkdata": b'\x55' * 16}
+        assert self.handler.write_cmd(cdb_consts.CDB_WRITE_FIRMWARE_LPL_CMD, payload) == True
+
+        self.writer.assert_called_once()
+        offset, size, data = self.writer.call_args[0]
+        assert offset == cdb_consts.LPL_PAGE * 128 + 128
+        assert size == len(data) == 8 + 4 + 16
+        assert bytes(data[:2]) == b'\x01\x03'
+
+    def test_write_cmd_two_writes(self):
+        # The module does not trigger at the end of the transaction
+        self.advertise(True, 255, False)
+        assert self.handler.write_cmd(cdb_consts.CDB_QUERY_STATUS_CMD) == True
+        assert [call[0][0] for call in self.writer.call_args_list] == [0x9f * 128 + 130, 0x9f * 128 + 128]
+
+        # The command does not fit in a single transaction
+        self.writer.reset_mock()
+        self.handler._write_capabilities = None
+        self.advertise(True, 0, True)
+        payload = {"blkaddr": 0, "blkdata": b'\xaa' * 16}
+        assert self.handler.write_cmd(cdb_consts.CDB_WRITE_FIRMWARE_LPL_CMD, payload) == True
+        assert self.writer.call_count == 2
+
+    def test_write_epl_pages_autopaging(self):
+        self.advertise(True, 127, False)
+        data = bytes(range(256)) * 7
+        self.handler.write_epl_pages(data)
+
+        start = cdb_consts.EPL_PAGE * 128 + 128
+        assert [call[0][:2] for call in self.writer.call_args_list] == \
+            [(start, 1024), (start + 1024, 768)]
+        assert b''.join(bytes(call[0][2]) for call in self.writer.call_args_list) == data
+
+    def test_write_epl_pages_without_autopaging(self):
+        self.advertise(False, 255, False)
+        data = b'\x11' * 300
+        self.handler.write_epl_pages(data)
+
+        assert [call[0][:2] for call in self.writer.call_args_list] == \
+            [(0xa0 * 128 + 128, 128), (0xa1 * 128 + 128, 128), (0xa2 * 128 + 128, 44)]
+
+
+class TestCdbSubmitCmd:
+    """Test cases for the CdbCmdHandler commands completed by a BackoffPoller"""
+
+    def setup_method(self):
+        self.handler = CdbCmdHandler(MagicMock(), MagicMock(), MagicMock())
+        self.handler.write_cmd = MagicMock(return_value=True)
+        self.poller = BackoffPoller()
+
+    def teardown_method(self):
+        self.poller.close()
+
+    @staticmethod
+    def _status(busy, failed=False, status=0x1):
+        return {
+            cdb_consts.CDB1_IS_BUSY: busy,
+            cdb_consts.CDB1_HAS_FAILED: failed,
+            cdb_consts.CDB1_STATUS: status
+        }
+
+    def test_submit_cmd(self):
+        release = threading.Event()
+
+        def read(field):
+            return self._status(not release.is_set())
+        self.handler.read = MagicMock(side_effect=read)
+        self.handler._advertisement = {cdb_consts.CDB_ADVERTISEMENT: {cdb_consts.CDB_BACKGROUND_MODE_SUPPORTED: False}}
+
+        cmd_id = cdb_consts.CDB_GET_FIRMWARE_INFO_CMD
+        future = self.handler.submit_cmd(cmd_id, poller=self.poller)
+        # The caller is not blocked while the module is busy
+        assert not future.done()
+        assert self.handler.is_accessible() == False
+
+        release.set()
+        assert future.result(timeout=5) == True
+        assert self.handler.is_accessible() == True
+        assert cmd_id in self.handler.cmd_latency
+        self.handler.write_cmd.assert_called_once_with(cmd_id, None, cdb_consts.CDB_INSTANCE_1)
+
+    def test_submit_cmd_background_mode(self):
+        self.handler.read = MagicMock(return_value=self._status(True))
+        self.handler._advertisement = {cdb_consts.CDB_ADVERTISEMENT: {cdb_consts.CDB_BACKGROUND_MODE_SUPPORTED: True}}
+
+        future = self.handler.submit_cmd(cdb_consts.CDB_GET_FIRMWARE_INFO_CMD, timeout=50, poller=self.poller)
+        assert self.handler.is_accessible() == True
+        # Still busy at the timeout
+        assert future.result(timeout=5) is None
+
+    def test_submit_cmd_failures(self):
+        self.handler.read = MagicMock(return_value=self._status(False, True, 0x2))
+        with patch('time.monotonic', side_effect=itertools.count(0, 0.2)):
+            future = self.handler.submit_cmd(cdb_consts.CDB_GET_FIRMWARE_INFO_CMD, poller=self.poller)
+            assert future.result(timeout=5) == False
+
+        self.handler.write_cmd.return_value = False
+        future = self.handler.submit_cmd(cdb_consts.CDB_GET_FIRMWARE_INFO_CMD, poller=self.poller)
+        assert future.done() and future.result() is None
+
+        self.handler.write_cmd.return_value = True
+        self.handler.read = MagicMock(side_effect=IOError("i2c error"))
+        future = self.handler.submit_cmd(cdb_consts.CDB_GET_FIRMWARE_INFO_CMD, poller=self.poller)
+        with pytest.raises(IOError):
+            future.result(timeout=5)
+        assert self.handler.pending_cmds == 0
+
+    def test_submit_cmd_overlap(self):
+        handlers = [CdbCmdHandler(MagicMock(), MagicMock(), MagicMock()) for _ in range(3)]
+        release = [threading.Event() for _ in handlers]
+        for handler, event in zip(handlers, release):
+            handler.write_cmd = MagicMock(return_value=True)
+            handler.read = MagicMock(side_effect=lambda field, event=event: self._status(not event.is_set()))
+
+        futures = [handler.submit_cmd(cdb_consts.CDB_QUERY_STATUS_CMD, poller=self.poller) for handler in handlers]
+        assert self.poller.get_pending() == 3
+        # Commands complete in any order
+        for index in (2, 0, 1):
+            release[index].set()
+            assert futures[index].result(timeout=5) == True
+
+    def test_poller_close(self):
+        self.handler.read = MagicMock(return_value=self._status(True))
+        future = self.handler.submit_cmd(cdb_consts.CDB_QUERY_STATUS_CMD, poller=self.poller)
+        self.poller.close()
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
+        with pytest.raises(RuntimeError):
+            self.poller.submit(MagicMock(), MagicMock(), 1)
+
+
+class TestCdbInstances:
+    """Test cases for the CdbCmdHandler dispatch of commands to CDB instances"""
+
+    def setup_method(self):
+        self.eeprom = bytearray(256 * 128)
+        # Two CDB instances
+        self.eeprom[128 + 163] = 0x80
+        self.writer = MagicMock(return_value=True)
+        self.handler = CdbCmdHandler(self.read_eeprom, self.writer, CdbMemMap(MockCodes()))
+
+    def read_eeprom(self, offset, size):
+        return self.eeprom[offset:offset + size]
+
+    def test_get_instances_supported(self):
+        assert self.handler.get_instances_supported() == 2
+        handler = CdbCmdHandler(MagicMock(return_value=None), self.writer, CdbMemMap(MockCodes()))
+        assert handler.get_instances_supported() == 1
+
+    def test_write_cmd_instance_2(self):
+        assert self.handler.write_cmd(cdb_consts.CDB_QUERY_STATUS_CMD, instance=cdb_consts.CDB_INSTANCE_2) == True
+        offsets = [call[0][0] for call in self.writer.call_args_list]
+        assert offsets == [cdb_consts.BANK_SELECT_OFFSET, 0x9f * 128 + 130, 0x9f * 128 + 128,
+                           cdb_consts.BANK_SELECT_OFFSET]
+        assert bytes(self.writer.call_args_list[0][0][2]) == b'\x01'
+        assert bytes(self.writer.call_args_list[-1][0][2]) == b'\x00'
+
+        self.writer.reset_mock()
+        self.handler.write_epl_pages(b'\x22' * 200, instance=cdb_consts.CDB_INSTANCE_2)
+        offsets = [call[0][0] for call in self.writer.call_args_list]
+        assert offsets[0] == offsets[-1] == cdb_consts.BANK_SELECT_OFFSET
+        assert offsets[1:-1] == [0xa0 * 128 + 128, 0xa1 * 128 + 128]
+
+        with pytest.raises(AssertionError, match="Invalid CDB instance"):
+            self.handler.write_cmd(cdb_consts.CDB_QUERY_STATUS_CMD, instance=3)
+
+    def test_send_cmd_instance_status(self):
+        # CDB1 busy, CDB2 completed successfully
+        self.eeprom[37] = 0x81
+        self.eeprom[38] = 0x01
+        with patch('time.monotonic', side_effect=itertools.count(0, 0.2)):
+            assert self.handler.send_cmd(cdb_consts.CDB_QUERY_STATUS_CMD, instance=cdb_consts.CDB_INSTANCE_2) == True
+        assert self.handler.last_status[cdb_consts.CDB_INSTANCE_2][cdb_consts.CDB2_STATUS] == 0x1
+        assert self.handler.last_status[cdb_consts.CDB_INSTANCE_1] is None
+
+        self.eeprom[38] = 0x42
+        assert self.handler.get_last_cmd_status(cdb_consts.CDB_INSTANCE_2) == \
+            self.handler.read(cdb_consts.CDB2_COMMAND_RESULT)
+        assert self.handler.read(cdb_consts.CDB2_COMMAND_RESULT) != \
+            self.handler.read(cdb_consts.CDB1_COMMAND_RESULT)
+
+    def test_send_cmd_instances_in_parallel(self):
+        release = threading.Event()
+        waiting = threading.Event()
+        status = {
+            cdb_consts.CDB1_IS_BUSY: False, cdb_consts.CDB1_HAS_FAILED: False, cdb_consts.CDB1_STATUS: 0x1,
+            cdb_consts.CDB2_IS_BUSY: False, cdb_consts.CDB2_HAS_FAILED: False, cdb_consts.CDB2_STATUS: 0x1,
+        }
+
+        def wait_for_cdb_status(timeout, instance):
+            if instance == cdb_consts.CDB_INSTANCE_1:
+                waiting.set()
+                release.wait(5)
+            return [True, status]
+        self.handler.write_cmd = MagicMock(return_value=True)
+        self.handler.wait_for_cdb_status = MagicMock(side_effect=wait_for_cdb_status)
+
+        results = []
+        thread = threading.Thread(target=lambda: results.append(
+            self.handler.send_cmd(cdb_consts.CDB_GET_FIRMWARE_INFO_CMD)))
+        thread.start()
+        assert waiting.wait(5)
+        # CDB2 is not held by the command running on CDB1
+        assert self.handler.send_cmd(cdb_consts.CDB_QUERY_STATUS_CMD, instance=cdb_consts.CDB_INSTANCE_2) == True
+        # CDB1 is
+        assert not self.handler._instance_locks[cdb_consts.CDB_INSTANCE_1].acquire(blocking=False)
+        release.set()
+        thread.join(5)
+        assert results == [True]
+
+class TestCdbPmHandler:
+    """Test cases for the CdbPmHandler PM commands"""
+
+    def setup_method(self):
+        self.eeprom = bytearray(256 * 128)
+        self.handler = CdbPmHandler(self.read_eeprom, MagicMock(return_value=True), CdbMemMap(MockCodes()))
+        self.handler.send_cmd = MagicMock(side_effect=self.send_cmd)
+        self.replies = {
+            cdb_consts.CDB_GET_PM_FEATURES_CMD: b'\x03',
+            cdb_consts.CDB_GET_MEDIA_FEC_PM_CMD: struct.pack(">5Q5I", 1000, 100, 10, 1, 2, 50, 5, 4, 0, 1),
+            cdb_consts.CDB_GET_MEDIA_LINK_PM_CMD: struct.pack(">3i", -10, -20, 30) + bytes(72),
+        }
+
+    def read_eeprom(self, offset, size):
+        return self.eeprom[offset:offset + size]
+
+    def send_cmd(self, cmd_id, *args, **kwargs):
+        reply = self.replies.get(cmd_id)
+        if reply is None:
+            return False
+        offset = 0x9f * 128 + 136
+        self.eeprom[offset:offset + len(reply)] = reply
+        return True
+
+    def test_get_media_pm(self):
+        pm = self.handler.get_media_pm()
+        assert pm[consts.RX_BITS_PM] == 1000
+        assert pm[consts.RX_MAX_CORR_BITS_SUB_INTERVAL_PM] == 2
+        assert pm[consts.RX_MAX_FRAMES_UNCORR_ERR_SUB_INTERVAL_PM] == 1
+        assert pm[consts.RX_AVG_CD_PM] == -10
+        assert pm[consts.RX_MAX_CD_PM] == 30
+        assert pm[consts.RX_MAX_MER_PM] == 0
+        # The features are read once
+        pm = self.handler.get_media_pm()
+        cmd_ids = [call[0][0] for call in self.handler.send_cmd.call_args_list]
+        assert cmd_ids.count(cdb_consts.CDB_GET_PM_FEATURES_CMD) == 1
+
+    def test_get_media_pm_unsupported(self):
+        self.replies[cdb_consts.CDB_GET_PM_FEATURES_CMD] = b'\x01'
+        assert self.handler.is_media_pm_supported() == False
+        assert self.handler.get_media_pm() is None
+
+    def test_get_media_pm_failed(self):
+        del self.replies[cdb_consts.CDB_GET_MEDIA_LINK_PM_CMD]
+        assert self.handler.get_media_pm() is None
+        del self.replies[cdb_consts.CDB_GET_PM_FEATURES_CMD]
+        handler = CdbPmHandler(self.read_eeprom, MagicMock(), CdbMemMap(MockCodes()))
+        handler.send_cmd = MagicMock(return_value=False)
+        assert handler.get_pm_features() is None
+        assert handler.get_media_pm() is None
+
+class TestCdbVcsHandler:
+    """Test cases for the CdbVcsHandler batched VCS commands"""
+
+    def setup_method(self):
+        self.eeprom = bytearray(256 * 128)
+        self.handler = CdbVcsHandler(self.read_eeprom, MagicMock(return_value=True), CdbMemMap(MockCodes()))
+        self.handler.send_cmd = MagicMock(side_effect=self.send_cmd)
+        self.params = {}
+        self.max_entries = 8
+        self.max_value_size = 4
+
+    def read_eeprom(self, offset, size):
+        return self.eeprom[offset:offset + size]
+
+    def set_reply(self, reply):
+        offset = 0x9f * 128 + 134
+        self.eeprom[offset] = len(reply)
+        self.eeprom[offset + 1] = 0xff - (sum(reply) & 0xff)
+        self.eeprom[offset + 2:offset + 2 + len(reply)] = reply
+
+    def send_cmd(self, cmd_id, payload=None, timeout=None, instance=cdb_consts.CDB_INSTANCE_1):
+        if cmd_id == cdb_consts.CDB_VCS_GET_FEATURES_CMD:
+            self.eeprom[0x9f * 128 + 136:0x9f * 128 + 138] = bytes([self.max_entries, self.max_value_size])
+        elif cmd_id == cdb_consts.CDB_VCS_WRITE_CMD:
+            results = []
+            for param_id, value in payload:
+                results.append(0 if param_id < 0x100 else 2)
+                self.params[param_id] = value
+            self.set_reply(bytes([len(results)] + results))
+        elif cmd_id == cdb_consts.CDB_VCS_READ_CMD:
+            entries = [(param_id, self.params[param_id]) for param_id in payload if param_id in self.params]
+            self.set_reply(bytes([len(entries)]) +
+                           b''.join(struct.pack(">HB", param_id, len(value)) + value for param_id, value in entries))
+        return True
+
+    def sent(self, cmd_id):
+        return [(call[0] + (None,))[1] for call in self.handler.send_cmd.call_args_list if call[0][0] == cmd_id]
+
+    def test_encode(self):
+        cmd = CdbVcsWrite().encode([(0x1234, b'\x01\x02'), (0x10, b'\xff')])
+        assert cmd[:2] == b'\x40\x01' and cmd[4] == 10
+        assert cmd[8:] == b'\x02\x12\x34\x02\x01\x02\x00\x10\x01\xff'
+        cmd = CdbVcsRead().encode([0x1234, 0x10])
+        assert cmd[4] == 5 and cmd[8:] == b'\x02\x12\x34\x00\x10'
+
+    def test_write_read_params(self):
+        params = [(i, struct.pack(">I", i)) for i in range(20)]
+        results = self.handler.write_params(params)
+        assert results == {i: 0 for i in range(20)}
+        # 20 entries of 7 bytes in batches of at most 8 entries
+        assert [len(batch) for batch in self.sent(cdb_consts.CDB_VCS_WRITE_CMD)] == [8, 8, 4]
+        assert self.sent(cdb_consts.CDB_VCS_GET_FEATURES_CMD) == [None]
+
+        values = self.handler.read_params(list(range(20)) + [0x50])
+        assert values == dict(params + [(0x50, None)])
+        assert [len(batch) for batch in self.sent(cdb_consts.CDB_VCS_READ_CMD)] == [8, 8, 5]
+
+        # Batches limited by the LPL size, requests of 23 bytes per entry
+        self.handler.send_cmd.reset_mock()
+        self.handler.vcs_features = None
+        self.max_entries, self.max_value_size = 255, 20
+        self.handler.write_params([(i, bytes(20)) for i in range(10)])
+        assert [len(batch) for batch in self.sent(cdb_consts.CDB_VCS_WRITE_CMD)] == [5, 5]
+        # Batches limited by the RPL size, replies of 23 bytes per entry
+        self.handler.read_params(range(12))
+        assert [len(batch) for batch in self.sent(cdb_consts.CDB_VCS_READ_CMD)] == [5, 5, 2]
+
+    def test_write_params_apply(self):
+        assert self.handler.write_params([(1, b'\x01'), (2, b'\x02')], apply=True) == {1: 0, 2: 0}
+        assert self.sent(cdb_consts.CDB_VCS_APPLY_CMD) == [None]
+        # Not applied when a parameter is rejected
+        self.handler.send_cmd.reset_mock()
+        assert self.handler.write_params([(1, b'\x01'), (0x100, b'\x02')], apply=True) == {1: 0, 0x100: 2}
+        assert self.sent(cdb_consts.CDB_VCS_APPLY_CMD) == []
+        with pytest.raises(AssertionError):
+            self.handler.write_params([(1, bytes(5))])
+
+    def test_failures(self):
+        # Corrupted reply check code
+        self.handler.write_params([(1, b'\x01')])
+        self.eeprom[0x9f * 128 + 135] ^= 0xff
+        assert self.handler.read_reply_raw() is None
+        self.handler.send_cmd.side_effect = lambda cmd_id, *args, **kwargs: \
+            self.send_cmd(cmd_id, *args, **kwargs) if cmd_id == cdb_consts.CDB_VCS_GET_FEATURES_CMD else False
+        assert self.handler.write_params([(1, b'\x01')], apply=True) == {1: None}
+        assert self.handler.read_params([1, 2]) == {1: None, 2: None}
+        handler = CdbVcsHandler(self.read_eeprom, MagicMock(), CdbMemMap(MockCodes()))
+        handler.send_cmd = MagicMock(return_value=False)
+        assert handler.get_vcs_features() is None
+        assert handler.read_params([1]) == {1: None}
+        assert CdbVcsHandler.parse_read_reply(b'\x01\x00\x01\x05\x00') is None
+        assert CdbVcsHandler.parse_write_reply(b'\x02\x00') is None
@@ -1,9 +1,16 @@
 # test_cdb_fw.py
 import pytest
-from mock import MagicMock, patch, mock_open, call
+from mock import MagicMock, patch, call
 #from unittest.mock import patch, mock_open, call
 from sonic_platform_base.sonic_xcvr.cdb.cdb_fw import CdbFwHandler
 from sonic_platform_base.sonic_xcvr.fields import cdb_consts
+from sonic_platform_base.sonic_xcvr.utils.fw_image import FwImage
+
+def write_image(tmp_path, data):
+    """Write a firmware image file and return its path"""
+    image = tmp_path / "firmware.bin"
+    image.write_bytes(data)
+    return str(image)
 
 class TestCdbFwHandler:
     """Test cases for CdbFwHandler class"""
@@ -136,20 +143,15 @@ class TestCdbFwHandler:
         assert result == False
         self.handler.send_cmd.assert_called_once_with(cdb_consts.CDB_GET_FIRMWARE_INFO_CMD)
     
-    @patch("builtins.open", new_callable=mock_open, read_data=b"A" * 512)
-    def test_start_fw_download_success(self, mock_file):
+    def test_start_fw_download_success(self, tmp_path):
         """Test successful start_fw_download"""
         self.handler.start_payload_size = 128
         self.handler.send_cmd = MagicMock(return_value=True)
+        image = write_image(tmp_path, b"A" * 512)
         
-        # Mock the file operations
-        mock_file.return_value.seek.return_value = None
-        mock_file.return_value.tell.return_value = 512  # Mock file size
-        
-        result = self.handler.start_fw_download("/path/to/firmware.bin")
+        result = self.handler.start_fw_download(image)
         
         assert result == True
-        mock_file.assert_called_once_with("/path/to/firmware.bin", 'rb')
         self.handler.send_cmd.assert_called_once()
         
         # Verify payload
@@ -158,17 +160,13 @@ class TestCdbFwHandler:
         assert payload["imgsize"] == 512
         assert payload["imghdr"] == b"A" * 128
         
-    @patch("builtins.open", new_callable=mock_open, read_data=b"A" * 512)
-    def test_start_fw_download_no_header(self, mock_file):
+    def test_start_fw_download_no_header(self, tmp_path):
         """Test start_fw_download with no header required"""
         self.handler.start_payload_size = 0
         self.handler.send_cmd = MagicMock(return_value=True)
+        image = write_image(tmp_path, b"A" * 512)
         
-        # Mock the file operations
-        mock_file.return_value.seek.return_value = None
-        mock_file.return_value.tell.return_value = 512  # Mock file size
-        
-        result = self.handler.start_fw_download("/path/to/firmware.bin")
+        result = self.handler.start_fw_download(image)
         
         assert result == True
         # Verify payload has None for header
@@ -177,17 +175,13 @@ class TestCdbFwHandler:
         assert payload["imgsize"] == 512
         assert payload["imghdr"] is None    
     
-    @patch("builtins.open", new_callable=mock_open, read_data=b"A" * 50)
-    def test_start_fw_download_file_too_small(self, mock_file):
+    def test_start_fw_download_file_too_small(self, tmp_path):
         """Test start_fw_download with file too small for header"""
         self.handler.start_payload_size = 128
-        
-        # Mock the file operations
-        mock_file.return_value.seek.return_value = None
-        mock_file.return_value.tell.return_value = 50  # Mock file size
+        image = write_image(tmp_path, b"A" * 50)
         
         with pytest.raises(ValueError, match="Firmware image file is too small"):
-            self.handler.start_fw_download("/path/to/firmware.bin")
+            self.handler.start_fw_download(image)
     
     def test_run_fw_image_default_params(self):
         """Test run_fw_image with default parameters"""
@@ -242,38 +236,26 @@ class TestCdbFwHandler:
         assert result == True
         self.handler.send_cmd.assert_called_once_with(cdb_consts.CDB_ABORT_FIRMWARE_DOWNLOAD_CMD)
     
-    @patch("builtins.open", new_callable=mock_open)
-    def test_download_fw_image_lpl_success(self, mock_file):
+    def test_download_fw_image_lpl_success(self, tmp_path):
         """Test successful download_fw_image with LPL only"""
         # Setup file content
-        file_data = b"H" * 128 + b"D" * 1024  # Header + Data
-        mock_file.return_value.read.side_effect = [
-            b"H" * 128,  # Header read
-            b"D" * 1024,  # First data chunk
-            b""  # EOF
-        ]
+        image = write_image(tmp_path, b"H" * 128 + b"D" * 1024)  # Header + Data
         
         self.handler.start_payload_size = 128
         self.handler.rw_length_ext = 1024
         self.handler.is_lpl_only = True
         self.handler.write_lpl_block = MagicMock(return_value=True)
         
-        result, bytes_written = self.handler.download_fw_image("/path/to/firmware.bin")
+        result, bytes_written = self.handler.download_fw_image(image)
         
         assert result == True
         assert bytes_written == 1024
         self.handler.write_lpl_block.assert_called_once_with(0, b"D" * 1024)
     
-    @patch("builtins.open", new_callable=mock_open)
-    def test_download_fw_image_epl_success(self, mock_file):
+    def test_download_fw_image_epl_success(self, tmp_path):
         """Test successful download_fw_image with EPL"""
-        # Setup file content
-        mock_file.return_value.read.side_effect = [
-            b"H" * 256,  # Header read
-            b"D" * 2048,  # First data chunk
-            b"E" * 1024,  # Second data chunk
-            b""  # EOF
-        ]
+        # Setup file content: header, then two data chunks
+        image = write_image(tmp_path, b"H" * 256 + b"D" * 2048 + b"E" * 1024)
         
         self.handler.start_payload_size = 256
         self.handler.rw_length_ext = 2048
@@ -281,7 +263,7 @@ class TestCdbFwHandler:
         self.handler.write_epl_pages = MagicMock(return_value=True)
         self.handler.write_epl_block = MagicMock(return_value=True)
         
-        result, bytes_written = self.handler.download_fw_image("/path/to/firmware.bin")
+        result, bytes_written = self.handler.download_fw_image(image)
         
         assert result == True
         assert bytes_written == 3072  # 2048 + 1024
@@ -293,31 +275,23 @@ class TestCdbFwHandler:
         assert calls[0] == call(0, b"D" * 2048)
         assert calls[1] == call(2048, b"E" * 1024)
     
-    @patch("builtins.open", new_callable=mock_open)
-    def test_download_fw_image_no_header(self, mock_file):
+    def test_download_fw_image_no_header(self, tmp_path):
         """Test download_fw_image with no header required"""
-        mock_file.return_value.read.side_effect = [
-            b"D" * 512,  # Data chunk
-            b""  # EOF
-        ]
+        image = write_image(tmp_path, b"D" * 512)  # Data chunk
         
         self.handler.start_payload_size = 0
         self.handler.rw_length_ext = 1024
         self.handler.is_lpl_only = True
         self.handler.write_lpl_block = MagicMock(return_value=True)
         
-        result, bytes_written = self.handler.download_fw_image("/path/to/firmware.bin")
+        result, bytes_written = self.handler.download_fw_image(image)
         
         assert result == True
         assert bytes_written == 512
     
-    @patch("builtins.open", new_callable=mock_open)
-    def test_download_fw_image_epl_write_failure(self, mock_file):
+    def test_download_fw_image_epl_write_failure(self, tmp_path):
         """Test download_fw_image with EPL write failure"""
-        mock_file.return_value.read.side_effect = [
-            b"H" * 128,  # Header
-            b"D" * 1024,  # Data
-        ]
+        image = write_image(tmp_path, b"H" * 128 + b"D" * 1024)  # Header + Data
         
         self.handler.start_payload_size = 128
         self.handler.rw_length_ext = 1024
@@ -325,7 +299,7 @@ class TestCdbFwHandler:
         self.handler.write_epl_pages = MagicMock(return_value=True)
         self.handler.write_epl_block = MagicMock(return_value=False)
         
-        result, bytes_written = self.handler.download_fw_image("/path/to/firmware.bin")
+        result, bytes_written = self.handler.download_fw_image(image)
         
         assert result == False
         assert bytes_written == 0
@@ -338,46 +312,41 @@ class TestCdbFwHandler:
             assert result == False
             assert bytes_written == 0
     
-    @patch("builtins.open", new_callable=mock_open, read_data=b"A" * 50)
-    def test_download_fw_image_file_too_small(self, mock_file):
+    def test_download_fw_image_file_too_small(self, tmp_path):
         """Test download_fw_image with file too small for header"""
         self.handler.start_payload_size = 128
+        image = write_image(tmp_path, b"A" * 50)
         
-        result, bytes_written = self.handler.download_fw_image("/path/to/firmware.bin")
+        result, bytes_written = self.handler.download_fw_image(image)
         
         assert result == False
         assert bytes_written == 0
     
-    @patch("builtins.open", new_callable=mock_open)
-    def test_download_fw_image_generic_exception(self, mock_file):
+    def test_download_fw_image_generic_exception(self, tmp_path):
         """Test download_fw_image with generic exception"""
-        mock_file.return_value.read.side_effect = Exception("Test exception")
+        image = write_image(tmp_path, b"D" * 512)
+        self.handler.rw_length_ext = 512
+        self.handler.is_lpl_only = True
+        self.handler.write_lpl_block = MagicMock(side_effect=Exception("Test exception"))
         self.handler.abort_fw_download = MagicMock(return_value=True)
         
-        result, bytes_written = self.handler.download_fw_image("/path/to/firmware.bin")
+        result, bytes_written = self.handler.download_fw_image(image)
         
         assert result == False
         assert bytes_written == 0
         self.handler.abort_fw_download.assert_called_once()
     
-    @patch("builtins.open", new_callable=mock_open)
-    def test_download_fw_image_multiple_chunks(self, mock_file):
+    def test_download_fw_image_multiple_chunks(self, tmp_path):
         """Test download_fw_image with multiple data chunks"""
-        # Setup multiple chunks
-        mock_file.return_value.read.side_effect = [
-            b"H" * 64,   # Header
-            b"A" * 512,  # Chunk 1
-            b"B" * 512,  # Chunk 2
-            b"C" * 256,  # Chunk 3 (partial)
-            b""          # EOF
-        ]
+        # Setup multiple chunks: header, two full chunks and a partial one
+        image = write_image(tmp_path, b"H" * 64 + b"A" * 512 + b"B" * 512 + b"C" * 256)
         
         self.handler.start_payload_size = 64
         self.handler.rw_length_ext = 512
         self.handler.is_lpl_only = True
         self.handler.write_lpl_block = MagicMock(return_value=True)
         
-        result, bytes_written = self.handler.download_fw_image("/path/to/firmware.bin")
+        result, bytes_written = self.handler.download_fw_image(image)
         
         assert result == True
         assert bytes_written == 1280  # 512 + 512 + 256
@@ -389,33 +358,69 @@ class TestCdbFwHandler:
         assert calls[1] == call(512, b"B" * 512)
         assert calls[2] == call(1024, b"C" * 256)
     
-    def test_download_fw_image_empty_file_with_header(self):
+    def test_download_fw_image_empty_file_with_header(self, tmp_path):
         """Test download_fw_image with empty file when header is required"""
-        with patch("builtins.open", mock_open(read_data=b"")):
-            self.handler.start_payload_size = 128
-            
-            result, bytes_written = self.handler.download_fw_image("/path/to/empty.bin")
-            
-            assert result == False
-            assert bytes_written == 0
+        image = write_image(tmp_path, b"")
+        self.handler.start_payload_size = 128
+        
+        result, bytes_written = self.handler.download_fw_image(image)
+        
+        assert result == False
+        assert bytes_written == 0
     
-    def test_download_fw_image_empty_file_no_header(self):
+    def test_download_fw_image_empty_file_no_header(self, tmp_path):
         """Test download_fw_image with empty file when no header required"""
-        with patch("builtins.open", mock_open(read_data=b"")):
-            self.handler.start_payload_size = 0
-            
-            result, bytes_written = self.handler.download_fw_image("/path/to/empty.bin")
-            
-            assert result == True
-            assert bytes_written == 0
+        image = write_image(tmp_path, b"")
+        self.handler.start_payload_size = 0
+        
+        result, bytes_written = self.handler.download_fw_image(image)
+        
+        assert result == True
+        assert bytes_written == 0
+
+    def test_download_fw_image_resume(self, tmp_path):
+        """Test download_fw_image resuming from the last acknowledged block"""
+        image = tmp_path / "fw.bin"
+        data = bytes(range(64)) * 4
+        image.write_bytes(data)
+        self.handler.start_payload_size = 64
+        self.handler.rw_length_ext = 64
+        self.handler.is_lpl_only = False
+        self.handler.write_epl_pages = MagicMock(return_value=True)
+        self.handler.write_epl_block = MagicMock(side_effect=[True, False])
+        self.handler.abort_fw_download = MagicMock(return_value=True)
+        with patch.object(CdbFwHandler, 'download_resume', True):
+            assert self.handler.download_fw_image(str(image)) == (False, 64)
+            self.handler.abort_fw_download.assert_not_called()
+            assert self.handler.get_resume_address(str(image)) == 64
+
+            self.handler.write_epl_block = MagicMock(return_value=True)
+            assert self.handler.download_fw_image(str(image)) == (True, 192)
+            assert self.handler.write_epl_block.call_args_list == [call(64, data[128:192]), call(128, data[192:])]
+            assert self.handler.get_resume_address(str(image)) == 0
+
+    def test_download_fw_image_resume_lost(self, tmp_path):
+        """Test download_fw_image when the module rejects the resumed block"""
+        image = tmp_path / "fw.bin"
+        image.write_bytes(bytes(range(64)) * 4)
+        self.handler.start_payload_size = 64
+        self.handler.rw_length_ext = 64
+        self.handler.is_lpl_only = False
+        self.handler.write_epl_pages = MagicMock(return_value=True)
+        self.handler.write_epl_block = MagicMock(side_effect=[True, False, False])
+        self.handler.abort_fw_download = MagicMock(return_value=True)
+        with patch.object(CdbFwHandler, 'download_resume', True):
+            assert self.handler.download_fw_image(str(image)) == (False, 64)
+            assert self.handler.download_fw_image(str(image)) == (False, 0)
+            self.handler.abort_fw_download.assert_called_once()
+            assert self.handler.get_resume_address(str(image)) == 0
 
 
 # Integration tests
 class TestCdbFwHandlerIntegration:
     """Integration tests for CdbFwHandler"""
     
-    @patch("builtins.open", new_callable=mock_open)
-    def test_full_firmware_update_flow_lpl(self, mock_file):
+    def test_full_firmware_update_flow_lpl(self, tmp_path):
         """Test complete firmware update flow with LPL"""
         # Setup
         reader = MagicMock()
@@ -431,24 +436,47 @@ class TestCdbFwHandlerIntegration:
             }):
                 handler = CdbFwHandler(reader, writer, mem_map)
         
-        # Setup file content and operations for start_fw_download
-        mock_file.return_value.read.side_effect = [
-            b"H" * 64,   # Header for start
-            b"H" * 64,   # Header for download
-            b"D" * 248,  # Data chunk
-            b""          # EOF
-        ]
-        mock_file.return_value.seek.return_value = None
-        mock_file.return_value.tell.return_value = 312  # 64 + 248
+        # Setup file content: header and data chunk
+        image = write_image(tmp_path, b"H" * 64 + b"D" * 248)
         
         # Mock methods
         handler.send_cmd = MagicMock(return_value=True)
         handler.write_lpl_block = MagicMock(return_value=True)
         
         # Execute full flow
-        assert handler.start_fw_download("/path/to/fw.bin") == True
-        result, bytes_written = handler.download_fw_image("/path/to/fw.bin")
+        assert handler.start_fw_download(image) == True
+        result, bytes_written = handler.download_fw_image(image)
         print(f"Download result: {result}, Bytes written: {bytes_written}")
         assert handler.complete_fw_download() == True
         assert handler.run_fw_image() == True
-        assert handler.commit_fw_image() == True
\ No newline at end of file
+        assert handler.commit_fw_image() == True
+
+class TestFwImage:
+    """Test cases for FwImage"""
+
+    def test_blocks(self, tmp_path):
+        """Test the header and blocks are views of the mapped image"""
+        data = bytes(range(200))
+        with FwImage(write_image(tmp_path, data), 8) as image:
+            assert image.size == 200
+            assert image.header == data[:8]
+            blocks = list(image.get_blocks(64))
+            assert [address for address, _ in blocks] == [0, 64, 128]
+            assert all(isinstance(block, memoryview) for _, block in blocks)
+            assert b"".join(block for _, block in blocks) == data[8:]
+            assert [address for address, _ in image.get_blocks(64, 128)] == [128]
+            assert list(image.get_blocks(64, 192)) == []
+
+    def test_digest(self, tmp_path):
+        """Test the digest covers the whole image"""
+        with FwImage(write_image(tmp_path, b"A" * 100), 10) as image:
+            digest = image.get_digest()
+        with FwImage(write_image(tmp_path, b"A" * 99 + b"B"), 10) as image:
+            assert image.get_digest() != digest
+
+    def test_too_small(self, tmp_path):
+        """Test images smaller than the start payload are rejected"""
+        with pytest.raises(ValueError, match="too small"):
+            FwImage(write_image(tmp_path, b"A" * 10), 16)
+        with FwImage(write_image(tmp_path, b""), 0) as image:
+            assert image.size == 0 and list(image.get_blocks(64)) == []
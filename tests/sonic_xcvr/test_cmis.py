@@ -2301,6 +2301,44 @@ class TestCmis(object):
             result = self.api.get_transceiver_status_flags()
             assert result == expected_result
 
+    @pytest.mark.parametrize("cmis_rev, flat_mem, expected", [
+        ('5.0', False, 0),
+        ('4.0', False, None),
+        ('5.0', True, None),
+    ])
+    def test_get_lane_flags_summary(self, cmis_rev, flat_mem, expected):
+        with patch.object(self.api, 'get_cmis_rev', return_value=cmis_rev), \
+             patch.object(self.api, 'is_flat_memory', return_value=flat_mem), \
+             patch.object(self.api.xcvr_eeprom, 'read', return_value=0):
+            assert self.api.get_lane_flags_summary() == expected
+
+    def test_flag_summary_polling(self):
+        lane_status_flags = {'tx1fault': True, 'tx1_eq_fault': "N/A"}
+        CmisApi.set_flag_summary_polling(True)
+        try:
+            with patch.object(self.api, '_last_lane_flags', {}), \
+                 patch.object(self.api, 'get_module_firmware_fault_state_changed', return_value=(False, False, False)), \
+                 patch.object(self.api, 'is_flat_memory', return_value=False), \
+                 patch.object(self.api, '_get_lane_status_flags', return_value=lane_status_flags) as mock_lane_flags, \
+                 patch.object(self.api, 'get_lane_flags_summary', return_value=0) as mock_summary:
+                # The first poll reads the lane flags in full
+                assert self.api.get_transceiver_status_flags()['tx1fault'] is True
+                assert mock_lane_flags.call_count == 1
+                # Lane flags are all clear while the summary reports nothing
+                result = self.api.get_transceiver_status_flags()
+                assert result['tx1fault'] is False
+                assert result['tx1_eq_fault'] == "N/A"
+                assert result['module_state_changed'] is False
+                assert mock_lane_flags.call_count == 1
+                mock_summary.return_value = 0x1
+                assert self.api.get_transceiver_status_flags()['tx1fault'] is True
+                assert mock_lane_flags.call_count == 2
+                mock_summary.return_value = None
+                self.api.get_transceiver_status_flags()
+                assert mock_lane_flags.call_count == 3
+        finally:
+            CmisApi.set_flag_summary_polling(False)
+
     @pytest.mark.parametrize("mock_response, expected",[
         (
             [
@@ -3125,6 +3163,8 @@ class TestCmis(object):
         assert self.api._init_cdb_fw_handler is False
         mock_cdb_support.return_value = True
         assert self.api._create_cdb_fw_handler()
+        # Every port shares the CDB mem map
+        assert self.api._create_cdb_fw_handler().mem_map is self.api._create_cdb_fw_handler().mem_map
         
         with patch.object(self.api, '_init_cdb_fw_handler', new=False):
             assert self.api.cdb_fw_hdlr is None
@@ -3142,3 +3182,79 @@ class TestCmis(object):
             second_handle =self.api.cdb_fw_hdlr
             assert first_handle is second_handle
             assert mock_create_handler.call_count == 1
+
+
+class TestCmisFwDownloadResume(object):
+    START_SIZE = 8
+    BLOCK_SIZE = 16
+
+    def setup_method(self, method):
+        self.api = CmisApi(MagicMock())
+        self.api.cdb = MagicMock()
+        self.api.cdb.start_fw_download.return_value = 1
+        self.api.cdb.validate_fw_image.return_value = 1
+        CmisApi.set_fw_download_resume(True)
+
+    def teardown_method(self, method):
+        CmisApi.set_fw_download_resume(False)
+
+    def download(self, image):
+        return self.api.module_fw_download(self.START_SIZE, self.BLOCK_SIZE, False, True, 2048, str(image))
+
+    def written_blocks(self):
+        return [(args[0], bytes(args[1])) for args, _ in self.api.cdb.block_write_epl.call_args_list]
+
+    def test_resume(self, tmp_path):
+        image = tmp_path / "image.bin"
+        data = bytes(range(self.START_SIZE + 3 * self.BLOCK_SIZE))
+        image.write_bytes(data)
+        self.api.cdb.block_write_epl.side_effect = [1, 0x46]
+        status, txt = self.download(image)
+        assert not status and 'resumed at address 0x000010' in txt
+        self.api.cdb.abort_fw_download.assert_not_called()
+        assert self.api._fw_download_checkpoint.address == self.BLOCK_SIZE
+
+        self.api.cdb.reset_mock()
+        self.api.cdb.block_write_epl.side_effect = None
+        self.api.cdb.block_write_epl.return_value = 1
+        assert self.download(image)[0]
+        self.api.cdb.start_fw_download.assert_not_called()
+        assert self.written_blocks() == [(16, data[24:40]), (32, data[40:56])]
+        assert self.api._fw_download_checkpoint is None
+
+    def test_resume_other_image(self, tmp_path):
+        image = tmp_path / "image.bin"
+        image.write_bytes(b'\x01' * (self.START_SIZE + 2 * self.BLOCK_SIZE))
+        self.api.cdb.block_write_epl.side_effect = [1, 0x46]
+        assert not self.download(image)[0]
+
+        image.write_bytes(b'\x02' * (self.START_SIZE + 2 * self.BLOCK_SIZE))
+        self.api.cdb.reset_mock()
+        self.api.cdb.block_write_epl.side_effect = None
+        self.api.cdb.block_write_epl.return_value = 1
+        assert self.download(image)[0]
+        self.api.cdb.start_fw_download.assert_called_once()
+        assert [address for address, _ in self.written_blocks()] == [0, 16]
+
+    def test_resume_download_lost(self, tmp_path):
+        image = tmp_path / "image.bin"
+        image.write_bytes(bytes(range(self.START_SIZE + 2 * self.BLOCK_SIZE)))
+        self.api.cdb.block_write_epl.side_effect = [1, 0x46]
+        assert not self.download(image)[0]
+
+        # The module was reset meanwhile and rejects the resumed block
+        self.api.cdb.reset_mock()
+        self.api.cdb.block_write_epl.side_effect = [0x47, 1, 1]
+        assert self.download(image)[0]
+        self.api.cdb.abort_fw_download.assert_called_once()
+        self.api.cdb.start_fw_download.assert_called_once()
+        assert [address for address, _ in self.written_blocks()] == [16, 0, 16]
+
+    def test_resume_disabled(self, tmp_path):
+        CmisApi.set_fw_download_resume(False)
+        image = tmp_path / "image.bin"
+        image.write_bytes(bytes(range(self.START_SIZE + 2 * self.BLOCK_SIZE)))
+        self.api.cdb.block_write_epl.side_effect = [1, 0x46]
+        assert not self.download(image)[0]
+        self.api.cdb.abort_fw_download.assert_called_once()
+        assert self.api._fw_download_checkpoint is None
@@ -1,10 +1,13 @@
-from mock import MagicMock
+from mock import MagicMock, patch
 import pytest
+import time
 from sonic_platform_base.sonic_xcvr.api.public.cmis import CmisApi
-from sonic_platform_base.sonic_xcvr.api.public.cmisCDB import CmisCdbApi
+from sonic_platform_base.sonic_xcvr.api.public.cmisCDB import CmisCdbApi, CDB_CMD_CAPTURE_TIME
 from sonic_platform_base.sonic_xcvr.mem_maps.public.cmis import CmisMemMap
 from sonic_platform_base.sonic_xcvr.xcvr_eeprom import XcvrEeprom
 from sonic_platform_base.sonic_xcvr.codes.public.cmis import CmisCodes
+from sonic_platform_base.sonic_xcvr.fields import consts
+from sonic_platform_base.sonic_xcvr.utils.polling import BackoffPoller
 
 class TestCDB(object):
     codes = CmisCodes
@@ -54,6 +57,36 @@ class TestCDB(object):
         result = self.api.cdb1_chkstatus()
         assert result == expected
 
+    def test_cdb1_chkstatus_async(self):
+        self.api.xcvr_eeprom.read = MagicMock(side_effect=[128, 128, 1])
+        self.api._pending_cmd[1] = (0x0104, time.monotonic())
+        with BackoffPoller() as poller:
+            future = self.api.cdb1_chkstatus_async(poller=poller)
+            assert future.result(timeout=5) == 1
+        assert self.api.xcvr_eeprom.read.call_count == 3
+        assert 0x0104 in self.api.cdb_cmd_latency
+
+    def test_cdb_instance(self):
+        eeprom = XcvrEeprom(MagicMock(return_value=None), MagicMock(), self.mem_map)
+        eeprom.read = MagicMock(side_effect=lambda field: {consts.CDB_SUPPORT: 2, consts.CDB2_STATUS: 1}[field])
+        eeprom.write_raw = MagicMock()
+        api = CmisCdbApi(eeprom)
+        assert api.get_cdb_instance() == 1
+        with api.cdb_instance(2):
+            assert api.get_cdb_instance() == 2
+            api.write_cdb(bytearray(b'\x00\x00\x00\x00\x02\x00\x00\x00\x00\x10'))
+            assert api.cdb1_chkstatus() == 1
+        assert api.get_cdb_instance() == 1
+        offsets = [call[0][0] for call in eeprom.write_raw.call_args_list]
+        assert offsets == [126, 0x9f * 128 + 130, 0x9f * 128 + 128, 126]
+        assert api.cdb_last_status == {1: None, 2: 1}
+        assert 0 in api.cdb_cmd_latency
+
+        api.cdb_instance_supported = 1
+        with pytest.raises(AssertionError):
+            with api.cdb_instance(2):
+                pass
+
     @pytest.mark.parametrize("mock_response, expected", [
         (
             [18, 35, (0, 7, 112, 255, 255, 16, 0, 0, 19, 136, 0, 100, 3, 232, 19, 136, 58, 152)],
@@ -211,3 +244,61 @@ class TestCDB(object):
         self.api.cdb1_chkstatus.return_value = mock_response
         result = self.api.commit_fw_image()
         assert result == expected
+
+    def make_api(self):
+        return CmisCdbApi(XcvrEeprom(MagicMock(return_value=None), MagicMock(return_value=True), self.mem_map))
+
+    @patch('time.sleep')
+    def test_cdb1_chkstatus_latency(self, mock_sleep):
+        api = self.make_api()
+        api.xcvr_eeprom.read = MagicMock(side_effect=[128, 128, 1])
+        with patch('time.monotonic', side_effect=[10.0, 10.001, 10.002, 10.004]):
+            api.write_cdb(bytearray(b'\x01\x00\x00\x00\x00\x00\x00\x00'))
+            assert api.cdb1_chkstatus() == 1
+        assert api.cdb_cmd_latency[0x0100] == pytest.approx(0.004)
+        # Polls start below a millisecond and back off
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [0.0005, 0.001]
+
+    @patch('time.sleep')
+    def test_cdb1_chkstatus_capture_time(self, mock_sleep):
+        api = self.make_api()
+        # Status of the previous command until the new one is captured
+        api.xcvr_eeprom.read = MagicMock(side_effect=[1, 129, 1])
+        api.write_cdb(bytearray(b'\x01\x07\x00\x00\x00\x00\x00\x00'))
+        assert api.cdb1_chkstatus(capture_time=10) == 1
+        assert api.xcvr_eeprom.read.call_count == 3
+
+        # Never seen busy: trusted once the capture time elapsed
+        api.xcvr_eeprom.read = MagicMock(return_value=1)
+        with patch('time.monotonic', side_effect=[0.0, 0.05, 0.1]):
+            api.write_cdb(bytearray(b'\x01\x07\x00\x00\x00\x00\x00\x00'))
+            assert api.cdb1_chkstatus(capture_time=0.1) == 1
+        assert api.xcvr_eeprom.read.call_count == 2
+
+    @patch('time.sleep')
+    def test_cdb1_chkstatus_max_duration(self, mock_sleep):
+        api = self.make_api()
+        api.set_cdb_cmd_max_durations((0, 0x08, 112, 255, 255, 16, 0, 0, 0, 200, 0, 10, 0, 100, 0, 0, 0, 0))
+        assert api.cdb_cmd_max_duration == {0x0101: 2.0, 0x0102: 0.1, 0x0103: 1.0, 0x0104: 1.0}
+
+        api.xcvr_eeprom.read = MagicMock(return_value=128)
+        with patch('time.monotonic', side_effect=[0.0, 1.0, 2.0, 3.0]):
+            api.write_cdb(bytearray(b'\x01\x01\x00\x00\x00\x00\x00\x00'))
+            assert api.cdb1_chkstatus() == 128
+        assert api.xcvr_eeprom.read.call_count == 3
+        assert 0x0101 not in api.cdb_cmd_latency
+
+    def test_get_fw_management_features_max_durations(self):
+        api = self.make_api()
+        api.cdb1_chkstatus = MagicMock(return_value=1)
+        api.read_cdb = MagicMock(return_value=(18, 35, (0, 7, 112, 255, 255, 16, 0, 0, 19, 136, 0, 100, 3, 232, 19, 136, 58, 152)))
+        api.get_fw_management_features()
+        assert api.cdb_cmd_max_duration[0x0101] == pytest.approx(5.0)
+        assert api.cdb_cmd_max_duration[0x0104] == pytest.approx(1.0)
+        assert api.cdb_cmd_max_duration[0x0108] == pytest.approx(15.0)
+
+    def test_start_fw_download_capture_time(self):
+        api = self.make_api()
+        api.cdb1_chkstatus = MagicMock(return_value=1)
+        api.start_fw_download(3, bytearray(b'\x00\x00\x00'), 1000000)
+        api.cdb1_chkstatus.assert_called_once_with(CDB_CMD_CAPTURE_TIME)
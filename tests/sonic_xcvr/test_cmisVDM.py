@@ -1,3 +1,4 @@
+import random
 from mock import MagicMock
 import pytest
 from sonic_platform_base.sonic_xcvr.api.public.cmisVDM import CmisVdmApi
@@ -246,3 +247,93 @@ class TestVDM(object):
         self.api.get_vdm_page.side_effect = mock_response[3:]
         result = self.api.get_vdm_allpage()
         assert result == expected
+
+    def test_get_F16_values(self):
+        values = [0x9200, 0x0000, 0xffff, 0x1234]
+        assert self.api.get_F16_values(values) == [self.api.get_F16(value) for value in values]
+
+    def test_decode_vdm_words(self):
+        result = self.api.decode_vdm_words(bytearray(b'\xff\xfe\x92\x00'))
+        assert list(result['S16']) == [-2, -28160]
+        assert list(result['U16']) == [0xfffe, 0x9200]
+        assert result['F16'] == [self.api.get_F16(0xfffe), self.api.get_F16(0x9200)]
+
+    @pytest.mark.parametrize("field_option", [
+        CmisVdmApi.ALL_FIELD,
+        CmisVdmApi.VDM_REAL_VALUE,
+        CmisVdmApi.VDM_THRESHOLD | CmisVdmApi.VDM_FLAG,
+    ])
+    def test_get_vdm_page_bulk(self, field_option):
+        data = bytearray(random.Random(0).getrandbits(8) for _ in range(0x30 * 128))
+        # Descriptors: threshold set ID and lane in even bytes, type ID in odd bytes
+        for index in range(64):
+            data[0x20 * 128 + 128 + 2 * index] = ((index % 16) << 4) | (index % 8)
+            data[0x20 * 128 + 128 + 2 * index + 1] = [1, 2, 9, 5, 0, 15, 0xff, 10][index % 8]
+        reader = MagicMock(side_effect=lambda offset, size: data[offset:offset + size])
+        api = CmisVdmApi(XcvrEeprom(reader, self.writer, self.mem_map))
+        flag_page = data[0x2c * 128 + 128:0x2c * 128 + 256]
+
+        expected = api.get_vdm_page(0x20, flag_page, field_option)
+        reader.reset_mock()
+        CmisVdmApi.set_bulk_read_enabled(True)
+        try:
+            result = api.get_vdm_page(0x20, flag_page, field_option)
+        finally:
+            CmisVdmApi.set_bulk_read_enabled(False)
+        assert result == expected
+        assert reader.call_count <= 3
+
+    def test_get_vdm_page_bulk_read_failure(self):
+        reader = MagicMock(side_effect=[bytearray([0x10, 0x01] * 64), None])
+        api = CmisVdmApi(XcvrEeprom(reader, self.writer, self.mem_map))
+        assert api.get_vdm_page_bulk(0x20, None) == {}
+        with pytest.raises(ValueError):
+            api.get_vdm_page_bulk(0x30, None)
+
+    @pytest.mark.parametrize("field_option", [
+        CmisVdmApi.ALL_FIELD,
+        CmisVdmApi.VDM_REAL_VALUE,
+        CmisVdmApi.VDM_THRESHOLD | CmisVdmApi.VDM_FLAG,
+    ])
+    def test_get_vdm_allpage_cached_layout(self, field_option):
+        data = bytearray(random.Random(1).getrandbits(8) for _ in range(0x31 * 128))
+        # VDM supported, 2 groups
+        data[0x1 * 128 + 142] = 0x40
+        data[0x2f * 128 + 128] = 0x01
+        for page in (0x20, 0x21):
+            for index in range(64):
+                data[page * 128 + 128 + 2 * index] = ((index % 16) << 4) | ((index + page) % 8)
+                data[page * 128 + 128 + 2 * index + 1] = [1, 2, 9, 5, 0, 15, 0xff, 10, 20, 24][(index + page) % 10]
+        reader = MagicMock(side_effect=lambda offset, size: data[offset:offset + size])
+        api = CmisVdmApi(XcvrEeprom(reader, self.writer, self.mem_map))
+
+        expected = api.get_vdm_allpage(field_option)
+        assert expected
+        CmisVdmApi.set_layout_cache_enabled(True)
+        try:
+            assert api.get_vdm_allpage(field_option) == expected
+            # Only the firmware revision, value pages and flag page are read once the layout is cached
+            reader.reset_mock()
+            assert api.get_vdm_allpage(field_option) == expected
+            assert reader.call_count <= 3
+            assert all(not 0x20 * 128 + 128 <= call[0][0] < 0x24 * 128 + 128 and
+                       not 0x28 * 128 + 128 <= call[0][0] < 0x2c * 128 + 128 for call in reader.call_args_list)
+
+            # A firmware change reads the layout again
+            layout = api.get_vdm_layout()
+            data[40] += 1
+            assert api.get_vdm_layout() is not layout
+            api.invalidate_layout()
+            assert api._vdm_layout is None
+        finally:
+            CmisVdmApi.set_layout_cache_enabled(False)
+
+    def test_get_vdm_layout_unsupported(self):
+        reader = MagicMock(side_effect=lambda offset, size: bytearray(size))
+        api = CmisVdmApi(XcvrEeprom(reader, self.writer, self.mem_map))
+        assert api.get_vdm_layout() is None
+        CmisVdmApi.set_layout_cache_enabled(True)
+        try:
+            assert api.get_vdm_allpage() is None
+        finally:
+            CmisVdmApi.set_layout_cache_enabled(False)
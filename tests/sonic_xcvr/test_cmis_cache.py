@@ -3,6 +3,7 @@ from unittest.mock import MagicMock
 from sonic_platform_base.sonic_xcvr.api.public.cmis import CmisApi
 from sonic_platform_base.sonic_xcvr.codes.public.sff8024 import Sff8024
 from sonic_platform_base.sonic_xcvr.fields import consts
+from sonic_platform_base.sonic_xcvr.utils import cache
 
 class TestReadOnlyCacheDecorator:
     def setup_method(self):
@@ -216,3 +217,83 @@ class TestCacheDisabled:
         assert first == {}
         assert second == {}
         assert self.api.xcvr_eeprom.read.call_count == 2
+
+class TestCacheInvalidation:
+    def setup_method(self):
+        self.api = CmisApi(MagicMock())
+        self.api.set_cache_enabled(True)
+        self.api.xcvr_eeprom.read.reset_mock()
+        self.api.xcvr_eeprom.read.return_value = 'model_val'
+
+    def teardown_method(self):
+        CmisApi.set_cache_fingerprint_interval(None)
+
+    def test_invalidate_cache(self):
+        self.api.get_model()
+        self.api.invalidate_cache()
+        self.api.get_model()
+        assert self.api.xcvr_eeprom.read.call_count == 2
+        self.api.vdm = MagicMock()
+        self.api.invalidate_cache()
+        self.api.vdm.invalidate_layout.assert_called_once_with()
+
+    def test_fingerprint_change(self):
+        CmisApi.set_cache_fingerprint_interval(0)
+        self.api.xcvr_eeprom.read_raw.return_value = bytearray(b'\x18')
+        self.api.get_model()
+        self.api.get_model()
+        assert self.api.xcvr_eeprom.read.call_count == 1
+        # A new module was plugged in
+        self.api.xcvr_eeprom.read_raw.return_value = bytearray(b'\x19')
+        self.api.get_model()
+        assert self.api.xcvr_eeprom.read.call_count == 2
+
+    def test_fingerprint_interval(self, monkeypatch):
+        CmisApi.set_cache_fingerprint_interval(10)
+        now = [100.0]
+        monkeypatch.setattr(cache.time, 'monotonic', lambda: now[0])
+        self.api.xcvr_eeprom.read_raw.return_value = bytearray(b'\x18')
+        self.api.get_model()
+        self.api.get_model()
+        assert self.api.xcvr_eeprom.read_raw.call_count == len(CmisApi.CACHE_FINGERPRINT_RANGES)
+        now[0] += 10
+        self.api.get_model()
+        assert self.api.xcvr_eeprom.read_raw.call_count == 2 * len(CmisApi.CACHE_FINGERPRINT_RANGES)
+
+    def test_fingerprint_read_failure(self):
+        CmisApi.set_cache_fingerprint_interval(0)
+        self.api.xcvr_eeprom.read_raw.return_value = None
+        self.api.get_model()
+        self.api.get_model()
+        assert self.api.xcvr_eeprom.read.call_count == 2
+
+    def test_ttl_expiry(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr(cache.time, 'monotonic', lambda: now[0])
+        self.api.xcvr_eeprom.read.return_value = 1
+        first = self.api.get_module_active_firmware()
+        reads = self.api.xcvr_eeprom.read.call_count
+        assert self.api.get_module_active_firmware() == first
+        assert self.api.xcvr_eeprom.read.call_count == reads
+        now[0] += 60
+        self.api.get_module_active_firmware()
+        assert self.api.xcvr_eeprom.read.call_count == 2 * reads
+
+    @pytest.mark.parametrize("operation", ["commit", "reset", "download"])
+    def test_fw_change_invalidates(self, operation, tmp_path):
+        self.api.xcvr_eeprom.read.return_value = 1
+        self.api.get_module_inactive_firmware()
+        assert '_get_module_inactive_firmware_cache' in self.api.__dict__
+        self.api.cdb = MagicMock()
+        self.api.cdb.commit_fw_image.return_value = 1
+        self.api.cdb.start_fw_download.return_value = 1
+        self.api.cdb.validate_fw_image.return_value = 1
+        if operation == "commit":
+            assert self.api.module_fw_commit()[0]
+        elif operation == "reset":
+            self.api.reset_module(True)
+        else:
+            image = tmp_path / "image.bin"
+            image.write_bytes(b'\x00' * 8)
+            assert self.api.module_fw_download(8, 2048, False, True, 2048, str(image))[0]
+        assert '_get_module_inactive_firmware_cache' not in self.api.__dict__
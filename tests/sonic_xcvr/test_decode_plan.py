@@ -0,0 +1,77 @@
+import random
+
+from sonic_platform_base.sonic_xcvr.codes.public.cmis import CmisCodes
+from sonic_platform_base.sonic_xcvr.codes.public.sff8472 import Sff8472Codes
+from sonic_platform_base.sonic_xcvr.codes.public.sff8636 import Sff8636Codes
+from sonic_platform_base.sonic_xcvr.fields import consts
+from sonic_platform_base.sonic_xcvr.fields.xcvr_field import RegGroupField
+from sonic_platform_base.sonic_xcvr.mem_maps.decode_plan import DecodePlan, PlanEntry
+from sonic_platform_base.sonic_xcvr.mem_maps.public.c_cmis import CCmisMemMap
+from sonic_platform_base.sonic_xcvr.mem_maps.public.cmis import CmisMemMap
+from sonic_platform_base.sonic_xcvr.mem_maps.public.sff8472 import Sff8472MemMap
+from sonic_platform_base.sonic_xcvr.mem_maps.public.sff8636 import Sff8636MemMap
+from sonic_platform_base.sonic_xcvr.xcvr_eeprom import XcvrEeprom
+
+class TestDecodePlan(object):
+    def make_eeprom(self, mem_map, seed=0):
+        rand = random.Random(seed)
+        data = bytearray(rand.getrandbits(8) for _ in range(0x100 * 128))
+        return XcvrEeprom(lambda offset, size: data[offset:offset + size], None, mem_map)
+
+    def check_matches_field_decode(self, mem_map):
+        eeprom = self.make_eeprom(mem_map)
+        for name, field in mem_map._get_all_fields().items():
+            if isinstance(field, RegGroupField) or field.get_offset() is None:
+                continue
+            expected = eeprom.read(name)
+            decoded = eeprom.read_fields([name])[name]
+            if expected == expected:
+                assert decoded == expected, name
+            else:
+                assert decoded != decoded, name
+
+    def test_cmis(self):
+        self.check_matches_field_decode(CmisMemMap(CmisCodes))
+
+    def test_ccmis(self):
+        self.check_matches_field_decode(CCmisMemMap(CmisCodes))
+
+    def test_sff8636(self):
+        self.check_matches_field_decode(Sff8636MemMap(Sff8636Codes))
+
+    def test_sff8472(self):
+        self.check_matches_field_decode(Sff8472MemMap(Sff8472Codes))
+
+    def test_group(self):
+        mem_map = CmisMemMap(CmisCodes)
+        eeprom = self.make_eeprom(mem_map)
+        assert eeprom.read_fields([consts.ADMIN_INFO_FIELD])[consts.ADMIN_INFO_FIELD] == \
+            eeprom.read(consts.ADMIN_INFO_FIELD)
+
+    def test_entries(self):
+        plan = CmisMemMap(CmisCodes).get_decode_plan()
+        assert plan.entries[consts.VENDOR_NAME_FIELD].kind == PlanEntry.STRING
+        assert plan.entries[consts.ID_FIELD].kind == PlanEntry.CODE
+        assert plan.entries[consts.LENGTH_ASSEMBLY_FIELD].kind == PlanEntry.GENERIC
+        assert plan.entries[consts.ADMIN_INFO_FIELD].kind == PlanEntry.GROUP
+
+    def test_layers(self):
+        plan = CmisMemMap(CmisCodes).get_decode_plan()
+        layers = plan.get_layers(128, 128)
+        assert layers is plan.get_layers(128, 128)
+        entries = [entry for _, layer_entries in layers for entry in layer_entries]
+        assert len(entries) == len(set(entry.name for entry in entries))
+        for layer, layer_entries in layers:
+            assert layer.size <= 128
+            for prev, entry in zip(layer_entries, layer_entries[1:]):
+                assert prev.offset + prev.size <= entry.offset
+
+    def test_decode_missing_buffer(self):
+        plan = CmisMemMap(CmisCodes).get_decode_plan()
+        assert plan.decode([(0, None)], [consts.ID_FIELD]) == {consts.ID_FIELD: None}
+
+    def test_plan_shared(self):
+        plan = CmisMemMap(CmisCodes).get_decode_plan()
+        assert CmisMemMap(CmisCodes).get_decode_plan() is plan
+        assert CCmisMemMap(CmisCodes).get_decode_plan() is not plan
+        assert isinstance(plan, DecodePlan)
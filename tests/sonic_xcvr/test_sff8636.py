@@ -257,6 +257,42 @@ class TestSff8636(object):
         result = self.api.get_transceiver_status_flags()
         assert result == expected
 
+    def test_flag_summary_polling(self):
+        Sff8636Api.set_flag_summary_polling(True)
+        try:
+            with patch.object(self.api, '_last_status_flags', None), \
+                 patch.object(self.api, '_status_flags_masked', None), \
+                 patch.object(self.api, 'get_rx_los', return_value=[False, True, False, False]) as mock_rx_los, \
+                 patch.object(self.api, 'get_tx_fault', return_value=["N/A"] * 4), \
+                 patch.object(self.api.xcvr_eeprom, 'read') as mock_read:
+                # IntL deasserted, no LOS or Tx fault flag masked
+                mock_read.side_effect = lambda field: {consts.INTL_FIELD: True}.get(field, 0)
+                assert self.api.get_transceiver_status_flags()['rx2los'] is True
+                result = self.api.get_transceiver_status_flags()
+                assert result['rx2los'] is False
+                assert result['tx1fault'] == "N/A"
+                assert mock_rx_los.call_count == 1
+                # IntL asserted
+                mock_read.side_effect = lambda field: {consts.INTL_FIELD: False}.get(field, 0)
+                assert self.api.get_transceiver_status_flags()['rx2los'] is True
+                assert mock_rx_los.call_count == 2
+                # Rx LOS masked from IntL
+                self.api._status_flags_masked = None
+                mock_read.side_effect = lambda field: {consts.INTL_FIELD: True, consts.LOS_MASK_FIELD: 0x1}.get(field, 0)
+                self.api.get_transceiver_status_flags()
+                assert mock_rx_los.call_count == 3
+        finally:
+            Sff8636Api.set_flag_summary_polling(False)
+
+    def test_intl_field(self):
+        status_bits = self.mem_map.get_field(consts.STATUS_IND_BITS_FIELD)
+        assert status_bits.get_bitmask() == 0x04 and status_bits.start_bitpos == 2
+        intl = self.mem_map.get_field(consts.INTL_FIELD)
+        assert intl.get_offset() == 2
+        eeprom = XcvrEeprom(MagicMock(return_value=bytearray([0x02])), MagicMock(), self.mem_map)
+        assert eeprom.read(consts.INTL_FIELD) is True
+        assert eeprom.read(consts.FLAT_MEM_FIELD) is False
+
     @pytest.mark.parametrize("mock_response, expected",[
         (
             [
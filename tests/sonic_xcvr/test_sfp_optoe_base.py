@@ -1,3 +1,5 @@
+import os
+import threading
 from unittest.mock import mock_open
 from mock import MagicMock 
 from mock import patch 
@@ -209,4 +211,82 @@ class TestSfpOptoeBase(object):
             mocked_file.assert_called_once_with("/sys/class/eeprom", mode='rb', buffering=0)
             assert data == b'\x01'
             self.sfp_optoe_api.write_eeprom.assert_called_once_with(SFP_OPTOE_PAGE_SELECT_OFFSET, 1, b'\x00')
-            self.sfp_optoe_api.get_optoe_current_page.assert_called_once()
\ No newline at end of file
+            self.sfp_optoe_api.get_optoe_current_page.assert_called_once()
+
+
+class TestSfpOptoeBasePersistentFd(object):
+    @pytest.fixture
+    def sfp(self, tmp_path):
+        eeprom_path = tmp_path / "eeprom"
+        eeprom_path.write_bytes(bytes(range(256)) * 2)
+        sfp = SfpOptoeBase()
+        sfp.get_eeprom_path = MagicMock(return_value=str(eeprom_path))
+        SfpOptoeBase.set_persistent_eeprom_fd(True)
+        yield sfp
+        SfpOptoeBase.set_persistent_eeprom_fd(False)
+        sfp.close_eeprom_fd()
+
+    def test_read_write(self, sfp):
+        assert sfp.read_eeprom(0, 4) == bytearray([0, 1, 2, 3])
+        fd = sfp._eeprom_fd
+        assert sfp.write_eeprom(300, 2, bytearray(b'\xaa\xbb\xcc'))
+        assert sfp.read_eeprom(299, 4) == bytearray([43, 0xaa, 0xbb, 46])
+        # The same descriptor is used for every access
+        assert sfp._eeprom_fd == fd
+
+    def test_default_page(self, sfp):
+        sfp.write_eeprom(SFP_OPTOE_PAGE_SELECT_OFFSET, 1, bytearray([0x10]))
+        assert sfp.read_eeprom(SFP_OPTOE_UPPER_PAGE0_OFFSET, 1) == bytearray([128])
+        assert sfp.get_optoe_current_page() == 0
+
+    def test_reopen_on_stale_fd(self, sfp):
+        assert sfp.read_eeprom(0, 1) == bytearray([0])
+        os.close(sfp._eeprom_fd)
+        assert sfp.read_eeprom(1, 1) == bytearray([1])
+
+    def test_reopen_on_path_change(self, sfp, tmp_path):
+        sfp.read_eeprom(0, 1)
+        other_path = tmp_path / "other_eeprom"
+        other_path.write_bytes(b'\x55' * 16)
+        sfp.get_eeprom_path.return_value = str(other_path)
+        assert sfp.read_eeprom(0, 1) == bytearray([0x55])
+
+    def test_remove_xcvr_api_closes_fd(self, sfp):
+        sfp.read_eeprom(0, 1)
+        assert sfp._eeprom_fd is not None
+        sfp.remove_xcvr_api()
+        assert sfp._eeprom_fd is None
+
+    def test_missing_device(self, sfp, tmp_path):
+        sfp.get_eeprom_path.return_value = str(tmp_path / "missing")
+        assert sfp.read_eeprom(0, 1) is None
+        assert sfp.write_eeprom(0, 1, bytearray([0])) is False
+
+    def test_lock_per_port(self, sfp):
+        other = SfpOptoeBase()
+        assert sfp._get_eeprom_fd_lock() is not other._get_eeprom_fd_lock()
+
+    def test_close_waits_for_access(self, sfp):
+        sfp.read_eeprom(0, 1)
+        started, release = threading.Event(), threading.Event()
+        fds = []
+
+        def access(fd):
+            started.set()
+            release.wait(5)
+            fds.append(fd)
+            return os.pread(fd, 1, 2)
+
+        reader = threading.Thread(target=lambda: fds.append(sfp._access_eeprom_fd(access)))
+        reader.start()
+        started.wait(5)
+        closer = threading.Thread(target=sfp.close_eeprom_fd)
+        closer.start()
+        closer.join(0.1)
+        # The descriptor is not closed while the access is in progress
+        assert closer.is_alive()
+        release.set()
+        reader.join()
+        closer.join()
+        assert fds[1] == b'\x02'
+        assert sfp._eeprom_fd is None
@@ -208,4 +208,19 @@ class TestAmphBackplaneImpl:
         transceiver_info = amph_backplane.get_transceiver_info()
         
         # Verify the result is None
-        assert transceiver_info is None
\ No newline at end of file
+        assert transceiver_info is None
+
+class TestSharedMemMap(object):
+    def test_get_shared_mem_map(self):
+        from sonic_platform_base.sonic_xcvr.mem_maps.xcvr_mem_map import get_shared_mem_map
+        mem_map = get_shared_mem_map(CmisAec800gMemMap, CmisAec800gCodes)
+        assert isinstance(mem_map, CmisAec800gMemMap)
+        assert get_shared_mem_map(CmisAec800gMemMap, CmisAec800gCodes) is mem_map
+
+    def test_create_api_shares_mem_map(self):
+        factory1 = XcvrApiFactory(MagicMock(), MagicMock())
+        factory2 = XcvrApiFactory(MagicMock(), MagicMock())
+        api1 = factory1._create_api(CmisAec800gCodes, CmisAec800gMemMap, CmisAec800gApi)
+        api2 = factory2._create_api(CmisAec800gCodes, CmisAec800gMemMap, CmisAec800gApi)
+        assert api1.xcvr_eeprom is not api2.xcvr_eeprom
+        assert api1.xcvr_eeprom.mem_map is api2.xcvr_eeprom.mem_map
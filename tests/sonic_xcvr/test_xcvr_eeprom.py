@@ -0,0 +1,181 @@
+import threading
+
+from mock import MagicMock
+
+from sonic_platform_base.sonic_xcvr.codes.public.cmis import CmisCodes
+from sonic_platform_base.sonic_xcvr.codes.public.sff8472 import Sff8472Codes
+from sonic_platform_base.sonic_xcvr.fields import consts
+from sonic_platform_base.sonic_xcvr.mem_maps.public.cmis import CmisMemMap
+from sonic_platform_base.sonic_xcvr.mem_maps.public.sff8472 import Sff8472MemMap
+from sonic_platform_base.sonic_xcvr.xcvr_eeprom import XcvrEeprom
+
+class MockEeprom(object):
+    def __init__(self, size=0x100 * 128):
+        self.data = bytearray(size)
+        self.data[0] = 0x18
+        self.data[129:145] = b'VENDOR_NAME_TEST'
+        self.data[148:164] = b'VENDOR_PN_TEST00'
+        self.data[166:182] = b'VENDOR_SN_TEST00'
+        self.data[202] = 0x45
+        self.reader = MagicMock(side_effect=self.read)
+        self.writer = MagicMock(return_value=True)
+
+    def read(self, offset, size):
+        return bytearray(self.data[offset:offset + size])
+
+class TestXcvrEeprom(object):
+    mem_map = CmisMemMap(CmisCodes)
+
+    def make_eeprom(self):
+        mock_eeprom = MockEeprom()
+        return mock_eeprom, XcvrEeprom(mock_eeprom.reader, mock_eeprom.writer, self.mem_map)
+
+    def test_read_fields_matches_read(self):
+        mock_eeprom, eeprom = self.make_eeprom()
+        names = [consts.ID_FIELD, consts.VENDOR_NAME_FIELD, consts.VENDOR_PART_NO_FIELD,
+                 consts.VENDOR_SERIAL_NO_FIELD, consts.LENGTH_ASSEMBLY_FIELD]
+        expected = {name: eeprom.read(name) for name in names}
+        single_read_count = mock_eeprom.reader.call_count
+        mock_eeprom.reader.reset_mock()
+
+        result = eeprom.read_fields(names)
+        assert result == expected
+        assert result[consts.VENDOR_NAME_FIELD] == 'VENDOR_NAME_TEST'
+        # Length assembly and its length multiplier dependency share one byte
+        assert mock_eeprom.reader.call_count < single_read_count
+
+    def test_read_fields_coalesces_adjacent(self):
+        mock_eeprom, eeprom = self.make_eeprom()
+        eeprom.read_fields([consts.VENDOR_NAME_FIELD, consts.VENDOR_OUI_FIELD])
+        mock_eeprom.reader.assert_called_once_with(129, 19)
+
+    def test_read_fields_max_gap(self):
+        mock_eeprom, eeprom = self.make_eeprom()
+        eeprom.read_fields([consts.VENDOR_NAME_FIELD, consts.VENDOR_SERIAL_NO_FIELD])
+        assert mock_eeprom.reader.call_count == 2
+
+        mock_eeprom.reader.reset_mock()
+        eeprom.read_fields([consts.VENDOR_NAME_FIELD, consts.VENDOR_SERIAL_NO_FIELD], max_gap=32)
+        mock_eeprom.reader.assert_called_once_with(129, 53)
+
+    def test_read_fields_does_not_cross_pages(self):
+        mock_eeprom, eeprom = self.make_eeprom()
+        ranges = XcvrEeprom._coalesce_ranges(
+            [self.mem_map.get_field(consts.VENDOR_NAME_FIELD),
+             self.mem_map.get_field(consts.INACTIVE_FW_MAJOR_REV)], max_gap=512)
+        assert ranges == [(129, 145), (256, 257)]
+
+    def test_read_fields_deps(self):
+        mock_eeprom, eeprom = self.make_eeprom()
+        result = eeprom.read_fields([consts.LENGTH_ASSEMBLY_FIELD])
+        assert result == {consts.LENGTH_ASSEMBLY_FIELD: eeprom.read(consts.LENGTH_ASSEMBLY_FIELD)}
+
+    def test_read_fields_failure(self):
+        mock_eeprom, eeprom = self.make_eeprom()
+        mock_eeprom.reader.side_effect = lambda offset, size: None if offset < 128 else mock_eeprom.read(offset, size)
+        result = eeprom.read_fields([consts.ID_FIELD, consts.VENDOR_NAME_FIELD])
+        assert result == {consts.ID_FIELD: None, consts.VENDOR_NAME_FIELD: 'VENDOR_NAME_TEST'}
+
+    def test_snapshot(self):
+        mock_eeprom, eeprom = self.make_eeprom()
+        with eeprom.snapshot(pages=[0x00, 0x01]):
+            mock_eeprom.reader.assert_any_call(0, 256)
+            mock_eeprom.reader.assert_any_call(256, 128)
+            mock_eeprom.reader.reset_mock()
+            assert eeprom.read(consts.VENDOR_NAME_FIELD) == 'VENDOR_NAME_TEST'
+            assert eeprom.read(consts.INACTIVE_FW_MAJOR_REV) == 0
+            assert eeprom.read_raw(0, 1) == 0x18
+            assert eeprom.read_fields([consts.ID_FIELD, consts.VENDOR_PART_NO_FIELD]) == \
+                {consts.ID_FIELD: 'QSFP-DD Double Density 8X Pluggable Transceiver',
+                 consts.VENDOR_PART_NO_FIELD: 'VENDOR_PN_TEST00'}
+            mock_eeprom.reader.assert_not_called()
+
+            # Pages outside the snapshot are read from the device
+            eeprom.read_raw(0x11 * 128 + 128, 4)
+            mock_eeprom.reader.assert_called_once_with(0x11 * 128 + 128, 4)
+
+        mock_eeprom.reader.reset_mock()
+        eeprom.read(consts.VENDOR_NAME_FIELD)
+        mock_eeprom.reader.assert_called_once_with(129, 16)
+
+    def test_snapshot_write_invalidates(self):
+        mock_eeprom, eeprom = self.make_eeprom()
+        with eeprom.snapshot(pages=[0x00]):
+            mock_eeprom.data[129:145] = b'NEW_VENDOR_NAME_'
+            assert eeprom.read(consts.VENDOR_NAME_FIELD) == 'VENDOR_NAME_TEST'
+            eeprom.write_raw(129, 1, bytearray(b'N'))
+            assert eeprom.read(consts.VENDOR_NAME_FIELD) == 'NEW_VENDOR_NAME_'
+
+    def test_snapshot_nested(self):
+        mock_eeprom, eeprom = self.make_eeprom()
+        with eeprom.snapshot(pages=[0x00]):
+            with eeprom.snapshot(pages=[0x00, 0x01]):
+                assert mock_eeprom.reader.call_count == 2
+            mock_eeprom.reader.reset_mock()
+            eeprom.read_raw(0, 1)
+            eeprom.read_raw(256, 1)
+            mock_eeprom.reader.assert_called_once_with(256, 1)
+
+    def test_memoize_shared_deps(self):
+        mock_eeprom = MockEeprom()
+        # Internally calibrated, 25C
+        mock_eeprom.data[92] = 0x20
+        mock_eeprom.data[256 + 96] = 25
+        eeprom = XcvrEeprom(mock_eeprom.reader, mock_eeprom.writer, Sff8472MemMap(Sff8472Codes))
+        fields = [consts.TEMPERATURE_FIELD, consts.VOLTAGE_FIELD]
+        expected = [eeprom.read(name) for name in fields]
+        assert expected[0] == 25.0
+        unmemoized_read_count = mock_eeprom.reader.call_count
+        assert eeprom.get_memo_stats() == {"hits": 0, "misses": unmemoized_read_count}
+
+        mock_eeprom.reader.reset_mock()
+        with eeprom.memoize():
+            assert [eeprom.read(name) for name in fields] == expected
+            with eeprom.memoize():
+                assert eeprom.read(consts.TEMPERATURE_FIELD) == expected[0]
+        # Calibration type dependencies are shared by both fields
+        assert mock_eeprom.reader.call_count < unmemoized_read_count
+        assert eeprom.memo_hits == 3
+        assert eeprom._memo is None
+
+    def test_memoize_write_invalidates(self):
+        mock_eeprom, eeprom = self.make_eeprom()
+        with eeprom.memoize():
+            eeprom.read(consts.ID_FIELD)
+            eeprom.write_raw(0, 1, bytearray([0x19]))
+            mock_eeprom.data[0] = 0x19
+            assert eeprom.read(consts.ID_FIELD) == eeprom.mem_map.get_field(consts.ID_FIELD).decode(bytearray([0x19]))
+        assert mock_eeprom.reader.call_count == 2
+
+    def test_memoize_failed_read_retried(self):
+        mock_eeprom, eeprom = self.make_eeprom()
+        mock_eeprom.reader.side_effect = [None, bytearray([0x18])]
+        with eeprom.memoize():
+            assert eeprom.read(consts.ID_FIELD) is None
+            assert eeprom.read(consts.ID_FIELD) is not None
+        assert eeprom.memo_hits == 0
+
+    def test_memoize_thread_local(self):
+        mock_eeprom, eeprom = self.make_eeprom()
+        values = []
+        with eeprom.memoize():
+            eeprom.read(consts.ID_FIELD)
+            mock_eeprom.data[0] = 0x19
+            # Another thread neither reuses nor drops this thread's memo
+            thread = threading.Thread(target=lambda: values.append(eeprom.read(consts.ID_FIELD)))
+            thread.start()
+            thread.join()
+            assert eeprom._memo is not None
+            assert eeprom.read(consts.ID_FIELD) == eeprom.mem_map.get_field(consts.ID_FIELD).decode(bytearray([0x18]))
+        assert values == [eeprom.mem_map.get_field(consts.ID_FIELD).decode(bytearray([0x19]))]
+
+    def test_snapshot_thread_local(self):
+        mock_eeprom, eeprom = self.make_eeprom()
+        values = []
+        with eeprom.snapshot([0]):
+            mock_eeprom.data[0] = 0x19
+            thread = threading.Thread(target=lambda: values.append(eeprom.read_raw(0, 1)))
+            thread.start()
+            thread.join()
+            assert eeprom.read_raw(0, 1) == 0x18
+        assert values == [0x19]
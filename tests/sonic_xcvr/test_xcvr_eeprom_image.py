@@ -0,0 +1,126 @@
+from mock import MagicMock
+import pytest
+import time
+
+from sonic_platform_base.sonic_xcvr.api.public.cmis import CmisApi
+from sonic_platform_base.sonic_xcvr.xcvr_benchmark import format_results, main, run_benchmark
+from sonic_platform_base.sonic_xcvr.xcvr_eeprom_image import EepromCapture, EepromImage, EepromReplay
+
+def make_cmis_image():
+    image = EepromImage({"vendor": "VENDOR_NAME_TEST"})
+    # Paged CMIS 5.0 module
+    image.write(0, bytearray([0x18, 0x50, 0x00]))
+    image.write(129, b'VENDOR_NAME_TEST')
+    image.write(148, b'VENDOR_PN_TEST00')
+    for page in (0x01, 0x11):
+        image.write((page + 1) * 128, bytearray(128))
+    return image
+
+def make_sff8472_image():
+    image = EepromImage()
+    image.write(0, bytearray([0x03]))
+    image.write(20, b'VENDOR_NAME_TEST')
+    # Internally calibrated, 25C
+    image.write(92, bytearray([0x60]))
+    image.write(256 + 96, bytearray([25, 0]))
+    return image
+
+class TestEepromImage(object):
+    def test_read_write(self):
+        image = EepromImage()
+        image.write(120, bytearray(range(16)))
+        assert image.read(120, 16) == bytearray(range(16))
+        assert image.read(0, 4) == bytearray(4)
+        assert image.get_pages() == [0]
+        image.write(0x11 * 128 + 128, bytearray([1]))
+        assert image.get_pages() == [0, 0x11]
+
+    def test_save_load(self, tmp_path):
+        image = make_cmis_image()
+        path = str(tmp_path / "cmis.json.gz")
+        image.save(path)
+        loaded = EepromImage.load(path)
+        assert loaded.blocks == image.blocks
+        assert loaded.metadata == {"vendor": "VENDOR_NAME_TEST"}
+
+    def test_from_dict_invalid(self):
+        with pytest.raises(ValueError):
+            EepromImage.from_dict({"format": "other", "version": 1, "blocks": {}})
+        with pytest.raises(ValueError):
+            EepromImage.from_dict({"format": "sonic-xcvr-eeprom-image", "version": 1, "blocks": {"0": "00"}})
+
+class TestEepromCapture(object):
+    def test_capture(self):
+        live = make_cmis_image()
+        sfp = MagicMock()
+        sfp.read_eeprom.side_effect = live.read
+        sfp.write_eeprom.return_value = True
+        capture = EepromCapture.from_sfp(sfp)
+        api = capture.create_xcvr_api()
+        assert isinstance(api, CmisApi)
+        assert api.get_manufacturer() == "VENDOR_NAME_TEST"
+        assert capture.accesses[0] == ("read", 0, 1, b'\x18')
+        assert capture.image.read(129, 16) == b'VENDOR_NAME_TEST'
+
+        capture.writer(26, 1, bytearray([0x10]))
+        assert capture.accesses[-1].op == "write"
+        assert capture.image.read(26, 1) == bytearray([0x10])
+        # Only num_bytes of the write buffer are written
+        next_byte = capture.image.read(28, 1)
+        capture.writer(27, 1, bytearray([0x20, 0x30]))
+        assert capture.accesses[-1] == ("write", 27, 1, b'\x20')
+        assert capture.image.read(27, 1) == bytearray([0x20])
+        assert capture.image.read(28, 1) == next_byte
+
+        sfp.read_eeprom.side_effect = lambda offset, size: None if offset >= 0x11 * 128 else live.read(offset, size)
+        assert capture.capture_pages([0, 0x01, 0x10]) == [0x10]
+        assert capture.image.get_pages() == [0, 0x01]
+
+class TestEepromReplay(object):
+    def test_replay(self):
+        replay = EepromReplay(make_cmis_image())
+        api = replay.create_xcvr_api()
+        assert isinstance(api, CmisApi)
+        assert api.get_model() == "VENDOR_PN_TEST00"
+        assert replay.read_count > 0 and replay.bytes_read > 0
+        assert replay.writer(26, 1, bytearray([0x10]))
+        assert replay.reader(26, 1) == bytearray([0x10])
+
+    def test_read_only(self):
+        replay = EepromReplay(make_cmis_image(), read_only=True)
+        assert replay.writer(26, 1, bytearray([0x10]))
+        assert replay.reader(26, 1) == bytearray([0])
+        assert replay.write_count == 1
+
+    def test_latency(self, monkeypatch):
+        sleep = MagicMock()
+        monkeypatch.setattr(time, "sleep", sleep)
+        replay = EepromReplay(EepromImage(), latency=0.001, byte_latency=0.0001)
+        replay.reader(0, 10)
+        sleep.assert_called_once_with(pytest.approx(0.002))
+
+class TestXcvrBenchmark(object):
+    def test_cmis(self):
+        results = {result.name: result for result in run_benchmark(make_cmis_image(), "cmis", iterations=2)}
+        assert results["info"].api == "CmisApi"
+        assert results["info"].reads > 0
+        assert results["info"].bytes > 0
+        assert results["dom"].error is None
+
+    def test_sff8472(self):
+        results = run_benchmark(make_sff8472_image(), "sff8472", iterations=2)
+        by_name = {result.name: result for result in results}
+        assert by_name["dom"].api == "Sff8472Api"
+        assert by_name["dom"].error is None
+        # Not implemented by Sff8472Api
+        assert "vdm" not in by_name
+        assert "sff8472" in format_results(results)
+
+    def test_unknown_module(self):
+        assert run_benchmark(EepromImage()) == []
+
+    def test_main(self, tmp_path, capsys):
+        path = str(tmp_path / "sff8472.json.gz")
+        make_sff8472_image().save(path)
+        assert main(["-n", "1", "--json", path]) == 0
+        assert '"api": "Sff8472Api"' in capsys.readouterr().out
@@ -154,6 +154,10 @@ class TestXcvrField(object):
             "NestedField2": mem_map.get_field("NestedField2")
         }
 
+    def test_slots(self):
+        for field in mem_map._get_all_fields().values():
+            assert not hasattr(field, "__dict__")
+
 class TestRegBitsField(object):
     def test_encode_decode(self):
         field = mem_map.get_field("Bits0to1")
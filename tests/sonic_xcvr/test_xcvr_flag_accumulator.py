@@ -0,0 +1,164 @@
+from mock import MagicMock
+
+from sonic_platform_base.sonic_xcvr.api.public.cmis import CmisApi
+from sonic_platform_base.sonic_xcvr.sfp_optoe_base import SfpOptoeBase
+from sonic_platform_base.sonic_xcvr.xcvr_flag_accumulator import XcvrFlagAccumulator
+from sonic_platform_base.sonic_xcvr.xcvr_io_stats import XcvrIoStats
+
+class FlagEeprom(object):
+    """
+    EEPROM whose bytes [8, 12) are latched flags, cleared when read
+    """
+    def __init__(self):
+        self.data = bytearray(0x100 * 128)
+        self.reads = []
+
+    def read(self, offset, size):
+        self.reads.append((offset, size))
+        raw_data = bytearray(self.data[offset:offset + size])
+        for i in range(max(offset, 8), min(offset + size, 12)):
+            self.data[i] = 0
+        return raw_data
+
+class EepromSfp(SfpOptoeBase):
+    def __init__(self):
+        SfpOptoeBase.__init__(self)
+        self.eeprom = FlagEeprom()
+        self.eeprom.data[0] = 0x18
+
+    def get_name(self):
+        return "Ethernet0"
+
+    def read_eeprom(self, offset, num_bytes):
+        return self.eeprom.read(offset, num_bytes)
+
+    def write_eeprom(self, offset, num_bytes, write_buffer):
+        self.eeprom.data[offset:offset + num_bytes] = write_buffer
+        return True
+
+class TestXcvrFlagAccumulator(object):
+    def make_reader(self, eeprom, cycle=60):
+        acc = XcvrFlagAccumulator(ranges=((8, 4),), cycle=cycle)
+        return acc, acc.wrap(MagicMock(side_effect=eeprom.read))
+
+    def test_one_read_per_cycle(self):
+        eeprom = FlagEeprom()
+        eeprom.data[8:12] = b'\x01\x02\x04\x08'
+        acc, reader = self.make_reader(eeprom)
+        assert reader(8, 1) == bytearray(b'\x01')
+        assert reader(9, 2) == bytearray(b'\x02\x04')
+        # Reads outside of the latched ranges are not affected
+        assert reader(0, 1) == bytearray(1)
+        assert eeprom.reads == [(8, 4), (0, 1)]
+
+        # A whole cycle of reads of a byte returns the same flags
+        assert reader(8, 1) == bytearray(b'\x01')
+        acc.cycle = 0
+        eeprom.data[8] = 0x10
+        assert reader(8, 1) == bytearray(b'\x10')
+        assert eeprom.reads[-1] == (8, 4)
+
+    def test_consumers(self):
+        eeprom = FlagEeprom()
+        acc, reader = self.make_reader(eeprom, cycle=0)
+        acc.register("cli")
+        eeprom.data[8] = 0x01
+        with acc.consumer("xcvrd"):
+            assert acc.get_current_consumer() == "xcvrd"
+            assert reader(8, 1) == bytearray(b'\x01')
+        assert acc.get_current_consumer() is None
+
+        # Flags stay set until acknowledged, whoever reads the module
+        eeprom.data[8] = 0x02
+        assert reader(8, 1) == bytearray(b'\x03')
+        with acc.consumer("cli"):
+            assert reader(8, 1) == bytearray(b'\x03')
+        with acc.consumer("xcvrd"):
+            assert reader(8, 1) == bytearray(b'\x03')
+            acc.acknowledge("xcvrd", 8, 1)
+            assert reader(8, 1) == bytearray(1)
+        assert acc.get_flags("cli", 8, 1) == bytearray(b'\x03')
+        acc.acknowledge("cli")
+        assert acc.get_flags("cli", 8, 4) == bytearray(4)
+        assert acc.get_flags("cli", 0, 1) is None
+
+        acc.unregister("cli")
+        assert acc.get_flags("cli", 8, 1) is None
+
+    def test_auto_acknowledge(self):
+        eeprom = FlagEeprom()
+        acc, reader = self.make_reader(eeprom, cycle=0)
+        eeprom.data[8] = 0x01
+        # The default consumer gets the clear-on-read semantics of the module
+        assert reader(8, 1) == bytearray(b'\x01')
+        assert reader(8, 1) == bytearray(1)
+
+    def test_whole_page_read(self):
+        eeprom = FlagEeprom()
+        acc, reader = self.make_reader(eeprom)
+        acc.register("xcvrd")
+        eeprom.data[8:12] = b'\x01\x02\x04\x08'
+        eeprom.data[0] = 0x18
+        raw_data = reader(0, 128)
+        assert raw_data[0] == 0x18 and raw_data[8:12] == bytearray(b'\x01\x02\x04\x08')
+        # The flags of the page read are served for the rest of the cycle
+        assert reader(10, 2) == bytearray(b'\x04\x08')
+        assert acc.get_flags("xcvrd", 8, 4) == bytearray(b'\x01\x02\x04\x08')
+        assert eeprom.reads == [(0, 128)]
+
+    def test_refresh(self):
+        eeprom = FlagEeprom()
+        acc = XcvrFlagAccumulator(ranges=((8, 4),))
+        assert not acc.refresh()
+        acc.wrap(eeprom.read)
+        acc.register("xcvrd")
+        eeprom.data[11] = 0x80
+        assert acc.refresh()
+        assert acc.get_flags("xcvrd", 11, 1) == bytearray(b'\x80')
+
+    def test_read_failure(self):
+        acc = XcvrFlagAccumulator(ranges=((8, 4),))
+        reader = acc.wrap(MagicMock(return_value=None))
+        assert reader(8, 1) is None
+        assert reader(0, 128) is None
+
+    def test_sfp(self):
+        SfpOptoeBase.set_xcvr_flag_accumulation(True)
+        try:
+            sfp = EepromSfp()
+            api = sfp.get_xcvr_api()
+            assert isinstance(api, CmisApi)
+            acc = sfp.get_xcvr_flag_accumulator()
+            assert acc.ranges == tuple(sorted(CmisApi.LATCHED_FLAG_RANGES))
+
+            sfp.eeprom.data[9] = 0x01
+            with acc.consumer("xcvrd"):
+                assert api.xcvr_eeprom.read_raw(9, 1) == 0x01
+            assert acc.get_flags("xcvrd", 9, 1) == bytearray(b'\x01')
+            # The flag read by xcvrd was not stolen from the default consumer
+            assert api.xcvr_eeprom.read_raw(9, 1) == 0x01
+
+            sfp.remove_xcvr_api()
+            assert acc.ranges == ()
+            sfp.get_xcvr_api()
+            assert sfp.get_xcvr_flag_accumulator() is acc
+            assert acc.get_flags("xcvrd", 9, 1) == bytearray(1)
+        finally:
+            SfpOptoeBase.set_xcvr_flag_accumulation(False)
+
+    def test_sfp_io_stats(self):
+        stats = XcvrIoStats()
+        SfpOptoeBase.set_xcvr_flag_accumulation(True)
+        SfpOptoeBase.set_xcvr_io_stats(stats)
+        try:
+            sfp = EepromSfp()
+            api = sfp.get_xcvr_api()
+            stats.reset()
+            api.xcvr_eeprom.read_raw(8, 1)
+            api.xcvr_eeprom.read_raw(9, 1)
+            # Only the first read reached the module
+            assert sfp.eeprom.reads[-1] == (8, 4)
+            assert stats.to_dict()["Ethernet0"][None]["read"]["count"] == 1
+        finally:
+            SfpOptoeBase.set_xcvr_io_stats(None)
+            SfpOptoeBase.set_xcvr_flag_accumulation(False)
@@ -0,0 +1,134 @@
+import itertools
+import threading
+import time
+
+from mock import MagicMock, patch
+import pytest
+
+from sonic_platform_base.sonic_xcvr.utils import polling
+from sonic_platform_base.sonic_xcvr.xcvr_fw_upgrade import (
+    XcvrFwUpgrader, STAGE_VALIDATE, STAGE_DOWNLOAD, STAGE_RUN, STAGE_COMMIT, STAGE_DONE)
+
+FEATURE = (3, 2048, False, True, 2048)
+
+def fw_info(image_b_running):
+    active, inactive = ('2.0.0', '1.0.0') if image_b_running else ('1.0.0', '2.0.0')
+    return {'status': True, 'info': 'fw info\n',
+            'result': ('1.0.0', int(not image_b_running), 1, 0, '2.0.0', int(image_b_running), 0, 0,
+                       active, inactive)}
+
+def make_sfp(bus=0, download_delay=0.0, tracker=None):
+    api = MagicMock()
+    state = {'image_b_running': False}
+    api.get_module_fw_info.side_effect = lambda: fw_info(state['image_b_running'])
+    api.get_module_fw_mgmt_feature.return_value = {'status': True, 'info': 'feature\n', 'feature': FEATURE}
+
+    def download(*args):
+        if tracker is not None:
+            tracker.enter(bus)
+        time.sleep(download_delay)
+        if tracker is not None:
+            tracker.leave(bus)
+        return True, 'downloaded\n'
+    api.module_fw_download.side_effect = download
+
+    def run(mode):
+        state['image_b_running'] = True
+        return True, 'run\n'
+    api.module_fw_run.side_effect = run
+    api.module_fw_commit.return_value = (True, 'committed\n')
+    sfp = MagicMock()
+    sfp.bus = bus
+    sfp.get_xcvr_api.return_value = api
+    return sfp
+
+class ConcurrencyTracker(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = {}
+        self.max_active = {}
+
+    def enter(self, bus):
+        with self.lock:
+            self.active[bus] = self.active.get(bus, 0) + 1
+            self.max_active[bus] = max(self.max_active.get(bus, 0), self.active[bus])
+
+    def leave(self, bus):
+        with self.lock:
+            self.active[bus] -= 1
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "fw.bin"
+    path.write_bytes(bytes(range(256)) * 4)
+    return str(path)
+
+class TestXcvrFwUpgrader(object):
+    def test_upgrade(self, image):
+        sfps = {"Ethernet0": make_sfp(), "Ethernet8": make_sfp()}
+        progress = []
+        with XcvrFwUpgrader(sfps, progress=lambda port, stage: progress.append((port, stage))) as upgrader:
+            results = upgrader.upgrade(image)
+            assert upgrader.get_progress() == {"Ethernet0": STAGE_DONE, "Ethernet8": STAGE_DONE}
+        for port in sfps:
+            result = results[port]
+            assert result.ok
+            assert result.stage == STAGE_DONE
+            assert result.firmware == (('1.0.0', '2.0.0'), ('2.0.0', '1.0.0'))
+            assert set(result.durations) == {STAGE_VALIDATE, STAGE_DOWNLOAD, STAGE_RUN, STAGE_COMMIT}
+            assert [stage for p, stage in progress if p == port] == \
+                [STAGE_VALIDATE, STAGE_DOWNLOAD, STAGE_RUN, STAGE_COMMIT, STAGE_DONE]
+            api = sfps[port].get_xcvr_api()
+            api.module_fw_download.assert_called_once_with(*(FEATURE + (image,)))
+            api.module_fw_run.assert_called_once_with(mode=0x01)
+            api.module_fw_commit.assert_called_once_with()
+
+    def test_dry_run(self, image):
+        sfps = [make_sfp(), make_sfp()]
+        sfps[1].get_xcvr_api.return_value = None
+        with XcvrFwUpgrader(sfps) as upgrader:
+            results = upgrader.upgrade(image, dry_run=True)
+        assert results[0].ok and results[0].stage == STAGE_DONE
+        assert not results[1].ok and results[1].stage == STAGE_VALIDATE
+        assert "not supported" in results[1].info
+        sfps[0].get_xcvr_api().module_fw_download.assert_not_called()
+
+    def test_invalid_image(self, tmp_path):
+        with XcvrFwUpgrader([make_sfp()]) as upgrader:
+            result = upgrader.upgrade(str(tmp_path / "missing.bin"))[0]
+            assert not result.ok and result.stage == STAGE_VALIDATE
+            small = tmp_path / "small.bin"
+            small.write_bytes(b'\x00\x01')
+            result = upgrader.upgrade(str(small))[0]
+            assert not result.ok and "too small" in result.info
+
+    def test_failed_stage(self, image):
+        sfps = [make_sfp(), make_sfp()]
+        sfps[0].get_xcvr_api().module_fw_download.side_effect = IOError("i2c error")
+        sfps[1].get_xcvr_api().module_fw_commit.return_value = (False, 'commit failed\n')
+        with XcvrFwUpgrader(sfps) as upgrader:
+            results = upgrader.upgrade(image)
+        assert not results[0].ok and results[0].stage == STAGE_DOWNLOAD
+        assert "i2c error" in results[0].info
+        sfps[0].get_xcvr_api().module_fw_run.assert_not_called()
+        assert not results[1].ok and results[1].stage == STAGE_COMMIT
+
+    def test_run_timeout(self, image):
+        sfp = make_sfp()
+        sfp.get_xcvr_api().module_fw_run.side_effect = None
+        sfp.get_xcvr_api().module_fw_run.return_value = (True, 'run\n')
+        with XcvrFwUpgrader([sfp]) as upgrader:
+            with patch.object(polling, 'time') as mock_time:
+                mock_time.monotonic.side_effect = itertools.count()
+                result = upgrader.upgrade(image, run_timeout=3)[0]
+        assert not result.ok and result.stage == STAGE_RUN
+        sfp.get_xcvr_api().module_fw_commit.assert_not_called()
+
+    def test_bus_parallelism(self, image):
+        tracker = ConcurrencyTracker()
+        sfps = [make_sfp(bus, 0.02, tracker) for bus in (0, 0, 0, 1, 1, 1)]
+        with XcvrFwUpgrader(sfps, bus_key=lambda sfp: sfp.bus, max_workers_per_bus=2) as upgrader:
+            results = upgrader.upgrade(image, commit=False)
+        assert all(result.ok for result in results.values())
+        assert tracker.max_active == {0: 2, 1: 2}
+        sfps[0].get_xcvr_api().module_fw_commit.assert_not_called()
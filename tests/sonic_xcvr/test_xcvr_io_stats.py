@@ -0,0 +1,134 @@
+from mock import MagicMock
+
+from sonic_platform_base.sonic_xcvr.api.public.cmis import CmisApi
+from sonic_platform_base.sonic_xcvr.codes.public.cmis import CmisCodes
+from sonic_platform_base.sonic_xcvr.mem_maps.public.cmis import CmisMemMap
+from sonic_platform_base.sonic_xcvr.sfp_optoe_base import SfpOptoeBase
+from sonic_platform_base.sonic_xcvr.xcvr_api_factory import XcvrApiFactory
+from sonic_platform_base.sonic_xcvr.xcvr_eeprom import XcvrEeprom
+from sonic_platform_base.sonic_xcvr.xcvr_io_stats import XcvrIoStats
+
+class PlatformXcvrApiFactory(XcvrApiFactory):
+    def create_xcvr_api(self):
+        self.reader(0, 1)
+        return None
+
+class EepromSfp(SfpOptoeBase):
+    def __init__(self, name):
+        SfpOptoeBase.__init__(self)
+        self.name = name
+        self.data = bytearray(0x100 * 128)
+        self.data[0] = 0x18
+        self.data[129:145] = b'VENDOR_NAME_TEST'
+
+    def get_name(self):
+        return self.name
+
+    def read_eeprom(self, offset, num_bytes):
+        return bytearray(self.data[offset:offset + num_bytes])
+
+    def write_eeprom(self, offset, num_bytes, write_buffer):
+        self.data[offset:offset + num_bytes] = write_buffer
+        return True
+
+class TestXcvrIoStats(object):
+    def make_io(self, stats, port="Ethernet0"):
+        data = bytearray(0x100 * 128)
+        reader = MagicMock(side_effect=lambda offset, size: bytearray(data[offset:offset + size]))
+        writer = MagicMock(return_value=True)
+        return stats.instrument(reader, writer, port)
+
+    def test_counts(self):
+        stats = XcvrIoStats()
+        reader, writer = self.make_io(stats)
+        reader(0, 1)
+        reader(129, 16)
+        writer(26, 1, bytearray([0]))
+        counters = stats.to_dict()["Ethernet0"][None]
+        assert counters["read"]["count"] == 2
+        assert counters["read"]["bytes"] == 17
+        assert counters["write"]["count"] == 1
+        assert sum(counters["read"]["latency_histogram"].values()) == 2
+        assert counters["read"]["errors"] == 0
+
+    def test_errors(self):
+        stats = XcvrIoStats()
+        reader, writer = stats.instrument(MagicMock(return_value=None),
+                                          MagicMock(return_value=False), 0)
+        assert reader(0, 1) is None
+        assert writer(0, 1, bytearray([0])) is False
+        counters = stats.to_dict()[0][None]
+        assert counters["read"]["errors"] == 1
+        assert counters["write"]["errors"] == 1
+
+    def test_page_switches(self):
+        stats = XcvrIoStats()
+        reader, _ = self.make_io(stats)
+        # Page 01h, lower memory, page 01h again, page 11h, page 11h
+        for offset in (256, 0, 300, 18 * 128, 18 * 128 + 10):
+            reader(offset, 1)
+        assert stats.to_dict()["Ethernet0"][None]["read"]["page_switches"] == 2
+
+    def test_api_attribution(self):
+        stats = XcvrIoStats()
+        reader, writer = self.make_io(stats)
+        api = stats.instrument_api(CmisApi(XcvrEeprom(reader, writer, CmisMemMap(CmisCodes))))
+        assert isinstance(api, CmisApi)
+        stats.reset()
+        api.get_manufacturer()
+        counters = stats.to_dict()["Ethernet0"]
+        assert list(counters) == ["CmisApi.get_manufacturer"]
+        assert counters["CmisApi.get_manufacturer"]["read"]["bytes"] == 16
+
+    def test_nested_api_call(self):
+        stats = XcvrIoStats()
+        reader, _ = self.make_io(stats)
+        with stats.api_call("outer"):
+            with stats.api_call("inner"):
+                reader(0, 1)
+        assert stats.get_current_api_call() is None
+        assert list(stats.to_dict()["Ethernet0"]) == ["outer"]
+
+    def test_to_prometheus(self):
+        stats = XcvrIoStats(latency_buckets=(1.0,))
+        reader, _ = self.make_io(stats, port='Ethernet"0')
+        with stats.api_call("CmisApi.get_model"):
+            reader(0, 4)
+        text = stats.to_prometheus()
+        labels = 'port="Ethernet\\"0",api="CmisApi.get_model",op="read"'
+        assert "xcvr_eeprom_ops_total{%s} 1" % labels in text
+        assert "xcvr_eeprom_bytes_total{%s} 4" % labels in text
+        assert 'xcvr_eeprom_latency_seconds_bucket{%s,le="1.0"} 1' % labels in text
+        assert 'xcvr_eeprom_latency_seconds_bucket{%s,le="+Inf"} 1' % labels in text
+        assert "xcvr_eeprom_latency_seconds_count{%s} 1" % labels in text
+        assert "# TYPE xcvr_eeprom_latency_seconds histogram" in text
+
+    def test_sfp_optoe_base(self):
+        stats = XcvrIoStats()
+        SfpOptoeBase.set_xcvr_io_stats(stats)
+        try:
+            sfp = EepromSfp("Ethernet8")
+            api = sfp.get_xcvr_api()
+            assert isinstance(api, CmisApi)
+            assert api.get_manufacturer() == "VENDOR_NAME_TEST"
+        finally:
+            SfpOptoeBase.set_xcvr_io_stats(None)
+        counters = stats.to_dict()["Ethernet8"]
+        assert "XcvrApiFactory.create_xcvr_api" in counters
+        assert counters["CmisApi.get_manufacturer"]["read"]["count"] == 1
+        # Not instrumented once disabled
+        assert "get_manufacturer" not in EepromSfp("Ethernet16").get_xcvr_api().__dict__
+
+    def test_sfp_optoe_base_factory(self):
+        stats = XcvrIoStats()
+        sfp = EepromSfp("Ethernet8")
+        factory = sfp._xcvr_api_factory = PlatformXcvrApiFactory(MagicMock(), MagicMock())
+        SfpOptoeBase.set_xcvr_io_stats(stats)
+        try:
+            assert sfp.get_xcvr_api() is None
+        finally:
+            SfpOptoeBase.set_xcvr_io_stats(None)
+        # The platform's factory and reader are used, instrumented, and left unchanged
+        factory.reader.assert_called_once_with(0, 1)
+        assert sfp._xcvr_api_factory is factory
+        assert stats.to_dict()["Ethernet8"]["XcvrApiFactory.create_xcvr_api"]["read"]["count"] == 1
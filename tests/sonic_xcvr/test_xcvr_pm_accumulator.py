@@ -0,0 +1,82 @@
+from mock import MagicMock
+import pytest
+
+from sonic_platform_base.sonic_xcvr.api.public.c_cmis import C_CMIS_PM_FIELDS
+from sonic_platform_base.sonic_xcvr.fields import consts
+from sonic_platform_base.sonic_xcvr.xcvr_poller import XcvrPoller
+from sonic_platform_base.sonic_xcvr.xcvr_pm_accumulator import XcvrPmAccumulator, read_pm_fields
+
+def make_pm(bits, corr_bits, frames=0, uncorr=0, osnr=(30.0, 29.0, 31.0)):
+    pm = {field: 0 for field in C_CMIS_PM_FIELDS}
+    pm.update({
+        consts.RX_BITS_PM: bits,
+        consts.RX_CORR_BITS_PM: corr_bits,
+        consts.RX_FRAMES_PM: frames,
+        consts.RX_FRAMES_UNCORR_ERR_PM: uncorr,
+        consts.RX_BITS_SUB_INTERVAL_PM: 1000,
+        consts.RX_MIN_CORR_BITS_SUB_INTERVAL_PM: 1,
+        consts.RX_MAX_CORR_BITS_SUB_INTERVAL_PM: 3,
+        consts.RX_AVG_OSNR_PM: osnr[0],
+        consts.RX_MIN_OSNR_PM: osnr[1],
+        consts.RX_MAX_OSNR_PM: osnr[2],
+    })
+    return pm
+
+class TestXcvrPmAccumulator(object):
+    def test_bins(self):
+        acc = XcvrPmAccumulator(interval=900, history=4)
+        assert acc.get_current("Ethernet0") is None
+        acc.update("Ethernet0", make_pm(1000, 10), now=900)
+        acc.update("Ethernet0", make_pm(3000, 30, osnr=(20.0, 18.0, 25.0)), now=1000)
+        current = acc.get_current("Ethernet0")
+        assert current['start'] == 900 and current['samples'] == 2
+        assert current['rx_bits'] == 2000 and current['rx_corr_bits'] == 20
+        assert current['preFEC_BER_avg'] == pytest.approx(0.01)
+        assert current['preFEC_BER_min'] == pytest.approx(0.001)
+        assert current['preFEC_BER_max'] == pytest.approx(0.003)
+        assert current['preFEC_uncorr_frame_ratio_min'] is None
+        assert (current['rx_osnr_min'], current['rx_osnr_max'], current['rx_osnr_avg']) == (18.0, 31.0, 25.0)
+        assert acc.get_previous("Ethernet0") is None
+
+        # Next bin, the counters were cleared in between
+        acc.update("Ethernet0", make_pm(500, 1), now=1800)
+        previous, current = acc.get_previous("Ethernet0"), acc.get_current("Ethernet0")
+        assert previous['start'] == 900 and previous['rx_bits'] == 2000
+        assert current['start'] == 1800 and current['samples'] == 1
+        assert current['rx_bits'] == 500 and current['rx_corr_bits'] == 1
+        assert current['rx_osnr_avg'] == 30.0
+
+    def test_history(self):
+        acc = XcvrPmAccumulator(interval=10, history=3)
+        for i in range(6):
+            acc.update("Ethernet0", make_pm(100 * i, i), now=10 * i)
+        history = acc.get_history("Ethernet0")
+        assert [b['start'] for b in history] == [30, 40, 50]
+        assert all(b['rx_bits'] == 100 for b in history)
+        assert acc.get_bin("Ethernet0", 3) is None
+        # A sample older than the history does not evict a newer bin
+        acc.update("Ethernet0", make_pm(600, 6), now=0)
+        assert [b['start'] for b in acc.get_history("Ethernet0")] == [30, 40, 50]
+        acc.remove("Ethernet0")
+        assert acc.get_history("Ethernet0") == []
+
+    def test_collect(self):
+        sfps = {}
+        for port, bits in (("Ethernet0", 1000), ("Ethernet8", 2000)):
+            sfps[port] = MagicMock()
+            sfps[port].get_xcvr_api.return_value.get_pm_fields.return_value = make_pm(bits, 1)
+        sfps["Ethernet16"] = MagicMock()
+        sfps["Ethernet16"].get_xcvr_api.return_value = None
+        sfps["Ethernet24"] = MagicMock()
+        sfps["Ethernet24"].get_xcvr_api.return_value.get_pm_fields.side_effect = IOError("i2c error")
+        acc = XcvrPmAccumulator()
+        with XcvrPoller(sfps) as poller:
+            failed = acc.collect(poller, now=0)
+        assert failed["Ethernet16"] is None
+        assert isinstance(failed["Ethernet24"], IOError)
+        assert set(failed) == {"Ethernet16", "Ethernet24"}
+        assert acc.get_current("Ethernet8")['samples'] == 1
+        assert acc.get_current("Ethernet16") is None
+        for sfp in list(sfps.values())[:2]:
+            sfp.get_xcvr_api().get_pm_fields.assert_called_once_with()
+        assert read_pm_fields(sfps["Ethernet16"]) is None
@@ -0,0 +1,97 @@
+from mock import MagicMock
+import pytest
+
+from sonic_platform_base.sonic_xcvr.xcvr_poll_scheduler import XcvrPollClass, XcvrPollScheduler
+from sonic_platform_base.sonic_xcvr.xcvr_poller import XcvrPoller
+
+DOM = XcvrPollClass("dom", "get_transceiver_dom_real_value", 1.0, 8.0)
+STATUS = XcvrPollClass("status", "get_transceiver_status", 1.0, 8.0)
+FLAGS = XcvrPollClass("flags", "get_transceiver_status_flags", 1.0, 8.0, is_flags=True)
+READY = {'module_state': 'ModuleReady', 'DP1State': 'DataPathActivated'}
+
+class TestXcvrPollScheduler(object):
+    def test_backoff_when_stable(self):
+        scheduler = XcvrPollScheduler([0], [DOM], now=0)
+        assert scheduler.get_due(now=0) == [(0, "dom")]
+        intervals = []
+        now = 0
+        for _ in range(5):
+            scheduler.update(0, "dom", {'temperature': 30.0}, now=now)
+            intervals.append(scheduler.get_interval(0, "dom"))
+            now += intervals[-1]
+        assert intervals == [1.0, 2.0, 4.0, 8.0, 8.0]
+        assert scheduler.get_due(now=now - 1) == []
+        assert scheduler.get_next_due() == now
+
+    def test_change_resets_interval(self):
+        scheduler = XcvrPollScheduler([0], [DOM], now=0)
+        for value in (30.0, 30.1, 30.2):
+            scheduler.update(0, "dom", {'temperature': value}, now=0)
+        assert scheduler.get_interval(0, "dom") == 4.0
+        scheduler.update(0, "dom", {'temperature': 40.0}, now=0)
+        assert scheduler.get_interval(0, "dom") == 1.0
+        # Failed polls are retried fast
+        scheduler.update(0, "dom", {'temperature': 40.0}, now=0)
+        scheduler.update(0, "dom", None, now=0)
+        assert scheduler.get_interval(0, "dom") == 1.0
+
+    def test_flags_and_transition(self):
+        scheduler = XcvrPollScheduler([0], [DOM, STATUS, FLAGS], now=0)
+        for _ in range(3):
+            scheduler.update(0, "flags", {'tx1fault': True}, now=0)
+            scheduler.update(0, "status", dict(READY, tx1disable=True), now=0)
+        assert scheduler.get_interval(0, "flags") == 1.0
+        assert scheduler.get_interval(0, "status") == 4.0
+
+        scheduler.update(0, "status", dict(READY, DP1State='DataPathInitialized'), now=0)
+        for _ in range(3):
+            scheduler.update(0, "dom", {'temperature': 30.0}, now=0)
+        assert scheduler.get_interval(0, "dom") == 1.0
+        scheduler.update(0, "status", READY, now=0)
+        scheduler.update(0, "dom", {'temperature': 30.0}, now=0)
+        assert scheduler.get_interval(0, "dom") == 2.0
+
+    def test_budget(self):
+        scheduler = XcvrPollScheduler(range(4), [DOM], budget=2.0, now=0)
+        assert len(scheduler.get_due(now=0)) == 2
+        assert scheduler.get_due(now=0) == []
+        assert len(scheduler.get_due(now=0.5)) == 1
+        assert len(scheduler.get_due(now=10)) == 2
+
+    def test_budget_below_cost(self):
+        scheduler = XcvrPollScheduler([0, 1], [DOM], budget=0.5, now=0)
+        assert scheduler.burst == 1.0
+        assert len(scheduler.get_due(now=0)) == 1
+        assert scheduler.get_due(now=1) == []
+        assert len(scheduler.get_due(now=2)) == 1
+        with pytest.raises(AssertionError):
+            XcvrPollScheduler([0], [DOM], budget=0.5, burst=0.5)
+
+    def test_most_overdue_first(self):
+        scheduler = XcvrPollScheduler([0, 1], [DOM], now=0)
+        scheduler.update(0, "dom", {'temperature': 30.0}, now=0)
+        scheduler.update(1, "dom", {'temperature': 30.0}, now=0)
+        scheduler.update(1, "dom", {'temperature': 30.0}, now=0)
+        # Port 0 is due at 1s, port 1 at 2s
+        assert scheduler.get_due(now=3) == [(0, "dom"), (1, "dom")]
+
+    def test_add_remove_port(self):
+        scheduler = XcvrPollScheduler([], [DOM], now=0)
+        assert scheduler.get_next_due() is None
+        scheduler.add_port("Ethernet0", now=5)
+        assert scheduler.get_due(now=5) == [("Ethernet0", "dom")]
+        scheduler.remove_port("Ethernet0")
+        assert scheduler.get_due(now=5) == []
+
+    def test_poll_due(self):
+        sfp = MagicMock()
+        sfp.get_transceiver_dom_real_value.return_value = {'temperature': 30.0}
+        sfp.get_transceiver_status.side_effect = IOError("read failed")
+        scheduler = XcvrPollScheduler(["Ethernet0"], [DOM, STATUS], now=0)
+        with XcvrPoller({"Ethernet0": sfp}) as poller:
+            results = scheduler.poll_due(poller, now=0)
+            assert len(results) == 2
+            assert scheduler.poll_due(poller, now=0.5) == []
+            scheduler.poll_due(poller, now=1)
+        assert scheduler.get_interval("Ethernet0", "dom") == 2.0
+        assert scheduler.get_interval("Ethernet0", "status") == 1.0
@@ -0,0 +1,91 @@
+import threading
+import time
+
+from mock import MagicMock
+import pytest
+
+from sonic_platform_base.sonic_xcvr.xcvr_poller import XcvrPoller, XcvrPollResult
+
+class ConcurrencyTracker(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = {}
+        self.max_active = {}
+
+    def make_call(self, bus, delay=0.02):
+        def call(sfp):
+            with self.lock:
+                self.active[bus] = self.active.get(bus, 0) + 1
+                self.max_active[bus] = max(self.max_active.get(bus, 0), self.active[bus])
+            time.sleep(delay)
+            with self.lock:
+                self.active[bus] -= 1
+            return sfp.bus
+        return call
+
+def make_sfp(bus):
+    sfp = MagicMock()
+    sfp.bus = bus
+    sfp.get_transceiver_dom_real_value.return_value = {'temperature': 30.0}
+    return sfp
+
+class TestXcvrPoller(object):
+    def test_poll_all(self):
+        sfps = [make_sfp(0), make_sfp(1)]
+        sfps[1].get_transceiver_dom_flags.side_effect = IOError("read failed")
+        with XcvrPoller(sfps) as poller:
+            result = poller.poll_all(["get_transceiver_dom_real_value", "get_transceiver_dom_flags"])
+        assert set(result) == {0, 1}
+        assert result[0]["get_transceiver_dom_real_value"].value == {'temperature': 30.0}
+        assert result[0]["get_transceiver_dom_flags"].error is None
+        assert isinstance(result[1]["get_transceiver_dom_flags"].error, IOError)
+        assert result[1]["get_transceiver_dom_flags"].value is None
+
+    def test_poll_stream(self):
+        poller = XcvrPoller({"Ethernet0": make_sfp(0), "Ethernet8": make_sfp(1)})
+        results = list(poller.poll([lambda sfp: sfp.bus], ports=["Ethernet8"]))
+        poller.close()
+        assert len(results) == 1
+        assert isinstance(results[0], XcvrPollResult)
+        assert results[0].port == "Ethernet8"
+        assert results[0].value == 1
+
+    def test_poll_empty(self):
+        with XcvrPoller([]) as poller:
+            assert list(poller.poll()) == []
+
+    @pytest.mark.parametrize("max_workers_per_bus", [1, 2])
+    def test_bus_bound(self, max_workers_per_bus):
+        sfps = [make_sfp(port % 2) for port in range(8)]
+        tracker = ConcurrencyTracker()
+        calls = [lambda sfp: tracker.make_call(sfp.bus)(sfp)]
+        with XcvrPoller(sfps, bus_key=lambda sfp: sfp.bus,
+                        max_workers_per_bus=max_workers_per_bus) as poller:
+            assert poller.get_buses() == {0: [0, 2, 4, 6], 1: [1, 3, 5, 7]}
+            results = list(poller.poll(calls))
+        assert len(results) == 8
+        assert max(tracker.max_active.values()) <= max_workers_per_bus
+
+    def test_calls_sequential_per_port(self):
+        order = []
+        sfps = [make_sfp(0)]
+        calls = [lambda sfp, i=i: order.append(i) for i in range(5)]
+        with XcvrPoller(sfps, max_workers=4) as poller:
+            poller.poll_all(calls)
+        assert order == list(range(5))
+
+    def test_unknown_port(self):
+        with XcvrPoller({0: make_sfp(0)}) as poller:
+            with pytest.raises(ValueError):
+                list(poller.poll([lambda sfp: sfp.bus], ports=[0, 5]))
+
+    def test_worker_failure(self, monkeypatch):
+        calls = [lambda sfp: sfp.bus, lambda sfp: sfp.bus]
+        clock = iter([0.0, 1.0, 2.0])
+        with XcvrPoller([make_sfp(0)]) as poller:
+            # The clock runs out in the middle of the port's calls
+            monkeypatch.setattr(time, "monotonic", lambda: next(clock))
+            results = list(poller.poll(calls))
+        assert len(results) == 2
+        assert results[0].error is None and results[0].value == 0
+        assert isinstance(results[1].error, StopIteration)